@@ -1,11 +1,14 @@
 from fastapi import APIRouter
 from fastapi.responses import StreamingResponse
-from app.core.di import GetAIService
+from app.core.di import GetSubmissionsService
 from app.schemas.ai import ReviewPayload
+from app.services.streaming import coalesce_chunks
 
 router = APIRouter()
 
 
 @router.post("/review")
-async def review_code(data: ReviewPayload, service: GetAIService):
-    return StreamingResponse(service.stream_feedback(data), media_type="text/plain")
+async def review_code(data: ReviewPayload, service: GetSubmissionsService):
+    return StreamingResponse(
+        coalesce_chunks(await service.stream_review(data)), media_type="text/plain"
+    )
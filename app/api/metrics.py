@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+router = APIRouter(tags=["ops"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    # Prometheus text exposition; scraped directly, no push gateway needed
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
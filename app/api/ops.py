@@ -0,0 +1,60 @@
+from typing import Any, Dict
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.ai_client import ai_pool_stats
+from app.core.db import check_stores, db_pool_stats
+from app.core.di import (
+    GetAIBreaker,
+    GetAIScheduler,
+    GetNearDuplicateIndex,
+    GetReviewCache,
+    GetReviewJobs,
+)
+
+router = APIRouter(prefix="/ops", tags=["ops"])
+
+
+@router.get("/review-cache")
+async def review_cache_stats(cache: GetReviewCache) -> Dict[str, Any]:
+    return cache.stats()
+
+
+@router.get("/ready")
+async def ready() -> JSONResponse:
+    # readiness probe: only take traffic while both stores answer
+    stores = await check_stores(timeout=2.0)
+    ok = all(state == "ok" for state in stores.values())
+    return JSONResponse(stores, status_code=200 if ok else 503)
+
+
+@router.get("/db-pool")
+async def db_pool() -> Dict[str, Any]:
+    return db_pool_stats()
+
+
+@router.get("/ai-pool")
+async def ai_pool() -> Dict[str, Any]:
+    return ai_pool_stats()
+
+
+@router.get("/ai-scheduler")
+async def ai_scheduler_stats(scheduler: GetAIScheduler) -> Dict[str, Any]:
+    return scheduler.stats()
+
+
+@router.get("/ai-breaker")
+async def ai_breaker_stats(breaker: GetAIBreaker) -> Dict[str, Any]:
+    return breaker.stats()
+
+
+@router.get("/review-jobs")
+async def review_jobs_stats(jobs: GetReviewJobs) -> Dict[str, Any]:
+    return {"running": jobs.running, "workers": jobs.workers, "queued": jobs.pending()}
+
+
+@router.get("/near-duplicates")
+async def near_duplicates_stats(index: GetNearDuplicateIndex) -> Dict[str, Any]:
+    if index is None:
+        return {"enabled": False}
+    return {"enabled": True, **index.stats()}
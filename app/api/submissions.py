@@ -1,34 +1,90 @@
 from uuid import UUID
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Query, Response, status
+from fastapi.responses import StreamingResponse
 
 from app.schemas.submissions import (
+    SubmissionBatchCreate,
+    SubmissionBatchItemOut,
     SubmissionCreate,
     SubmissionWithPayloadOut,
     SubmissionOut,
 )
-from typing import List
+from typing import List, Literal, Optional
 from app.core.di import GetSubmissionsService
+from app.models.postgre import Language, SubmissionStatus
 
 router = APIRouter(prefix="/submissions", tags=["submissions"])
 
 
+@router.get("/export")
+async def export_submissions(
+    service: GetSubmissionsService,
+    batch_size: int = Query(500, ge=1, le=5000),
+):
+    return StreamingResponse(
+        service.export_ndjson(batch_size=batch_size),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="submissions.ndjson"'},
+    )
+
+
 @router.get("/{uuid}", response_model=SubmissionWithPayloadOut)
 async def get_submission(uuid: UUID, service: GetSubmissionsService):
     return await service.get(uuid=uuid)
 
 
+@router.get("/{uuid}/events")
+async def submission_events(uuid: UUID, service: GetSubmissionsService):
+    events = await service.review_events(uuid)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post(
     "", response_model=SubmissionWithPayloadOut, status_code=status.HTTP_201_CREATED
 )
 async def create_submission(
     data: SubmissionCreate,
     service: GetSubmissionsService,
+    response: Response,
+    mode: Literal["sync", "async"] = "sync",
+):
+    result = await service.create(data, defer_review=mode == "async")
+    if result.status == SubmissionStatus.PENDING:
+        # accepted; poll GET /submissions/{uuid} for the review
+        response.status_code = status.HTTP_202_ACCEPTED
+    return result
+
+
+@router.post("/batch", response_model=List[SubmissionBatchItemOut])
+async def create_submissions_batch(
+    data: SubmissionBatchCreate,
+    service: GetSubmissionsService,
 ):
-    return await service.create(data)
+    return await service.create_batch(data.items)
 
 
-@router.get("", response_model=List[SubmissionOut])
+@router.get("", response_model=List[SubmissionOut], response_model_exclude_unset=True)
 async def get_submissions(
     service: GetSubmissionsService,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    language: Optional[Language] = None,
+    title_prefix: Optional[str] = Query(None, max_length=255),
+    include: Optional[Literal["payload"]] = None,
 ):
-    return await service.get_all()
+    page = await service.get_all(
+        limit=limit,
+        cursor=cursor,
+        language=language,
+        title_prefix=title_prefix,
+        include_payload=include == "payload",
+    )
+    # the body stays a plain list; the keyset cursor for the next page rides in a header
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.items
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Dict
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.core.config import env_bool
+
+OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(
+    os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20")
+)
+OPENAI_KEEPALIVE_EXPIRY: float = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
+OPENAI_CONNECT_TIMEOUT: float = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", "60"))
+OPENAI_HTTP2: bool = env_bool("OPENAI_HTTP2")
+
+ai_client: AsyncOpenAI | None = None
+http_client: httpx.AsyncClient | None = None
+
+
+class AIConfigurationError(RuntimeError):
+    """The OpenAI client cannot be created with the server's settings."""
+
+
+def create_ai_client() -> AsyncOpenAI:
+    global http_client
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise AIConfigurationError("OPENAI_API_KEY is not set on the server")
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+        http2=OPENAI_HTTP2,
+    )
+    # retries are owned by AIScheduler so 429 backoff is coordinated across calls
+    return AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+
+
+def get_ai_client() -> AsyncOpenAI:
+    # one client per process so TLS sessions and keep-alive connections are reused
+    global ai_client
+    if ai_client is None:
+        ai_client = create_ai_client()
+    return ai_client
+
+
+async def close_ai_client() -> None:
+    global ai_client, http_client
+    if ai_client is not None:
+        await ai_client.close()
+    ai_client = None
+    http_client = None
+
+
+def ai_pool_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = {
+        "initialized": http_client is not None,
+        "http2": OPENAI_HTTP2,
+        "max_connections": OPENAI_MAX_CONNECTIONS,
+        "max_keepalive_connections": OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    }
+    # httpx does not expose pool state publicly; read httpcore's pool defensively
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    if pool is None:
+        return stats
+    connections = list(getattr(pool, "connections", []))
+    requests = list(getattr(pool, "_requests", []))
+    idle = sum(1 for conn in connections if conn.is_idle())
+    stats.update(
+        connections=len(connections),
+        active_connections=len(connections) - idle,
+        idle_connections=idle,
+        queued_requests=sum(
+            1 for req in requests if getattr(req, "connection", None) is None
+        ),
+        utilisation=round((len(connections) - idle) / OPENAI_MAX_CONNECTIONS, 4)
+        if OPENAI_MAX_CONNECTIONS
+        else 0.0,
+    )
+    return stats
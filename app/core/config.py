@@ -0,0 +1,5 @@
+import os
+
+
+def env_bool(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
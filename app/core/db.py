@@ -1,27 +1,97 @@
 from __future__ import annotations
 
-from typing import AsyncGenerator
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict
 from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     AsyncSession,
     AsyncEngine,
     create_async_engine,
 )
+from sqlalchemy import text
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import QueuePool
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 import os
 
+from app.core.config import env_bool
+
 DATABASE_URL: str = os.getenv(
     "DATABASE_URL", "postgresql+asyncpg://postgres:postgres@db:5432/codereview"
 )
 
-engine: AsyncEngine = create_async_engine(
-    DATABASE_URL,
-    echo=True,
-    future=True,
-    pool_pre_ping=True,
-    pool_recycle=1800,
-)
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    url: str = DATABASE_URL
+    # statement logging is synchronous and runs on the event loop; debug only
+    echo: bool = False
+    pool_size: int = 10
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    # SQLAlchemy's cache of compiled SQL strings
+    query_cache_size: int = 500
+    # asyncpg prepared statements kept per connection; 0 disables them, which
+    # is required behind pgbouncer in transaction mode
+    prepared_statement_cache_size: int = 100
+
+    @classmethod
+    def from_env(cls) -> "DatabaseSettings":
+        return cls(
+            url=DATABASE_URL,
+            echo=env_bool("DATABASE_ECHO"),
+            pool_size=int(os.getenv("DATABASE_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("DATABASE_MAX_OVERFLOW", "10")),
+            pool_timeout=float(os.getenv("DATABASE_POOL_TIMEOUT", "30")),
+            pool_recycle=int(os.getenv("DATABASE_POOL_RECYCLE", "1800")),
+            pool_pre_ping=env_bool("DATABASE_POOL_PRE_PING", "true"),
+            query_cache_size=int(os.getenv("DATABASE_QUERY_CACHE_SIZE", "500")),
+            prepared_statement_cache_size=int(
+                os.getenv("DATABASE_PREPARED_STATEMENT_CACHE_SIZE", "100")
+            ),
+        )
+
+
+def create_engine(settings: DatabaseSettings) -> AsyncEngine:
+    return create_async_engine(
+        settings.url,
+        echo=settings.echo,
+        future=True,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_recycle=settings.pool_recycle,
+        pool_pre_ping=settings.pool_pre_ping,
+        query_cache_size=settings.query_cache_size,
+        connect_args={
+            "prepared_statement_cache_size": settings.prepared_statement_cache_size
+        },
+    )
+
+
+database_settings = DatabaseSettings.from_env()
+engine: AsyncEngine = create_engine(database_settings)
+
+
+def db_pool_stats() -> Dict[str, Any]:
+    pool = engine.pool
+    stats: Dict[str, Any] = {
+        "pool_size": database_settings.pool_size,
+        "max_overflow": database_settings.max_overflow,
+        "pool_timeout": database_settings.pool_timeout,
+        "status": pool.status(),
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    return stats
+
 
 SessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
     bind=engine, expire_on_commit=False
@@ -36,6 +106,51 @@ MONGO_URL: str = os.getenv("MONGO_URL", "mongodb://mongo:27017")
 MONGO_DB_NAME: str = os.getenv("MONGO_DB_NAME", "codereview")
 
 
+@dataclass(frozen=True)
+class MongoSettings:
+    url: str = MONGO_URL
+    db_name: str = MONGO_DB_NAME
+    max_pool_size: int = 100
+    min_pool_size: int = 0
+    max_idle_time_ms: int = 300_000
+    # negotiated with the server in order; zstd/snappy need the python packages
+    # (zstandard, python-snappy) and are skipped with a warning when missing
+    compressors: str = "zstd,zlib"
+    server_selection_timeout_ms: int = 5000
+    connect_timeout_ms: int = 5000
+    read_preference: str = "primary"
+
+    @classmethod
+    def from_env(cls) -> "MongoSettings":
+        return cls(
+            url=MONGO_URL,
+            db_name=MONGO_DB_NAME,
+            max_pool_size=int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+            min_pool_size=int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+            max_idle_time_ms=int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+            compressors=os.getenv("MONGO_COMPRESSORS", "zstd,zlib"),
+            server_selection_timeout_ms=int(
+                os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")
+            ),
+            connect_timeout_ms=int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+            read_preference=os.getenv("MONGO_READ_PREFERENCE", "primary"),
+        )
+
+
+def create_mongo_client(settings: MongoSettings) -> AsyncIOMotorClient:
+    options: Dict[str, Any] = {
+        "maxPoolSize": settings.max_pool_size,
+        "minPoolSize": settings.min_pool_size,
+        "maxIdleTimeMS": settings.max_idle_time_ms,
+        "serverSelectionTimeoutMS": settings.server_selection_timeout_ms,
+        "connectTimeoutMS": settings.connect_timeout_ms,
+        "readPreference": settings.read_preference,
+    }
+    if settings.compressors:
+        options["compressors"] = settings.compressors
+    return AsyncIOMotorClient(settings.url, **options)
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
         try:
@@ -44,11 +159,47 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+mongo_settings = MongoSettings.from_env()
 mongo_client: AsyncIOMotorClient | None = None
 
 
-async def get_mongo_db() -> AsyncGenerator[AsyncIOMotorDatabase, None]:
+def get_mongo_database() -> AsyncIOMotorDatabase:
+    # created by the app lifespan; scripts and tests fall back to lazy creation
     global mongo_client
     if mongo_client is None:
-        mongo_client = AsyncIOMotorClient(MONGO_URL)
-    yield mongo_client[MONGO_DB_NAME]
+        mongo_client = create_mongo_client(mongo_settings)
+    return mongo_client[mongo_settings.db_name]
+
+
+def close_mongo_client() -> None:
+    global mongo_client
+    if mongo_client is not None:
+        mongo_client.close()
+        mongo_client = None
+
+
+async def get_mongo_db() -> AsyncGenerator[AsyncIOMotorDatabase, None]:
+    yield get_mongo_database()
+
+
+async def check_postgres() -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def check_mongo() -> None:
+    await get_mongo_database().command("ping")
+
+
+async def check_stores(timeout: float = 5.0) -> Dict[str, str]:
+    """Ping both stores concurrently; maps each store to "ok" or the error."""
+
+    async def probe(check: Callable[[], Awaitable[None]]) -> str:
+        try:
+            await asyncio.wait_for(check(), timeout=timeout)
+            return "ok"
+        except Exception as exc:
+            return f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+
+    postgres, mongo = await asyncio.gather(probe(check_postgres), probe(check_mongo))
+    return {"postgres": postgres, "mongo": mongo}
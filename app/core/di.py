@@ -1,13 +1,37 @@
-from app.core.db import get_mongo_db, get_db
+from app.core.cache import REVIEW_CACHE_MAXSIZE, REVIEW_CACHE_TTL_SECONDS, TTLCache
+from app.core.db import SessionLocal, get_mongo_database, get_mongo_db, get_db
+from app.core.singleflight import SingleFlight
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 from typing import Annotated, TypeAlias
-from app.services.submissions import SubmissionsService
+from app.services.submissions import CachedReview, SubmissionsService
 from app.repositories.mongo.submissions import SubmissionsMongoRepo
 from app.repositories.postgre.submissions import SubmissionsPgRepo
-import os
-from app.services.ai import AI as AIService
-from openai import AsyncOpenAI
+from app.services.ai import AI as AIService, AIScheduler, CircuitBreaker
+from app.services.broadcast import ReviewBroadcaster
+from app.services.review_jobs import ReviewJobQueue
+from app.services.ai_providers import AIProvider, create_ai_provider
+from app.services.near_duplicates import NEAR_DUPLICATE_DEDUP, NearDuplicateIndex
+from app.models.postgre import SubmissionStatus
+from typing import Optional
+from uuid import UUID
+
+review_cache: TTLCache[str, CachedReview] = TTLCache(
+    maxsize=REVIEW_CACHE_MAXSIZE, ttl=REVIEW_CACHE_TTL_SECONDS
+)
+
+review_flights: SingleFlight[str, CachedReview] = SingleFlight()
+ai_scheduler = AIScheduler()
+ai_breaker = CircuitBreaker()
+ai_provider: Optional[AIProvider] = None
+review_broadcaster = ReviewBroadcaster()
+near_duplicate_index: Optional[NearDuplicateIndex] = (
+    NearDuplicateIndex() if NEAR_DUPLICATE_DEDUP else None
+)
+
+
+def get_review_cache() -> TTLCache[str, CachedReview]:
+    return review_cache
 
 
 def get_pg_repo(session: AsyncSession = Depends(get_db)) -> SubmissionsPgRepo:
@@ -18,22 +42,115 @@ def get_mg_repo(db=Depends(get_mongo_db)) -> SubmissionsMongoRepo:
     return SubmissionsMongoRepo(db)
 
 
+def get_ai_scheduler() -> AIScheduler:
+    return ai_scheduler
+
+
+def get_ai_breaker() -> CircuitBreaker:
+    return ai_breaker
+
+
+def get_ai_provider() -> AIProvider:
+    # one per process, chosen by AI_PROVIDER
+    global ai_provider
+    if ai_provider is None:
+        ai_provider = create_ai_provider()
+    return ai_provider
+
+
 def get_ai() -> AIService:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise Exception(500, "OPENAI_API_KEY is not set on the server")
-    return AIService(AsyncOpenAI(api_key=api_key))
+    return AIService(get_ai_provider(), scheduler=ai_scheduler, breaker=ai_breaker)
+
+
+def build_background_service(session: AsyncSession) -> SubmissionsService:
+    # for work outside a request: own session, shared process-wide singletons
+    return SubmissionsService(
+        pg=SubmissionsPgRepo(session),
+        mg=SubmissionsMongoRepo(get_mongo_database()),
+        ai=get_ai(),
+        cache=review_cache,
+        broadcaster=review_broadcaster,
+        near_duplicates=near_duplicate_index,
+    )
+
+
+async def run_review_job(uuid: UUID) -> None:
+    async with SessionLocal() as session:
+        await build_background_service(session).complete_review(uuid)
+
+
+async def fail_review_job(uuid: UUID) -> None:
+    async with SessionLocal() as session:
+        await build_background_service(session).fail_review(uuid)
+
+
+review_jobs = ReviewJobQueue(process=run_review_job, fail=fail_review_job)
+
+
+async def resubmit_pending_reviews() -> int:
+    async with SessionLocal() as session:
+        uuids = await SubmissionsPgRepo(session).find_uuids_by_status(
+            SubmissionStatus.PENDING
+        )
+    for uuid in uuids:
+        review_jobs.submit(uuid)
+    return len(uuids)
+
+
+def get_review_jobs() -> ReviewJobQueue:
+    return review_jobs
 
 
 def get_submissions_service(
     pg: SubmissionsPgRepo = Depends(get_pg_repo),
     mg: SubmissionsMongoRepo = Depends(get_mg_repo),
     ai: AIService = Depends(get_ai),
+    cache: TTLCache[str, CachedReview] = Depends(get_review_cache),
 ) -> SubmissionsService:
-    return SubmissionsService(pg=pg, mg=mg, ai=ai)
+    return SubmissionsService(
+        pg=pg,
+        mg=mg,
+        ai=ai,
+        cache=cache,
+        inflight=review_flights,
+        jobs=review_jobs,
+        broadcaster=review_broadcaster,
+        near_duplicates=near_duplicate_index,
+    )
+
+
+async def rebuild_near_duplicate_index() -> int:
+    # the index lives in memory; refill it from the stores after a restart
+    if near_duplicate_index is None:
+        return 0
+    added = 0
+    mg = SubmissionsMongoRepo(get_mongo_database())
+    async with SessionLocal() as session:
+        async for rows in SubmissionsPgRepo(session).stream_review_keys():
+            keys = {str(row["mongo_id"]): row for row in rows}
+            docs = await mg.find_many(list(keys))
+            added += near_duplicate_index.extend(
+                (keys[doc.id]["hash"], doc.content, keys[doc.id]["language"])
+                for doc in docs
+                if doc.id in keys
+            )
+    return added
+
+
+def get_near_duplicate_index() -> Optional[NearDuplicateIndex]:
+    return near_duplicate_index
 
 
 GetSubmissionsService: TypeAlias = Annotated[
     SubmissionsService, Depends(get_submissions_service)
 ]
 GetAIService: TypeAlias = Annotated[AIService, Depends(get_ai)]
+GetAIScheduler: TypeAlias = Annotated[AIScheduler, Depends(get_ai_scheduler)]
+GetAIBreaker: TypeAlias = Annotated[CircuitBreaker, Depends(get_ai_breaker)]
+GetReviewJobs: TypeAlias = Annotated[ReviewJobQueue, Depends(get_review_jobs)]
+GetNearDuplicateIndex: TypeAlias = Annotated[
+    Optional[NearDuplicateIndex], Depends(get_near_duplicate_index)
+]
+GetReviewCache: TypeAlias = Annotated[
+    TTLCache[str, CachedReview], Depends(get_review_cache)
+]
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import time
+from typing import Any, AsyncIterator, Callable, TypeVar
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+C = TypeVar("C", bound=type)
+
+# Buckets reach past a minute because AI reviews routinely take tens of seconds.
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start until the last response byte is sent.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REPO_CALL_SECONDS = Histogram(
+    "repository_call_duration_seconds",
+    "Duration of repository calls, including full iteration of streamed results.",
+    ["store", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+AI_REQUEST_SECONDS = Histogram(
+    "ai_request_duration_seconds",
+    "Duration of non-streamed AI review calls.",
+    ["method"],
+    buckets=LATENCY_BUCKETS,
+)
+AI_STREAM_FIRST_TOKEN_SECONDS = Histogram(
+    "ai_stream_first_token_seconds",
+    "Time from starting a streamed AI review until the first text delta.",
+    buckets=LATENCY_BUCKETS,
+)
+AI_STREAM_SECONDS = Histogram(
+    "ai_stream_duration_seconds",
+    "Total duration of streamed AI reviews.",
+    buckets=LATENCY_BUCKETS,
+)
+AI_ERRORS = Counter(
+    "ai_errors_total",
+    "AI calls that failed, by error type.",
+    ["type"],
+)
+AI_TOKENS = Counter(
+    "ai_tokens_total",
+    "Tokens consumed by AI calls, as reported by the provider.",
+    ["kind"],
+)
+AI_CIRCUIT_STATE = Gauge(
+    "ai_circuit_state",
+    "AI provider circuit breaker state: 0 closed, 1 half-open, 2 open.",
+)
+AI_HEDGED_REQUESTS = Counter(
+    "ai_hedged_requests_total",
+    "AI calls that were hedged, by which call answered first.",
+    ["winner"],
+)
+REVIEW_DEDUP_HITS = Counter(
+    "review_dedup_hits_total",
+    "Submissions answered with an existing review instead of a new AI call.",
+    ["source"],
+)
+
+
+def instrumented(store: str) -> Callable[[C], C]:
+    """Class decorator timing every public async method of a repository."""
+
+    def decorate(cls: C) -> C:
+        for name, method in list(vars(cls).items()):
+            if name.startswith("_"):
+                continue
+            if inspect.isasyncgenfunction(method):
+                setattr(cls, name, _timed_stream(store, name, method))
+            elif inspect.iscoroutinefunction(method):
+                setattr(cls, name, _timed_call(store, name, method))
+        return cls
+
+    return decorate
+
+
+def _timed_call(
+    store: str, name: str, method: Callable[..., Any]
+) -> Callable[..., Any]:
+    histogram = REPO_CALL_SECONDS.labels(store=store, method=name)
+
+    @functools.wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+def _timed_stream(
+    store: str, name: str, method: Callable[..., AsyncIterator[Any]]
+) -> Callable[..., AsyncIterator[Any]]:
+    histogram = REPO_CALL_SECONDS.labels(store=store, method=name)
+
+    @functools.wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        started = time.perf_counter()
+        try:
+            async for item in method(*args, **kwargs):
+                yield item
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    """Records HTTP latency per route template.
+
+    Plain ASGI rather than BaseHTTPMiddleware so streamed responses (NDJSON
+    export, SSE, /review) are timed until their last chunk, not their headers.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # unmatched paths share one label so scanners can't blow up cardinality
+            template = getattr(route, "path", "unmatched")
+            HTTP_REQUEST_SECONDS.labels(
+                method=scope["method"], route=template, status=str(status)
+            ).observe(time.perf_counter() - started)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+def _mark_retrieved(fut: asyncio.Future) -> None:
+    # Followers may never await a failed call; reading the exception keeps
+    # asyncio from logging "exception was never retrieved".
+    if not fut.cancelled():
+        fut.exception()
+
+
+class SingleFlight(Generic[K, V]):
+    """Coalesces concurrent calls sharing a key into a single in-flight call.
+
+    The first caller for a key runs `fn`; callers arriving while it is still
+    running await the same result (or exception) instead of repeating the work.
+    """
+
+    def __init__(self) -> None:
+        self.shared = 0
+        self._calls: Dict[K, asyncio.Future[V]] = {}
+
+    def in_flight(self, key: K) -> bool:
+        return key in self._calls
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        while (pending := self._calls.get(key)) is not None:
+            self.shared += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The leader was cancelled, not us: retry and possibly take over.
+
+        fut: asyncio.Future[V] = asyncio.get_running_loop().create_future()
+        fut.add_done_callback(_mark_retrieved)
+        self._calls[key] = fut
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            self._calls.pop(key, None)
+            fut.cancel()
+            raise
+        except Exception as exc:
+            self._calls.pop(key, None)
+            fut.set_exception(exc)
+            raise
+        self._calls.pop(key, None)
+        fut.set_result(result)
+        return result
@@ -0,0 +1,84 @@
+"""Recompute stored submission hashes with the canonical hash.
+
+Walks submissions in id order, a batch at a time, reads each row's code from
+Mongo and rewrites `hash` where it changed, so rows written before canonical
+hashing dedup against reformatted resubmissions. Safe to re-run, and resumable
+with --after-id. When two rows canonicalise to the same hash the older one
+keeps it and the newer stays on its legacy hash, because the column is unique.
+
+    python -m app.jobs.rehash_submissions --batch-size 500
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Dict
+
+from app.core.db import SessionLocal, close_mongo_client, engine, get_mongo_database
+from app.repositories.mongo.submissions import SubmissionsMongoRepo
+from app.repositories.postgre.submissions import SubmissionsPgRepo
+from app.services.submissions import compute_code_hash
+
+logger = logging.getLogger("app.jobs.rehash_submissions")
+
+
+async def rehash_submissions(
+    pg: SubmissionsPgRepo,
+    mg: SubmissionsMongoRepo,
+    *,
+    batch_size: int = 500,
+    after_id: int = 0,
+) -> Dict[str, int]:
+    stats = {"scanned": 0, "updated": 0, "unchanged": 0, "missing": 0, "kept": 0}
+    while True:
+        rows = await pg.find_hash_batch(after_id=after_id, limit=batch_size)
+        if not rows:
+            return stats
+        after_id = rows[-1]["id"]
+        stats["scanned"] += len(rows)
+
+        docs = await mg.find_many([str(row["mongo_id"]) for row in rows])
+        contents = {doc.id: doc.content for doc in docs}
+        changes: Dict[int, str] = {}
+        claimed = set()
+        for row in rows:
+            content = contents.get(str(row["mongo_id"]))
+            if content is None:
+                stats["missing"] += 1
+                continue
+            new_hash = compute_code_hash(content, row["language"])
+            if new_hash == row["hash"]:
+                stats["unchanged"] += 1
+            elif new_hash in claimed:
+                stats["kept"] += 1
+            else:
+                claimed.add(new_hash)
+                changes[row["id"]] = new_hash
+
+        updated = await pg.update_hashes(changes)
+        stats["updated"] += updated
+        stats["kept"] += len(changes) - updated
+        logger.info(f"Rehashed up to id {after_id}: {stats}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        async with SessionLocal() as session:
+            stats = await rehash_submissions(
+                SubmissionsPgRepo(session),
+                SubmissionsMongoRepo(get_mongo_database()),
+                batch_size=args.batch_size,
+                after_id=args.after_id,
+            )
+        logger.info(f"Done: {stats}")
+    finally:
+        close_mongo_client()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--after-id", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -1,12 +1,31 @@
+import asyncio
 import logging
+import os
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
-from app.core.db import Base, engine
+from app.core.ai_client import close_ai_client, get_ai_client
+from app.core.db import (
+    Base,
+    check_stores,
+    close_mongo_client,
+    engine,
+    get_mongo_database,
+)
+from app.core.di import (
+    get_ai_provider,
+    rebuild_near_duplicate_index,
+    resubmit_pending_reviews,
+    review_jobs,
+)
+from app.services.ai_providers import AI_PROVIDER
 from app.api.submissions import router as submissions_router
 from app.api.ai import router as ai_router
+from app.api.ops import router as ops_router
+from app.api.metrics import router as metrics_router
+from app.core.metrics import MetricsMiddleware
 
 
 LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s - %(message)s"
@@ -19,13 +38,47 @@ async def lifespan(app: FastAPI):
     # Startup
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    get_mongo_database()
+    stores = await check_stores()
+    for store, state in stores.items():
+        if state != "ok":
+            logger.warning(f"{store} is not reachable at startup: {state}")
+    if AI_PROVIDER != "openai":
+        get_ai_provider()  # fails fast on an unknown provider name
+        logger.warning(f"AI_PROVIDER={AI_PROVIDER}: reviews do not come from OpenAI")
+    elif os.getenv("OPENAI_API_KEY"):
+        get_ai_client()
+    else:
+        logger.warning("OPENAI_API_KEY is not set; AI endpoints will fail")
+    await review_jobs.start()
+    resubmitted = await resubmit_pending_reviews()
+    if resubmitted:
+        logger.info(f"Re-queued {resubmitted} pending reviews")
+    # filled in the background so startup doesn't wait on a full table scan
+    rebuild = asyncio.create_task(_rebuild_near_duplicates())
     try:
         yield
     finally:
         # Shutdown
+        rebuild.cancel()
+        with suppress(asyncio.CancelledError):
+            await rebuild
+        await review_jobs.stop()
+        await close_ai_client()
+        close_mongo_client()
         await engine.dispose()
 
 
+async def _rebuild_near_duplicates() -> None:
+    try:
+        added = await rebuild_near_duplicate_index()
+    except Exception:
+        logger.exception("Rebuilding the near-duplicate index failed")
+        return
+    if added:
+        logger.info(f"Indexed {added} submissions for near-duplicate lookup")
+
+
 app = FastAPI(
     lifespan=lifespan,
     title="Code Review Mentor",
@@ -33,6 +86,7 @@ app = FastAPI(
     version="0.1.0",
 )
 
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -43,6 +97,8 @@ app.add_middleware(
 
 app.include_router(submissions_router)
 app.include_router(ai_router)
+app.include_router(ops_router)
+app.include_router(metrics_router)
 
 
 @app.exception_handler(Exception)
@@ -0,0 +1,41 @@
+"""Add listing keyset indexes
+
+Revision ID: 3f6d2c1a9b7e
+Revises: 50cf97f5269d
+Create Date: 2026-10-17 09:12:44.318207
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f6d2c1a9b7e"
+down_revision: Union[str, None] = "50cf97f5269d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # backs ORDER BY created_at DESC, id DESC and the (created_at, id) < cursor seek
+    op.create_index(
+        "ix_submissions_created_at_id",
+        "submissions",
+        ["created_at", "id"],
+        unique=False,
+    )
+    # lets title LIKE 'prefix%' use a btree regardless of the database collation
+    op.create_index(
+        "ix_submissions_title_pattern",
+        "submissions",
+        ["title"],
+        unique=False,
+        postgresql_ops={"title": "varchar_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_submissions_title_pattern", table_name="submissions")
+    op.drop_index("ix_submissions_created_at_id", table_name="submissions")
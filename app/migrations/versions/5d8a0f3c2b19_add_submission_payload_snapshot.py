@@ -0,0 +1,36 @@
+"""Add submission payload snapshot
+
+Revision ID: 5d8a0f3c2b19
+Revises: c7b3e91f4a6d
+Create Date: 2026-10-17 15:20:48.117530
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d8a0f3c2b19"
+down_revision: Union[str, None] = "c7b3e91f4a6d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # nullable: rows written before PAYLOAD_READ_MODEL keep reading from Mongo
+    op.add_column(
+        "submissions",
+        sa.Column(
+            "payload_snapshot",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("submissions", "payload_snapshot")
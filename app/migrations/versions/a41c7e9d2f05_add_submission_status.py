@@ -0,0 +1,44 @@
+"""Add submission status
+
+Revision ID: a41c7e9d2f05
+Revises: 3f6d2c1a9b7e
+Create Date: 2026-10-17 11:02:17.540913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a41c7e9d2f05"
+down_revision: Union[str, None] = "3f6d2c1a9b7e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+submission_status = sa.Enum("PENDING", "COMPLETED", "FAILED", name="submissionstatus")
+
+
+def upgrade() -> None:
+    submission_status.create(op.get_bind(), checkfirst=True)
+    # existing rows were all reviewed synchronously
+    op.add_column(
+        "submissions",
+        sa.Column(
+            "status",
+            submission_status,
+            nullable=False,
+            server_default="COMPLETED",
+        ),
+    )
+    op.create_index(
+        op.f("ix_submissions_status"), "submissions", ["status"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_submissions_status"), table_name="submissions")
+    op.drop_column("submissions", "status")
+    submission_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,47 @@
+"""Unique submission hash
+
+Revision ID: c7b3e91f4a6d
+Revises: a41c7e9d2f05
+Create Date: 2026-10-17 13:41:09.602114
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7b3e91f4a6d"
+down_revision: Union[str, None] = "a41c7e9d2f05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 829aba2a9e0a declared this index unique, but the model did not, so tables
+    # built by metadata.create_all ended up with a plain index and duplicates.
+    # Keep one row per hash: a reviewed row over a failed one, then the oldest.
+    # The Mongo payloads of removed rows are left in place.
+    op.execute(
+        """
+        DELETE FROM submissions AS s
+        USING (
+            SELECT id,
+                   row_number() OVER (
+                       PARTITION BY hash
+                       ORDER BY (status = 'FAILED'), id
+                   ) AS rank
+            FROM submissions
+        ) AS ranked
+        WHERE s.id = ranked.id AND ranked.rank > 1
+        """
+    )
+    op.drop_index(op.f("ix_submissions_hash"), table_name="submissions")
+    op.create_index(op.f("ix_submissions_hash"), "submissions", ["hash"], unique=True)
+
+
+def downgrade() -> None:
+    # the previous revisions already expect a unique index; removed duplicates
+    # are not restored
+    pass
@@ -0,0 +1,31 @@
+"""Add submission review claim
+
+Revision ID: e2a94c7d1b58
+Revises: 5d8a0f3c2b19
+Create Date: 2026-10-17 23:40:12.905114
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a94c7d1b58"
+down_revision: Union[str, None] = "5d8a0f3c2b19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL means no worker is reviewing the row
+    op.add_column(
+        "submissions",
+        sa.Column("review_claimed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("submissions", "review_claimed_at")
@@ -3,9 +3,10 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 from enum import Enum
+from typing import Any, Dict, Optional
 
-from sqlalchemy import String, DateTime, func, Integer, Enum as SqlEnum
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy import String, DateTime, func, Integer, Index, Enum as SqlEnum
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.db import Base
@@ -17,8 +18,22 @@ class Language(str, Enum):
     JAVA = "Java"
 
 
+class SubmissionStatus(str, Enum):
+    PENDING = "pending"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class Submission(Base):
     __tablename__ = "submissions"
+    __table_args__ = (
+        Index("ix_submissions_created_at_id", "created_at", "id"),
+        Index(
+            "ix_submissions_title_pattern",
+            "title",
+            postgresql_ops={"title": "varchar_pattern_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     uuid: Mapped[uuid.UUID] = mapped_column(
@@ -32,6 +47,7 @@ class Submission(Base):
     hash: Mapped[str] = mapped_column(
         String(64),
         nullable=False,
+        unique=True,
         index=True,
     )
     short_feedback: Mapped[str] = mapped_column(
@@ -41,6 +57,21 @@ class Submission(Base):
     language: Mapped[Language] = mapped_column(
         SqlEnum(Language), nullable=False, index=True
     )
+    status: Mapped[SubmissionStatus] = mapped_column(
+        SqlEnum(SubmissionStatus),
+        nullable=False,
+        default=SubmissionStatus.COMPLETED,
+        server_default=SubmissionStatus.COMPLETED.name,
+        index=True,
+    )
+    # set while a review worker holds a pending row; stale claims can be retaken
+    review_claimed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # read model: a copy of the Mongo payload, filled only with PAYLOAD_READ_MODEL
+    payload_snapshot: Mapped[Optional[Dict[str, Any]]] = mapped_column(
+        JSONB(none_as_null=True), nullable=True, deferred=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -1,9 +1,13 @@
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Sequence
 from bson import ObjectId
+from app.core.metrics import instrumented
 from app.models.mongo import SubmissionDocument
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+PAYLOAD_PROJECTION = {"content": 1, "ai_response": 1}
 
+
+@instrumented("mongo")
 class SubmissionsMongoRepo:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
@@ -15,13 +19,64 @@ class SubmissionsMongoRepo:
             return SubmissionDocument(**raw)
         return None
 
+    async def find_many(self, mongo_ids: Sequence[str]) -> List[SubmissionDocument]:
+        object_ids = [ObjectId(i) for i in set(mongo_ids) if ObjectId.is_valid(i)]
+        if not object_ids:
+            return []
+        results = []
+        cursor = self.db["submissions"].find(
+            {"_id": {"$in": object_ids}}, PAYLOAD_PROJECTION
+        )
+        async for raw in cursor:
+            raw["_id"] = str(raw["_id"])
+            results.append(SubmissionDocument(**raw))
+        return results
+
     async def find_all(self) -> List[SubmissionDocument]:
         results = []
         async for doc in self.db["submissions"].find({}):
             results.append(SubmissionDocument(**doc))
         return results
 
-    async def insert(self, user_input: dict[str, Any], ai_text: str | None) -> str:
+    async def insert(
+        self,
+        user_input: dict[str, Any],
+        ai_text: str | None,
+        mongo_id: Optional[str] = None,
+    ) -> str:
         payload_for_response: Dict[str, Any] = {**user_input, "ai_response": ai_text}
+        if mongo_id is not None:
+            payload_for_response["_id"] = ObjectId(mongo_id)
         ins = await self.db["submissions"].insert_one(payload_for_response)
         return str(ins.inserted_id)
+
+    async def insert_many(
+        self, payloads: Sequence[tuple[dict[str, Any], str | None]]
+    ) -> List[str]:
+        if not payloads:
+            return []
+        docs = [
+            {**user_input, "ai_response": ai_text} for user_input, ai_text in payloads
+        ]
+        ins = await self.db["submissions"].insert_many(docs, ordered=True)
+        return [str(inserted_id) for inserted_id in ins.inserted_ids]
+
+    async def delete_many(self, mongo_ids: Sequence[str]) -> None:
+        object_ids = [ObjectId(i) for i in set(mongo_ids) if ObjectId.is_valid(i)]
+        if object_ids:
+            await self.db["submissions"].delete_many({"_id": {"$in": object_ids}})
+
+    async def update_ai_response(self, mongo_id: str, ai_text: str) -> None:
+        await self.db["submissions"].update_one(
+            {"_id": ObjectId(mongo_id)}, {"$set": {"ai_response": ai_text}}
+        )
+
+    async def find_review(self, code_hash: str) -> Optional[str]:
+        raw = await self.db["reviews"].find_one({"_id": code_hash})
+        return raw.get("ai_response") if raw else None
+
+    async def save_review(self, code_hash: str, ai_text: str) -> None:
+        # keyed by the content hash, so repeated saves overwrite instead of piling up
+        await self.db["reviews"].update_one(
+            {"_id": code_hash}, {"$set": {"ai_response": ai_text}}, upsert=True
+        )
@@ -1,31 +1,185 @@
-from typing import Optional, Sequence
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, cast
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy import (
+    Integer,
+    RowMapping,
+    Select,
+    String,
+    column,
+    delete,
+    func,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.engine import CursorResult
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import aliased, undefer
 from uuid import UUID
-from app.models.postgre import Submission, Language
+from app.core.metrics import instrumented
+from app.models.postgre import Submission, Language, SubmissionStatus
 
+LISTING_COLUMNS = (
+    Submission.id,
+    Submission.uuid,
+    Submission.title,
+    Submission.short_feedback,
+    Submission.language,
+    Submission.mongo_id,
+    Submission.status,
+    Submission.created_at,
+    Submission.updated_at,
+)
 
+
+def _upsert(stmt: Insert) -> Insert:
+    # hash is unique: a live row wins and the insert returns nothing, while a
+    # FAILED row is taken over in place so the code can be reviewed again
+    return stmt.on_conflict_do_update(
+        index_elements=[Submission.hash],
+        set_={
+            "title": stmt.excluded.title,
+            "language": stmt.excluded.language,
+            "mongo_id": stmt.excluded.mongo_id,
+            "short_feedback": stmt.excluded.short_feedback,
+            "status": stmt.excluded.status,
+            "payload_snapshot": stmt.excluded.payload_snapshot,
+            "updated_at": func.now(),
+        },
+        where=Submission.status == SubmissionStatus.FAILED,
+    )
+
+
+def _listing(
+    stmt: Select[Any],
+    *,
+    limit: int,
+    after: Optional[tuple[datetime, int]],
+    language: Optional[Language],
+    title_prefix: Optional[str],
+) -> Select[Any]:
+    # newest first; (created_at, id) is the keyset so pages stay index-backed
+    if language is not None:
+        stmt = stmt.where(Submission.language == language)
+    if title_prefix:
+        stmt = stmt.where(Submission.title.startswith(title_prefix, autoescape=True))
+    if after is not None:
+        stmt = stmt.where(
+            tuple_(Submission.created_at, Submission.id)
+            < tuple_(literal(after[0]), literal(after[1]))
+        )
+    return stmt.order_by(Submission.created_at.desc(), Submission.id.desc()).limit(
+        limit
+    )
+
+
+@instrumented("postgres")
 class SubmissionsPgRepo:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def find_by_uuid(self, uuid: UUID) -> Optional["Submission"]:
-        res = await self.db.execute(select(Submission).where(Submission.uuid == uuid))
+    async def find_by_uuid(
+        self, uuid: UUID, *, with_payload: bool = False
+    ) -> Optional["Submission"]:
+        stmt = select(Submission).where(Submission.uuid == uuid)
+        if with_payload:
+            stmt = stmt.options(undefer(Submission.payload_snapshot))
+        res = await self.db.execute(stmt)
         return res.scalars().first()
 
     async def find_by_hash(self, code_hash: str) -> Optional["Submission"]:
         res = await self.db.execute(
             select(Submission).where(Submission.hash == code_hash)
         )
-        return res.scalars().first()
+        return res.scalar_one_or_none()
 
-    async def find_all(self) -> Sequence["Submission"]:
+    async def find_by_hashes(self, hashes: Sequence[str]) -> Sequence["Submission"]:
+        if not hashes:
+            return []
         res = await self.db.execute(
-            select(Submission).limit(50)
-        )  # getting only the last 50
+            select(Submission)
+            .where(Submission.hash.in_(set(hashes)))
+            .order_by(Submission.id)
+        )
+        return res.scalars().all()
+
+    async def find_all(
+        self,
+        *,
+        limit: int = 50,
+        after: Optional[tuple[datetime, int]] = None,
+        language: Optional[Language] = None,
+        title_prefix: Optional[str] = None,
+    ) -> Sequence["Submission"]:
+        stmt = _listing(
+            select(Submission),
+            limit=limit,
+            after=after,
+            language=language,
+            title_prefix=title_prefix,
+        )
+        res = await self.db.execute(stmt)
         return res.scalars().all()
 
+    async def find_all_rows(
+        self,
+        *,
+        limit: int = 50,
+        after: Optional[tuple[datetime, int]] = None,
+        language: Optional[Language] = None,
+        title_prefix: Optional[str] = None,
+    ) -> Sequence[RowMapping]:
+        # same page as find_all, but only the listed columns as plain mappings,
+        # skipping ORM hydration and the identity map
+        stmt = _listing(
+            select(*LISTING_COLUMNS),
+            limit=limit,
+            after=after,
+            language=language,
+            title_prefix=title_prefix,
+        )
+        res = await self.db.execute(stmt)
+        return res.mappings().all()
+
+    async def stream_rows(
+        self, batch_size: int = 500
+    ) -> AsyncIterator[Sequence[RowMapping]]:
+        # Runs on its own connection so a streaming response can keep reading
+        # after the request-scoped session is closed. asyncpg serves yield_per
+        # from a server-side cursor, so only one batch is held in memory.
+        stmt = (
+            select(*LISTING_COLUMNS)
+            .order_by(Submission.id)
+            .execution_options(yield_per=batch_size)
+        )
+        engine = cast(AsyncEngine, self.db.bind)
+        async with engine.connect() as conn:
+            result = await conn.stream(stmt)
+            async for rows in result.mappings().partitions(batch_size):
+                yield rows
+
+    async def stream_review_keys(
+        self, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[RowMapping]]:
+        # hash, language and mongo_id of every submission that has (or will
+        # have) a review; used to rebuild in-memory indexes at startup
+        stmt = (
+            select(Submission.hash, Submission.language, Submission.mongo_id)
+            .where(Submission.status != SubmissionStatus.FAILED)
+            .order_by(Submission.id)
+            .execution_options(yield_per=batch_size)
+        )
+        engine = cast(AsyncEngine, self.db.bind)
+        async with engine.connect() as conn:
+            result = await conn.stream(stmt)
+            async for rows in result.mappings().partitions(batch_size):
+                yield rows
+
     async def create(
         self,
         *,
@@ -34,19 +188,196 @@ class SubmissionsPgRepo:
         mongo_id: str,
         code_hash: str,
         short_feedback: str,
-    ) -> "Submission":
-        sub = Submission(
-            title=title,
-            language=language,
-            mongo_id=mongo_id,
-            short_feedback=short_feedback,
-            hash=code_hash,
+        status: SubmissionStatus = SubmissionStatus.COMPLETED,
+        payload_snapshot: Optional[Dict[str, Any]] = None,
+    ) -> Optional["Submission"]:
+        # Dedup and insert in one statement. Returns None when another request
+        # already stored this hash; the caller should read that row instead.
+        stmt = (
+            _upsert(
+                insert(Submission).values(
+                    title=title,
+                    language=language,
+                    mongo_id=mongo_id,
+                    short_feedback=short_feedback,
+                    hash=code_hash,
+                    status=status,
+                    payload_snapshot=payload_snapshot,
+                )
+            )
+            .returning(Submission)
+            .execution_options(populate_existing=True)
         )
         try:
-            self.db.add(sub)
+            sub = (await self.db.scalars(stmt)).one_or_none()
             await self.db.commit()
-            await self.db.refresh(sub)
             return sub
         except SQLAlchemyError:
             await self.db.rollback()
             raise
+
+    async def create_many(
+        self, rows: Sequence[Dict[str, Any]]
+    ) -> Sequence["Submission"]:
+        # One transaction for the whole batch. SQLAlchemy's insertmanyvalues
+        # turns this into multi-row INSERT ... VALUES ... RETURNING pages on
+        # asyncpg. Rows whose hash is already stored are skipped, so only the
+        # inserted rows come back (in no particular order); match on mongo_id.
+        if not rows:
+            return []
+        stmt = (
+            _upsert(insert(Submission))
+            .returning(Submission)
+            .execution_options(populate_existing=True)
+        )
+        try:
+            res = await self.db.scalars(stmt, rows)
+            subs = res.all()
+            await self.db.commit()
+            return subs
+        except SQLAlchemyError:
+            await self.db.rollback()
+            raise
+
+    async def update_review(
+        self,
+        uuid: UUID,
+        *,
+        short_feedback: str,
+        status: SubmissionStatus,
+        payload_snapshot: Optional[Dict[str, Any]] = None,
+    ) -> Optional["Submission"]:
+        values: Dict[str, Any] = {
+            "short_feedback": short_feedback,
+            "status": status,
+            "review_claimed_at": None,
+        }
+        if payload_snapshot is not None:
+            values["payload_snapshot"] = payload_snapshot
+        stmt = (
+            update(Submission)
+            .where(Submission.uuid == uuid)
+            .values(**values)
+            .returning(Submission)
+        )
+        try:
+            res = await self.db.execute(stmt)
+            sub = res.scalars().first()
+            await self.db.commit()
+            return sub
+        except SQLAlchemyError:
+            await self.db.rollback()
+            raise
+
+    async def claim_review(
+        self, uuid: UUID, *, stale_after: float
+    ) -> Optional["Submission"]:
+        """Take a pending row for review; None if it is done or held by another
+        worker whose claim is younger than `stale_after` seconds."""
+        stmt = (
+            update(Submission)
+            .where(
+                Submission.uuid == uuid,
+                Submission.status == SubmissionStatus.PENDING,
+                or_(
+                    Submission.review_claimed_at.is_(None),
+                    Submission.review_claimed_at
+                    < func.now() - timedelta(seconds=stale_after),
+                ),
+            )
+            .values(review_claimed_at=func.now())
+            .returning(Submission)
+        )
+        try:
+            res = await self.db.execute(stmt)
+            sub = res.scalars().first()
+            await self.db.commit()
+            return sub
+        except SQLAlchemyError:
+            await self.db.rollback()
+            raise
+
+    async def release_review(self, uuid: UUID) -> None:
+        stmt = (
+            update(Submission)
+            .where(
+                Submission.uuid == uuid,
+                Submission.status == SubmissionStatus.PENDING,
+            )
+            .values(review_claimed_at=None)
+        )
+        try:
+            await self.db.execute(stmt)
+            await self.db.commit()
+        except SQLAlchemyError:
+            await self.db.rollback()
+            raise
+
+    async def delete(self, uuid: UUID) -> None:
+        try:
+            await self.db.execute(delete(Submission).where(Submission.uuid == uuid))
+            await self.db.commit()
+        except SQLAlchemyError:
+            await self.db.rollback()
+            raise
+
+    async def find_hash_batch(
+        self, *, after_id: int = 0, limit: int = 500
+    ) -> Sequence[RowMapping]:
+        stmt = (
+            select(
+                Submission.id, Submission.hash, Submission.language, Submission.mongo_id
+            )
+            .where(Submission.id > after_id)
+            .order_by(Submission.id)
+            .limit(limit)
+        )
+        res = await self.db.execute(stmt)
+        return res.mappings().all()
+
+    async def update_hashes(self, hashes: Dict[int, str]) -> int:
+        """Set `hash` per row id in one statement; returns rows changed.
+
+        Rows whose new hash already belongs to another row are left alone,
+        since the column is unique.
+        """
+        if not hashes:
+            return 0
+        new = values(
+            column("id", Integer), column("hash", String), name="new_hashes"
+        ).data(list(hashes.items()))
+        other = aliased(Submission)
+        stmt = (
+            update(Submission)
+            .where(Submission.id == new.c.id)
+            .where(~select(other.id).where(other.hash == new.c.hash).exists())
+            # a rehash is not an edit; keep updated_at as it was
+            .values(hash=new.c.hash, updated_at=Submission.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            res = await self.db.execute(stmt)
+            await self.db.commit()
+            return cast(CursorResult[Any], res).rowcount
+        except SQLAlchemyError:
+            await self.db.rollback()
+            raise
+
+    async def find_review_state(self, uuid: UUID) -> Optional[RowMapping]:
+        # status and mongo_id on a dedicated connection; polled from SSE
+        # bodies, which run after the request-scoped session is closed
+        stmt = select(Submission.status, Submission.mongo_id).where(
+            Submission.uuid == uuid
+        )
+        engine = cast(AsyncEngine, self.db.bind)
+        async with engine.connect() as conn:
+            res = await conn.execute(stmt)
+            return res.mappings().first()
+
+    async def find_uuids_by_status(self, status: SubmissionStatus) -> Sequence[UUID]:
+        res = await self.db.execute(
+            select(Submission.uuid)
+            .where(Submission.status == status)
+            .order_by(Submission.id)
+        )
+        return res.scalars().all()
@@ -1,13 +1,39 @@
-from typing import Protocol, Any, Optional, Sequence, List
+from datetime import datetime
+from typing import Protocol, Any, AsyncIterator, Dict, Optional, Sequence, List
 from uuid import UUID
-from app.models.postgre import Submission, Language
+from sqlalchemy import RowMapping
+from app.models.postgre import Submission, Language, SubmissionStatus
 from app.models.mongo import SubmissionDocument
 
 
 class SubmissionsPgRepo(Protocol):
-    async def find_by_uuid(self, uuid: UUID) -> Optional["Submission"]: ...
-    async def find_all(self) -> Sequence["Submission"]: ...
+    async def find_by_uuid(
+        self, uuid: UUID, *, with_payload: bool = False
+    ) -> Optional["Submission"]: ...
+    async def find_all(
+        self,
+        *,
+        limit: int = 50,
+        after: Optional[tuple[datetime, int]] = None,
+        language: Optional[Language] = None,
+        title_prefix: Optional[str] = None,
+    ) -> Sequence["Submission"]: ...
+    async def find_all_rows(
+        self,
+        *,
+        limit: int = 50,
+        after: Optional[tuple[datetime, int]] = None,
+        language: Optional[Language] = None,
+        title_prefix: Optional[str] = None,
+    ) -> Sequence[RowMapping]: ...
     async def find_by_hash(self, code_hash: str) -> Optional["Submission"]: ...
+    async def find_by_hashes(self, hashes: Sequence[str]) -> Sequence["Submission"]: ...
+    def stream_rows(
+        self, batch_size: int = 500
+    ) -> AsyncIterator[Sequence[RowMapping]]: ...
+    def stream_review_keys(
+        self, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[RowMapping]]: ...
     async def create(
         self,
         *,
@@ -16,10 +42,45 @@ class SubmissionsPgRepo(Protocol):
         mongo_id: str,
         code_hash: str,
         short_feedback: str,
-    ) -> "Submission": ...
+        status: SubmissionStatus = SubmissionStatus.COMPLETED,
+        payload_snapshot: Optional[Dict[str, Any]] = None,
+    ) -> Optional["Submission"]: ...
+    async def create_many(
+        self, rows: Sequence[Dict[str, Any]]
+    ) -> Sequence["Submission"]: ...
+    async def update_review(
+        self,
+        uuid: UUID,
+        *,
+        short_feedback: str,
+        status: SubmissionStatus,
+        payload_snapshot: Optional[Dict[str, Any]] = None,
+    ) -> Optional["Submission"]: ...
+    async def claim_review(
+        self, uuid: UUID, *, stale_after: float
+    ) -> Optional["Submission"]: ...
+    async def release_review(self, uuid: UUID) -> None: ...
+    async def delete(self, uuid: UUID) -> None: ...
+    async def find_review_state(self, uuid: UUID) -> Optional[RowMapping]: ...
+    async def find_uuids_by_status(
+        self, status: SubmissionStatus
+    ) -> Sequence[UUID]: ...
 
 
 class SubmissionsMongoRepo(Protocol):
     async def find(self, mongo_id: str) -> Optional[SubmissionDocument]: ...
+    async def find_many(self, mongo_ids: Sequence[str]) -> List[SubmissionDocument]: ...
     async def find_all(self) -> List[SubmissionDocument]: ...
-    async def insert(self, user_input: dict[str, Any], ai_text: str | None) -> str: ...
+    async def insert(
+        self,
+        user_input: dict[str, Any],
+        ai_text: str | None,
+        mongo_id: Optional[str] = None,
+    ) -> str: ...
+    async def insert_many(
+        self, payloads: Sequence[tuple[dict[str, Any], str | None]]
+    ) -> List[str]: ...
+    async def delete_many(self, mongo_ids: Sequence[str]) -> None: ...
+    async def update_ai_response(self, mongo_id: str, ai_text: str) -> None: ...
+    async def find_review(self, code_hash: str) -> Optional[str]: ...
+    async def save_review(self, code_hash: str, ai_text: str) -> None: ...
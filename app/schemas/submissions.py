@@ -1,8 +1,8 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 from uuid import UUID
-from app.models.postgre import Language
+from app.models.postgre import Language, SubmissionStatus
 
 
 class CodePayload(BaseModel):
@@ -18,6 +18,10 @@ class SubmissionCreate(BaseModel):
     payload: CodePayload
 
 
+class SubmissionBatchCreate(BaseModel):
+    items: List[SubmissionCreate] = Field(..., min_length=1, max_length=500)
+
+
 class SubmissionUpdate(BaseModel):
     title: Optional[str] = Field(None, max_length=255)
     payload: Optional[CodePayload] = None
@@ -29,6 +33,7 @@ class SubmissionWithPayloadOut(BaseModel):
     language: Language
     created_at: datetime
     updated_at: datetime
+    status: SubmissionStatus = SubmissionStatus.COMPLETED
     payload: Optional[CodePayload] = None
 
     model_config = ConfigDict(from_attributes=True)
@@ -41,3 +46,19 @@ class SubmissionOut(BaseModel):
     language: Language
     created_at: datetime
     updated_at: datetime
+    status: SubmissionStatus = SubmissionStatus.COMPLETED
+    payload: Optional[CodePayload] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SubmissionPage(BaseModel):
+    items: List[SubmissionOut]
+    next_cursor: Optional[str] = None
+
+
+class SubmissionBatchItemOut(BaseModel):
+    index: int
+    status: Literal["created", "duplicate", "error"]
+    submission: Optional[SubmissionWithPayloadOut] = None
+    detail: Optional[str] = None
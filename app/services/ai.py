@@ -1,12 +1,469 @@
-from typing import List, Union, AsyncGenerator, cast
-from openai import AsyncOpenAI
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    AsyncGenerator,
+    cast,
+)
+from openai.types import CompletionUsage
 from openai.types.chat import (
     ChatCompletionSystemMessageParam,
     ChatCompletionUserMessageParam,
 )
+from app.core.ai_client import AIConfigurationError
+from app.core.config import env_bool
+from app.core.metrics import (
+    AI_CIRCUIT_STATE,
+    AI_ERRORS,
+    AI_HEDGED_REQUESTS,
+    AI_REQUEST_SECONDS,
+    AI_STREAM_FIRST_TOKEN_SECONDS,
+    AI_STREAM_SECONDS,
+    AI_TOKENS,
+)
 from app.schemas.submissions import SubmissionCreate
+from app.services.ai_providers import AIProvider
 from app.schemas.ai import ReviewPayload
-from openai import RateLimitError, APIError, APIConnectionError
+from openai import RateLimitError, APIError, APIConnectionError, APIStatusError
+
+logger = logging.getLogger("app.services.ai")
+
+T = TypeVar("T")
+
+OPENAI_RPM: int = int(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM: int = int(os.getenv("OPENAI_TPM", "200000"))
+OPENAI_MAX_CONCURRENCY: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+OPENAI_QUEUE_TIMEOUT: float = float(os.getenv("OPENAI_QUEUE_TIMEOUT", "30"))
+OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+OPENAI_EXPECTED_COMPLETION_TOKENS: int = int(
+    os.getenv("OPENAI_EXPECTED_COMPLETION_TOKENS", "400")
+)
+OPENAI_BREAKER_WINDOW: int = int(os.getenv("OPENAI_BREAKER_WINDOW", "50"))
+OPENAI_BREAKER_MIN_CALLS: int = int(os.getenv("OPENAI_BREAKER_MIN_CALLS", "10"))
+OPENAI_BREAKER_ERROR_RATE: float = float(os.getenv("OPENAI_BREAKER_ERROR_RATE", "0.5"))
+OPENAI_BREAKER_SLOW_SECONDS: float = float(
+    os.getenv("OPENAI_BREAKER_SLOW_SECONDS", "30")
+)
+OPENAI_BREAKER_SLOW_RATE: float = float(os.getenv("OPENAI_BREAKER_SLOW_RATE", "0.8"))
+OPENAI_BREAKER_OPEN_SECONDS: float = float(
+    os.getenv("OPENAI_BREAKER_OPEN_SECONDS", "30")
+)
+# Hedging duplicates slow calls, so it spends request and token budget.
+OPENAI_HEDGE: bool = env_bool("OPENAI_HEDGE")
+OPENAI_HEDGE_MIN_DELAY: float = float(os.getenv("OPENAI_HEDGE_MIN_DELAY", "2"))
+OPENAI_HEDGE_QUANTILE = 0.95
+
+
+class AIUnavailableError(Exception):
+    """The provider stayed rate limited, or the call could not be admitted in time."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AICircuitOpenError(AIUnavailableError):
+    """The circuit breaker is open, so the provider was not called."""
+
+
+def retry_after_seconds(exc: RateLimitError) -> Optional[float]:
+    headers = exc.response.headers if exc.response is not None else {}
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass  # HTTP-date form; fall back to our own backoff
+    return None
+
+
+def ai_error_type(exc: BaseException) -> str:
+    if isinstance(exc, AICircuitOpenError):
+        return "circuit_open"
+    if isinstance(exc, AIUnavailableError):
+        # an error surfaced as unavailable keeps its own type
+        cause = exc.__cause__
+        if cause is not None and not isinstance(cause, RateLimitError):
+            return ai_error_type(cause)
+        return "unavailable"
+    if isinstance(exc, AIConfigurationError):
+        return "configuration"
+    if isinstance(exc, RateLimitError):
+        return "rate_limited"
+    if isinstance(exc, APIConnectionError):
+        return "connection"
+    if isinstance(exc, APIError):
+        return "api_error"
+    return "unexpected"
+
+
+def is_provider_failure(exc: BaseException) -> bool:
+    # 429s are paced by the scheduler and 4xx are our own mistakes; neither
+    # says the provider is unhealthy
+    if isinstance(exc, (RateLimitError, AIUnavailableError)):
+        return False
+    if isinstance(exc, APIStatusError):
+        return exc.status_code >= 500 or exc.status_code == 408
+    return isinstance(exc, (APIError, asyncio.TimeoutError))
+
+
+class TokenBucket:
+    def __init__(
+        self, per_minute: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay_for(self, amount: float) -> float:
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def consume(self, amount: float) -> None:
+        # may go negative when actual usage exceeds the estimate; later callers wait
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+class AIScheduler:
+    """Shared admission control for outbound OpenAI calls.
+
+    Calls wait (up to `queue_timeout`) for request and token budget plus a
+    concurrency slot. The concurrency limit grows additively on success and
+    halves on every 429. Rate-limited calls are retried with jittered
+    exponential backoff, never sooner than the provider's Retry-After.
+    """
+
+    def __init__(
+        self,
+        rpm: int = OPENAI_RPM,
+        tpm: int = OPENAI_TPM,
+        max_concurrency: int = OPENAI_MAX_CONCURRENCY,
+        queue_timeout: float = OPENAI_QUEUE_TIMEOUT,
+        max_retries: int = OPENAI_MAX_RETRIES,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.requests = TokenBucket(rpm, clock)
+        self.tokens = TokenBucket(tpm, clock)
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.rate_limited = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future[None]] = deque()
+        # waiters signalled by _wake that have not rechecked yet; their slots
+        # are held so a new arrival can't take them first
+        self._woken = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "concurrency_limit": int(self.limit),
+            "max_concurrency": self.max_concurrency,
+            "request_budget": round(self.requests.level, 2),
+            "token_budget": round(self.tokens.level, 2),
+            "rate_limited": self.rate_limited,
+            "rejected": self.rejected,
+        }
+
+    def _admission_delay(self, cost: int, now: float) -> float:
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight + self._woken >= max(1, int(self.limit)):
+            return float("inf")  # woken by _wake
+        return max(self.requests.delay_for(1), self.tokens.delay_for(cost))
+
+    async def _acquire(self, cost: int, deadline: float) -> None:
+        while True:
+            now = self.clock()
+            delay = self._admission_delay(cost, now)
+            if delay == 0:
+                self.requests.consume(1)
+                self.tokens.consume(cost)
+                self.in_flight += 1
+                return
+            remaining = deadline - now
+            if remaining <= 0 or (delay != float("inf") and delay > remaining):
+                self.rejected += 1
+                raise AIUnavailableError(
+                    "AI request queue is full", retry_after=min(delay, 60.0)
+                )
+            waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, timeout=min(delay, remaining))
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    self._woken -= 1
+
+    def _release(self, rate_limited: bool = False) -> None:
+        self.in_flight -= 1
+        if rate_limited:
+            self.limit = max(1.0, self.limit / 2)
+        else:
+            self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+        self._wake()
+
+    def _wake(self) -> None:
+        # oldest first, one waiter per free slot, so queued calls regain the
+        # concurrency the limit has grown back to
+        free = max(1, int(self.limit)) - self.in_flight - self._woken
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._woken += 1
+                free -= 1
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        delay = min(self.max_backoff, self.base_backoff * 2 ** (attempt - 1))
+        delay *= random.uniform(0.5, 1.0)
+        return max(delay, retry_after or 0.0)
+
+    def record_usage(self, estimated: int, actual: int) -> None:
+        self.tokens.consume(actual - estimated)
+
+    async def run(self, call: Callable[[], Awaitable[T]], cost: int) -> T:
+        return await self._run(call, cost, hold=False)
+
+    @asynccontextmanager
+    async def holding(
+        self, call: Callable[[], Awaitable[T]], cost: int
+    ) -> AsyncIterator[T]:
+        """Like run, but keep the concurrency slot until the block exits.
+
+        For streamed calls, whose result is only the start of the work.
+        """
+        result = await self._run(call, cost, hold=True)
+        try:
+            yield result
+        except RateLimitError:
+            self._release(rate_limited=True)
+            self.rate_limited += 1
+            raise
+        except BaseException:
+            self._release()
+            raise
+        self._release()
+
+    async def _run(self, call: Callable[[], Awaitable[T]], cost: int, hold: bool) -> T:
+        deadline = self.clock() + self.queue_timeout
+        attempt = 0
+        while True:
+            await self._acquire(cost, deadline)
+            try:
+                result = await call()
+            except RateLimitError as exc:
+                self._release(rate_limited=True)
+                self.rate_limited += 1
+                attempt += 1
+                retry_after = retry_after_seconds(exc)
+                delay = self._backoff(attempt, retry_after)
+                if retry_after:
+                    # the provider asked everyone to back off, not just this call
+                    self.paused_until = max(
+                        self.paused_until, self.clock() + retry_after
+                    )
+                if attempt > self.max_retries or self.clock() + delay > deadline:
+                    raise AIUnavailableError(
+                        "AI provider is rate limiting requests", retry_after=delay
+                    ) from exc
+                logger.warning(
+                    f"OpenAI rate limited (attempt {attempt}), retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                self._release()
+                raise
+            if not hold:
+                self._release()
+            return result
+
+
+class CircuitBreaker:
+    """Fails AI calls fast while the provider is unhealthy.
+
+    Keeps the outcome and duration of the last `window` provider calls. Once
+    `min_calls` are recorded and either the failure rate or the share of calls
+    slower than `slow_seconds` reaches its threshold, the circuit opens and
+    calls raise AICircuitOpenError for `open_seconds`. Then a single probe is
+    let through (half-open): success closes the circuit, failure reopens it.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    _GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        window: int = OPENAI_BREAKER_WINDOW,
+        min_calls: int = OPENAI_BREAKER_MIN_CALLS,
+        error_rate: float = OPENAI_BREAKER_ERROR_RATE,
+        slow_seconds: float = OPENAI_BREAKER_SLOW_SECONDS,
+        slow_rate: float = OPENAI_BREAKER_SLOW_RATE,
+        open_seconds: float = OPENAI_BREAKER_OPEN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_seconds = slow_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.probe_started: Optional[float] = None
+        self.opened = 0
+        self.rejected = 0
+        # (failed, slow, duration) per call
+        self._calls: Deque[Tuple[bool, bool, float]] = deque(maxlen=window)
+        AI_CIRCUIT_STATE.set(0)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        AI_CIRCUIT_STATE.set(self._GAUGE[state])
+
+    def _reject(self, retry_after: float) -> None:
+        self.rejected += 1
+        raise AICircuitOpenError(
+            "AI provider circuit is open", retry_after=max(retry_after, 0.1)
+        )
+
+    def check(self) -> None:
+        """Raise while the circuit is open, before the call waits for admission."""
+        if self.state == self.OPEN:
+            remaining = self.opened_at + self.open_seconds - self.clock()
+            if remaining > 0:
+                self._reject(remaining)
+
+    def allow(self) -> None:
+        """Admit one provider call, or raise AICircuitOpenError."""
+        self.check()
+        now = self.clock()
+        if self.state == self.OPEN:
+            self._set_state(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            # a probe that never reported back stops blocking after open_seconds
+            if (
+                self.probe_started is not None
+                and now - self.probe_started < self.open_seconds
+            ):
+                self._reject(self.open_seconds - (now - self.probe_started))
+            self.probe_started = now
+
+    def record(self, failed: bool, duration: float) -> None:
+        slow = duration >= self.slow_seconds
+        if self.state == self.HALF_OPEN:
+            self.probe_started = None
+            if failed or slow:
+                self._open()
+            else:
+                logger.info("AI circuit closed after a successful probe")
+                self._calls.clear()
+                self._set_state(self.CLOSED)
+            return
+        self._calls.append((failed, slow, duration))
+        if self.state == self.CLOSED and len(self._calls) >= self.min_calls:
+            failures = sum(failed for failed, _, _ in self._calls) / len(self._calls)
+            slows = sum(slow for _, slow, _ in self._calls) / len(self._calls)
+            if failures >= self.error_rate or slows >= self.slow_rate:
+                self._open()
+
+    def abandon(self) -> None:
+        # the call ended without saying anything about provider health
+        if self.state == self.HALF_OPEN:
+            self.probe_started = None
+
+    def _open(self) -> None:
+        logger.warning(f"AI circuit opened for {self.open_seconds:.0f}s")
+        self.opened += 1
+        self.opened_at = self.clock()
+        self._calls.clear()
+        self._set_state(self.OPEN)
+
+    def guard(self, call: Callable[[], Awaitable[T]]) -> Callable[[], Awaitable[T]]:
+        async def guarded() -> T:
+            self.allow()
+            started = self.clock()
+            try:
+                result = await call()
+            except BaseException as exc:
+                if is_provider_failure(exc):
+                    self.record(True, self.clock() - started)
+                else:
+                    self.abandon()
+                raise
+            self.record(False, self.clock() - started)
+            return result
+
+        return guarded
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        durations = sorted(d for failed, _, d in self._calls if not failed)
+        if len(durations) < self.min_calls:
+            return None
+        return durations[min(len(durations) - 1, int(len(durations) * q))]
+
+    def stats(self) -> Dict[str, Any]:
+        calls = len(self._calls)
+        p95 = self.latency_quantile(OPENAI_HEDGE_QUANTILE)
+        return {
+            "state": self.state,
+            "calls": calls,
+            "failure_rate": (
+                round(sum(f for f, _, _ in self._calls) / calls, 3) if calls else 0.0
+            ),
+            "slow_rate": (
+                round(sum(s for _, s, _ in self._calls) / calls, 3) if calls else 0.0
+            ),
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_after": (
+                round(max(0.0, self.opened_at + self.open_seconds - self.clock()), 2)
+                if self.state == self.OPEN
+                else 0.0
+            ),
+        }
 
 
 class AI:
@@ -16,10 +473,84 @@ class AI:
         "Return actionable bullet points. "
         "When suggesting fixes, include minimal, correct code snippets."
     )
-    OPENAI_MODEL = "gpt-4o-mini"
 
-    def __init__(self, ai_client: AsyncOpenAI):
-        self.ai_client = ai_client
+    def __init__(
+        self,
+        provider: AIProvider,
+        scheduler: Optional[AIScheduler] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge: bool = OPENAI_HEDGE,
+    ):
+        self.provider = provider
+        self.scheduler = scheduler
+        self.breaker = breaker
+        self.hedge = hedge
+
+    def estimate_tokens(self, messages: List[Any]) -> int:
+        # ~4 characters per token is close enough for budgeting
+        prompt_chars = sum(len(message["content"]) for message in messages)
+        return prompt_chars // 4 + OPENAI_EXPECTED_COMPLETION_TOKENS
+
+    def _guard(self, call: Callable[[], Awaitable[T]]) -> Callable[[], Awaitable[T]]:
+        if self.breaker is None:
+            return call
+        self.breaker.check()  # fail fast instead of queueing for admission
+        return self.breaker.guard(call)
+
+    async def _call(self, call: Callable[[], Awaitable[T]], cost: int) -> T:
+        call = self._guard(call)
+        if self.scheduler is None:
+            return await call()
+        return await self.scheduler.run(call, cost)
+
+    @asynccontextmanager
+    async def _open_stream(
+        self, call: Callable[[], Awaitable[T]], cost: int
+    ) -> AsyncIterator[T]:
+        # the scheduler slot is held until the stream is consumed or closed
+        call = self._guard(call)
+        if self.scheduler is None:
+            yield await call()
+            return
+        async with self.scheduler.holding(call, cost) as stream:
+            yield stream
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.hedge or self.breaker is None:
+            return None
+        p95 = self.breaker.latency_quantile(OPENAI_HEDGE_QUANTILE)
+        return None if p95 is None else max(OPENAI_HEDGE_MIN_DELAY, p95)
+
+    async def _hedged_call(self, call: Callable[[], Awaitable[T]], cost: int) -> T:
+        """Like _call, but start a second call if the first outlives the p95
+        latency, take whichever succeeds first and cancel the other."""
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._call(call, cost)
+
+        primary = asyncio.create_task(self._call(call, cost))
+        backup: Optional[asyncio.Task[T]] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+            backup = asyncio.create_task(self._call(call, cost))
+            pending = {primary, backup}
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        winner = "backup" if task is backup else "primary"
+                        AI_HEDGED_REQUESTS.labels(winner=winner).inc()
+                        return task.result()
+            AI_HEDGED_REQUESTS.labels(winner="none").inc()
+            return primary.result()  # both failed; surface the first call's error
+        finally:
+            for call_task in (primary, backup):
+                if call_task is not None and not call_task.done():
+                    call_task.cancel()
 
     def build_messages(
         self, data: SubmissionCreate | ReviewPayload
@@ -54,48 +585,111 @@ class AI:
 
         return messages
 
+    def _record_usage(self, cost: int, usage: Any) -> None:
+        # only the final streamed chunk (or a full completion) carries usage
+        if not isinstance(usage, CompletionUsage):
+            return
+        AI_TOKENS.labels(kind="prompt").inc(usage.prompt_tokens)
+        AI_TOKENS.labels(kind="completion").inc(usage.completion_tokens)
+        logger.info(
+            f"OpenAI usage: prompt={usage.prompt_tokens} "
+            f"completion={usage.completion_tokens} (estimated {cost})"
+        )
+        if self.scheduler is not None:
+            self.scheduler.record_usage(cost, usage.total_tokens)
+
     async def get_feedback(self, data: SubmissionCreate | ReviewPayload) -> str | None:
+        with AI_REQUEST_SECONDS.labels(method="get_feedback").time():
+            try:
+                return await self._get_feedback(data)
+            except AIUnavailableError as exc:
+                AI_ERRORS.labels(type=ai_error_type(exc)).inc()
+                raise
+
+    async def _get_feedback(self, data: SubmissionCreate | ReviewPayload) -> str | None:
         messages = self.build_messages(data)
+        cost = self.estimate_tokens(messages)
 
         try:
-            chat = await self.ai_client.chat.completions.create(
-                model=self.OPENAI_MODEL,
-                messages=messages,
+            reply = await self._hedged_call(
+                lambda: self.provider.complete(messages), cost
             )
-            return chat.choices[0].message.content
+            self._record_usage(cost, reply.usage)
+            return reply.text
 
-        except RateLimitError:
-            return "Too many requests. Please try again later."
+        except AIUnavailableError:
+            # surfaced to the caller so a failed call is never stored as a review
+            raise
 
-        except APIConnectionError:
-            return "Could not reach the AI service."
+        except RateLimitError as e:
+            raise AIUnavailableError(
+                "AI provider is rate limiting requests",
+                retry_after=retry_after_seconds(e),
+            ) from e
 
         except APIError as e:
-            return f"AI service error: {e}"
+            # connection failures and provider errors alike
+            raise AIUnavailableError(f"AI provider call failed: {e}") from e
+
+        except AIConfigurationError as e:
+            logger.error(f"AI provider is not configured: {e}")
+            raise AIUnavailableError(str(e)) from e
 
         except Exception as e:
-            print(f"Unexpected error in get_feedback: {e}")
-            return None
+            logger.exception("Unexpected error in get_feedback")
+            raise AIUnavailableError(f"AI provider call failed: {e}") from e
 
-    async def stream_feedback(
+    async def stream_deltas(
         self, data: SubmissionCreate | ReviewPayload
-    ) -> AsyncGenerator[bytes, None]:
+    ) -> AsyncGenerator[str, None]:
+        """Yield text deltas from a streamed completion; provider errors propagate."""
         messages = self.build_messages(data)
+        cost = self.estimate_tokens(messages)
+        started = time.perf_counter()
+        first_token = True
+        try:
+            async with self._open_stream(
+                lambda: self.provider.open_stream(messages), cost
+            ) as stream:
+                async for reply in stream:
+                    if reply.text:
+                        if first_token:
+                            first_token = False
+                            AI_STREAM_FIRST_TOKEN_SECONDS.observe(
+                                time.perf_counter() - started
+                            )
+                        yield reply.text
+                    self._record_usage(cost, reply.usage)
+        except Exception as exc:
+            AI_ERRORS.labels(type=ai_error_type(exc)).inc()
+            raise
+        finally:
+            AI_STREAM_SECONDS.observe(time.perf_counter() - started)
+
+    async def stream_feedback(
+        self,
+        data: SubmissionCreate | ReviewPayload,
+        on_complete: Optional[Callable[[str], Awaitable[None]]] = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """Yield the review as it streams in.
+
+        `on_complete` receives the full text only if the stream finished without
+        errors, so callers can persist it without storing error messages.
+        """
+        parts: List[str] = []
 
         try:
-            stream = await self.ai_client.chat.completions.create(
-                model=self.OPENAI_MODEL,
-                messages=messages,
-                stream=True,
-            )
+            async for delta in self.stream_deltas(data):
+                parts.append(delta)
+                yield delta.encode("utf-8")
 
-            async for chunk in stream:
-                for choice in chunk.choices:
-                    delta = choice.delta.content
-                    if delta:
-                        yield delta.encode("utf-8")
+            if on_complete is not None:
+                await on_complete("".join(parts))
 
-        except RateLimitError:
+        except AICircuitOpenError:
+            yield b"AI service is temporarily unavailable. Please try again later."
+
+        except (RateLimitError, AIUnavailableError):
             yield b"Too many requests. Please try again later."
 
         except APIConnectionError:
@@ -104,6 +698,6 @@ class AI:
         except APIError as e:
             yield f"AI service error: {e}".encode("utf-8")
 
-        except Exception as e:
-            print(f"Unexpected error in stream_feedback: {e}")
+        except Exception:
+            logger.exception("Unexpected error in stream_feedback")
             yield b"Unexpected error occurred."
@@ -0,0 +1,214 @@
+import asyncio
+import hashlib
+import os
+import random
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Protocol, Sequence, Union
+
+import httpx
+from openai import AsyncOpenAI, InternalServerError, RateLimitError
+from openai.types import CompletionUsage
+from openai.types.chat import (
+    ChatCompletionSystemMessageParam,
+    ChatCompletionUserMessageParam,
+)
+
+from app.core.ai_client import get_ai_client
+
+# "openai" or "fake"; the fake needs no network or API key (load tests, local dev)
+AI_PROVIDER: str = os.getenv("AI_PROVIDER", "openai").lower()
+OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+ChatMessage = Union[ChatCompletionSystemMessageParam, ChatCompletionUserMessageParam]
+
+
+@dataclass(frozen=True)
+class AIReply:
+    """A full completion, or one streamed delta. `usage` is set once per call."""
+
+    text: Optional[str]
+    usage: Optional[CompletionUsage] = None
+
+
+class AIProvider(Protocol):
+    """A chat model that reviews code.
+
+    Implementations raise the openai exception types (RateLimitError,
+    APIStatusError, APIConnectionError) so AIScheduler and CircuitBreaker
+    treat every provider alike.
+    """
+
+    name: str
+    model: str
+
+    async def complete(self, messages: Sequence[ChatMessage]) -> AIReply: ...
+
+    async def open_stream(
+        self, messages: Sequence[ChatMessage]
+    ) -> AsyncIterator[AIReply]: ...
+
+
+class OpenAIProvider:
+    name = "openai"
+
+    def __init__(self, client: Optional[AsyncOpenAI] = None, model: str = OPENAI_MODEL):
+        self._client = client
+        self.model = model
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        # Without an injected client the shared one is looked up per call, so
+        # the one closed at shutdown is replaced when the app starts again.
+        return self._client if self._client is not None else get_ai_client()
+
+    async def complete(self, messages: Sequence[ChatMessage]) -> AIReply:
+        chat = await self.client.chat.completions.create(
+            model=self.model, messages=list(messages)
+        )
+        return AIReply(chat.choices[0].message.content, chat.usage)
+
+    async def open_stream(
+        self, messages: Sequence[ChatMessage]
+    ) -> AsyncIterator[AIReply]:
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=list(messages),
+            stream=True,
+            # the final chunk then carries token usage (with no choices)
+            stream_options={"include_usage": True},
+        )
+        return self._replies(stream)
+
+    @staticmethod
+    async def _replies(stream: AsyncIterator) -> AsyncIterator[AIReply]:
+        async for chunk in stream:
+            text = "".join(
+                choice.delta.content for choice in chunk.choices if choice.delta.content
+            )
+            if text or chunk.usage is not None:
+                yield AIReply(text or None, chunk.usage)
+
+
+@dataclass(frozen=True)
+class FakeAISettings:
+    latency_ms: float = 500.0
+    latency_sigma: float = 0.3
+    chunks: int = 40
+    chunk_interval_ms: float = 20.0
+    rate_limit_rate: float = 0.0
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "FakeAISettings":
+        seed = os.getenv("FAKE_AI_SEED")
+        return cls(
+            latency_ms=float(os.getenv("FAKE_AI_LATENCY_MS", "500")),
+            latency_sigma=float(os.getenv("FAKE_AI_LATENCY_SIGMA", "0.3")),
+            chunks=int(os.getenv("FAKE_AI_STREAM_CHUNKS", "40")),
+            chunk_interval_ms=float(os.getenv("FAKE_AI_CHUNK_INTERVAL_MS", "20")),
+            rate_limit_rate=float(os.getenv("FAKE_AI_RATE_LIMIT_RATE", "0")),
+            error_rate=float(os.getenv("FAKE_AI_ERROR_RATE", "0")),
+            seed=int(seed) if seed else None,
+        )
+
+
+_FAKE_REQUEST = httpx.Request("POST", "http://fake-ai.local/v1/chat/completions")
+
+
+class FakeAIProvider:
+    """Local stand-in for a chat model.
+
+    Each call waits a log-normally distributed latency (median `latency_ms`,
+    spread `latency_sigma`; 0 makes it fixed) before answering or before the
+    first streamed chunk, then streams `chunks` deltas `chunk_interval_ms`
+    apart. A share of calls fail with a 429 or a 500 instead. The review text
+    depends only on the prompt, so identical submissions get identical reviews.
+    """
+
+    name = "fake"
+    model = "fake-reviewer"
+
+    def __init__(self, settings: Optional[FakeAISettings] = None):
+        self.settings = settings or FakeAISettings.from_env()
+        self.rng = random.Random(self.settings.seed)
+        self.calls = 0
+
+    def _latency(self) -> float:
+        median = self.settings.latency_ms / 1000
+        if self.settings.latency_sigma <= 0:
+            return median
+        return self.rng.lognormvariate(0.0, self.settings.latency_sigma) * median
+
+    def _maybe_fail(self) -> None:
+        roll = self.rng.random()
+        if roll < self.settings.rate_limit_rate:
+            raise RateLimitError(
+                "Rate limit reached (fake)",
+                response=httpx.Response(
+                    429, headers={"retry-after": "1"}, request=_FAKE_REQUEST
+                ),
+                body=None,
+            )
+        if roll < self.settings.rate_limit_rate + self.settings.error_rate:
+            raise InternalServerError(
+                "The server had an error (fake)",
+                response=httpx.Response(500, request=_FAKE_REQUEST),
+                body=None,
+            )
+
+    def review_text(self, messages: Sequence[ChatMessage]) -> str:
+        prompt = "".join(str(message["content"]) for message in messages)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        lines = prompt.count("\n") + 1
+        return (
+            f"1. The snippet ({lines} lines, ref {digest[:12]}) is readable but "
+            "leaves error handling to the caller.\n"
+            "2. Findings:\n"
+            "- Inputs are not validated before use.\n"
+            "- Failures from I/O calls are not retried or logged.\n"
+            "- Names could describe intent more precisely.\n"
+            "3. Validate inputs at the boundary and surface errors explicitly."
+        )
+
+    def _usage(self, messages: Sequence[ChatMessage], text: str) -> CompletionUsage:
+        prompt = sum(len(str(message["content"])) for message in messages) // 4
+        completion = len(text) // 4
+        return CompletionUsage(
+            prompt_tokens=prompt,
+            completion_tokens=completion,
+            total_tokens=prompt + completion,
+        )
+
+    async def complete(self, messages: Sequence[ChatMessage]) -> AIReply:
+        self.calls += 1
+        await asyncio.sleep(self._latency())
+        self._maybe_fail()
+        text = self.review_text(messages)
+        return AIReply(text, self._usage(messages, text))
+
+    async def open_stream(
+        self, messages: Sequence[ChatMessage]
+    ) -> AsyncIterator[AIReply]:
+        self.calls += 1
+        await asyncio.sleep(self._latency())
+        self._maybe_fail()
+        return self._stream(messages)
+
+    async def _stream(self, messages: Sequence[ChatMessage]) -> AsyncIterator[AIReply]:
+        text = self.review_text(messages)
+        count = max(1, self.settings.chunks)
+        size = -(-len(text) // count)
+        for index, start in enumerate(range(0, len(text), size)):
+            if index:
+                await asyncio.sleep(self.settings.chunk_interval_ms / 1000)
+            yield AIReply(text[start : start + size])
+        yield AIReply(None, self._usage(messages, text))
+
+
+def create_ai_provider(name: str = AI_PROVIDER) -> AIProvider:
+    if name == "fake":
+        return FakeAIProvider()
+    if name == "openai":
+        return OpenAIProvider()
+    raise ValueError(f"Unknown AI_PROVIDER {name!r}; expected 'openai' or 'fake'")
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import os
+from typing import AsyncGenerator, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+REVIEW_CHANNEL_LINGER_SECONDS: float = float(
+    os.getenv("REVIEW_CHANNEL_LINGER_SECONDS", "60")
+)
+
+Event = Tuple[str, Dict[str, str]]
+
+
+def format_sse(event: str, data: Dict[str, str]) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+class ReviewChannel:
+    """Buffered fan-out of one review stream to any number of subscribers."""
+
+    def __init__(self) -> None:
+        self.buffer: List[str] = []
+        self.status: Optional[str] = None
+        self.producing = False
+        self._subscribers: Set[asyncio.Queue[Optional[str]]] = set()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, delta: str) -> None:
+        self.buffer.append(delta)
+        for queue in self._subscribers:
+            queue.put_nowait(delta)
+
+    def close(self, status: str) -> None:
+        self.status = status
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+
+    async def events(self, idle_timeout: float) -> AsyncGenerator[Event, None]:
+        # Register and snapshot without awaiting in between, so a delta is
+        # either in the replayed prefix or delivered live, never both.
+        queue: asyncio.Queue[Optional[str]] = asyncio.Queue()
+        self._subscribers.add(queue)
+        replay = list(self.buffer)
+        try:
+            for delta in replay:
+                yield "delta", {"text": delta}
+            if self.status is not None:
+                yield "done", {"status": self.status}
+                return
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=idle_timeout)
+                except asyncio.TimeoutError:
+                    yield "ping", {}
+                    continue
+                if item is None:
+                    yield "done", {"status": self.status or ""}
+                    return
+                yield "delta", {"text": item}
+        finally:
+            self._subscribers.discard(queue)
+
+
+class ReviewBroadcaster:
+    """Per-submission channels shared by the review worker and SSE subscribers.
+
+    Finished channels linger briefly so subscribers that looked up a pending
+    row just before completion still receive the full stream.
+    """
+
+    def __init__(self, linger: float = REVIEW_CHANNEL_LINGER_SECONDS) -> None:
+        self.linger = linger
+        self._channels: Dict[UUID, ReviewChannel] = {}
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def open(self, key: UUID) -> ReviewChannel:
+        channel = self._channels.get(key)
+        if channel is None or channel.status is not None:
+            channel = self._channels[key] = ReviewChannel()
+        channel.producing = True
+        return channel
+
+    def finish(self, key: UUID, status: str) -> None:
+        channel = self._channels.get(key)
+        if channel is None:
+            return
+        channel.close(status)
+        asyncio.get_running_loop().call_later(self.linger, self._drop, key, channel)
+
+    def _drop(self, key: UUID, channel: ReviewChannel) -> None:
+        if self._channels.get(key) is channel:
+            del self._channels[key]
+
+    async def subscribe(
+        self, key: UUID, idle_timeout: float = 15.0
+    ) -> AsyncGenerator[Event, None]:
+        channel = self._channels.get(key)
+        if channel is None:
+            # the worker has not picked the job up yet; it will publish here
+            channel = self._channels[key] = ReviewChannel()
+        events = channel.events(idle_timeout)
+        try:
+            async for event in events:
+                yield event
+        finally:
+            await events.aclose()
+            if not channel.producing and channel.subscribers == 0:
+                self._drop(key, channel)
@@ -0,0 +1,239 @@
+import hashlib
+import keyword
+import re
+from typing import Callable, Dict, FrozenSet, List, Optional, Pattern, Tuple
+
+from app.models.postgre import Language
+
+# (kind, text); kind is one of name, keyword, string, regex, number, op,
+# newline, indent, dedent. Comments and insignificant whitespace never appear.
+Token = Tuple[str, str]
+
+JAVASCRIPT_KEYWORDS: FrozenSet[str] = frozenset(
+    """
+    async await break case catch class const continue debugger default delete do
+    else export extends false finally for function if import in instanceof let new
+    null of return static super switch this throw true try typeof undefined var
+    void while with yield
+    """.split()
+)
+
+JAVA_KEYWORDS: FrozenSet[str] = frozenset(
+    """
+    abstract assert boolean break byte case catch char class const continue default
+    do double else enum extends false final finally float for goto if implements
+    import instanceof int interface long native new null package private protected
+    public record return short static strictfp super switch synchronized this throw
+    throws transient true try var void volatile while yield
+    """.split()
+)
+
+
+_C_LIKE = re.compile(
+    r"""
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)
+    | (?P<number>\d[\w.]*)
+    | (?P<name>[A-Za-z_$][\w$]*)
+    | (?P<op>\S)
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+
+# Java text blocks ("""...""") are tried before ordinary strings; read as ""
+# followed by a string, a "//" inside one would drop the rest of its line.
+_JAVA = re.compile(
+    r"""
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<string>\"\"\"(?:\\.|[^\\])*?\"\"\"
+        |"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+    | (?P<number>\d[\w.]*)
+    | (?P<name>[A-Za-z_$][\w$]*)
+    | (?P<op>\S)
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+
+
+# A JavaScript regex literal; "//" and "/*" always start comments instead.
+_JS_REGEX = re.compile(r"/(?![*/])(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[A-Za-z]*")
+# keywords after which a "/" starts a regex rather than dividing
+_JS_REGEX_AFTER = frozenset(
+    "await case delete do else in instanceof new of return throw typeof void yield".split()
+)
+
+
+def _regex_allowed(previous: Optional[Token]) -> bool:
+    # the usual heuristic: a value (name, literal, closing bracket) before a
+    # "/" makes it division, anything else makes it a regex
+    if previous is None:
+        return True
+    kind, text = previous
+    if kind == "op":
+        return text not in ")]}"
+    return kind == "keyword" and text in _JS_REGEX_AFTER
+
+
+def _regex_tokens(
+    content: str,
+    pattern: Pattern[str],
+    keywords: FrozenSet[str],
+    regex_literals: bool = False,
+) -> List[Token]:
+    tokens: List[Token] = []
+    pos = 0
+    while (match := pattern.search(content, pos)) is not None:
+        # Regex literals are matched before the comment alternative can read
+        # e.g. the "/*" in /\/*/ as the start of a comment and swallow code.
+        if (
+            regex_literals
+            and content[match.start()] == "/"
+            and _regex_allowed(tokens[-1] if tokens else None)
+        ):
+            literal = _JS_REGEX.match(content, match.start())
+            if literal is not None:
+                tokens.append(("regex", literal.group()))
+                pos = literal.end()
+                continue
+        pos = match.end()
+        kind = match.lastgroup or "op"
+        if kind == "comment":
+            continue
+        text = match.group()
+        if kind == "name" and text in keywords:
+            kind = "keyword"
+        tokens.append((kind, text))
+    return tokens
+
+
+def javascript_tokens(content: str) -> List[Token]:
+    return _regex_tokens(content, _C_LIKE, JAVASCRIPT_KEYWORDS, regex_literals=True)
+
+
+def java_tokens(content: str) -> List[Token]:
+    return _regex_tokens(content, _JAVA, JAVA_KEYWORDS)
+
+
+_PYTHON = re.compile(
+    r"""
+    (?P<comment>\#[^\n]*)
+    | (?P<string>[rRbBuUfF]{0,2}
+        (?:\'\'\'[\s\S]*?\'\'\'|\"\"\"[\s\S]*?\"\"\"
+        |'(?:\\.|[^'\\\n])*'|"(?:\\.|[^"\\\n])*"))
+    | (?P<number>\d[\w.]*|\.\d\w*)
+    | (?P<name>[^\W\d]\w*)
+    | (?P<newline>\n)
+    | (?P<continuation>\\\n)
+    | (?P<space>[ \t\f\r]+)
+    | (?P<op>\*\*=?|//=?|>>=?|<<=?|->|:=|[-+*/%&|^@<>=!]=|\S)
+    """,
+    re.VERBOSE,
+)
+_PYTHON_KEYWORDS = frozenset(keyword.kwlist)
+
+
+def python_tokens(content: str) -> List[Token]:
+    # A single regex pass rather than the tokenize module, which is several
+    # times slower and rejects the truncated snippets people often submit.
+    # Only the layout that changes meaning is kept: logical line ends, and
+    # indent/dedent from the leading whitespace of each logical line.
+    tokens: List[Token] = []
+    indents = [0]
+    depth = 0
+    line_start = True
+    width = 0
+    for match in _PYTHON.finditer(content):
+        kind = match.lastgroup or "op"
+        text = match.group()
+        if kind in ("comment", "continuation"):
+            continue
+        if kind == "space":
+            if line_start:
+                width = len(text.expandtabs(8))
+            continue
+        if kind == "newline":
+            if depth == 0:
+                if not line_start:
+                    tokens.append(("newline", ""))
+                line_start = True
+                width = 0
+            continue
+        if line_start:
+            if width > indents[-1]:
+                indents.append(width)
+                tokens.append(("indent", ""))
+            while width < indents[-1]:
+                indents.pop()
+                tokens.append(("dedent", ""))
+            line_start = False
+        if kind == "name" and text in _PYTHON_KEYWORDS:
+            kind = "keyword"
+        elif kind == "op":
+            if text in "([{":
+                depth += 1
+            elif text in ")]}":
+                depth = max(0, depth - 1)
+        tokens.append((kind, text))
+    if not line_start:
+        tokens.append(("newline", ""))
+    tokens.extend(("dedent", "") for _ in indents[1:])
+    return tokens
+
+
+Tokenizer = Callable[[str], List[Token]]
+
+TOKENIZERS: Dict[Language, Tokenizer] = {
+    Language.PYTHON: python_tokens,
+    Language.JAVASCRIPT: javascript_tokens,
+    Language.JAVA: java_tokens,
+}
+
+
+def register_tokenizer(language: Language) -> Callable[[Tokenizer], Tokenizer]:
+    """Use the decorated function to tokenize `language` from now on.
+
+    Changing a tokenizer changes the canonical hash of that language's code,
+    so existing rows need `python -m app.jobs.rehash_submissions` afterwards.
+    """
+
+    def register(tokenizer: Tokenizer) -> Tokenizer:
+        TOKENIZERS[language] = tokenizer
+        return tokenizer
+
+    return register
+
+
+def code_tokens(content: str, language: Language) -> List[Token]:
+    """Tokens of `content` without comments or formatting."""
+    return TOKENIZERS[language](content)
+
+
+# kind prefixes keep e.g. the string "1" apart from the number 1, and the
+# separators keep adjacent tokens from running together
+_KIND_TAGS = {
+    "name": "n",
+    "keyword": "k",
+    "string": "s",
+    "regex": "r",
+    "number": "d",
+    "op": "o",
+    "newline": "l",
+    "indent": "i",
+    "dedent": "u",
+}
+
+
+def canonical_form(content: str, language: Language) -> str:
+    return "\x1f".join(
+        _KIND_TAGS[kind] + text for kind, text in code_tokens(content, language)
+    )
+
+
+def canonical_hash(content: str, language: Language) -> str:
+    """sha256 of the canonical token stream, so reformatting or re-commenting
+    code keeps its hash. The language is hashed too: the same text in two
+    languages is two different submissions."""
+    digest = hashlib.sha256(language.value.encode("utf-8"))
+    digest.update(b"\x1e")
+    digest.update(canonical_form(content, language).encode("utf-8"))
+    return digest.hexdigest()
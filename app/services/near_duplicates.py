@@ -0,0 +1,185 @@
+import hashlib
+import os
+import random
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.core.config import env_bool
+from app.models.postgre import Language
+from app.services.canonical import Token, code_tokens
+
+NEAR_DUPLICATE_DEDUP: bool = env_bool("NEAR_DUPLICATE_DEDUP")
+NEAR_DUPLICATE_THRESHOLD: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.9"))
+
+SHINGLE_SIZE = 5
+NUM_PERM = 32
+BANDS = 4
+ROWS = NUM_PERM // BANDS
+# bucket chains longer than this are boilerplate; more candidates add no signal
+MAX_CANDIDATES_PER_BAND = 64
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)  # fixed, so signatures are stable across processes
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)
+]
+_LANGUAGES = {language: index for index, language in enumerate(Language)}
+
+
+def normalise_names(tokens: List[Token]) -> List[str]:
+    """Rename local identifiers in order of first use (v0, v1, ...).
+
+    Called names and attributes keep their spelling: they name the APIs being
+    used, which is what separates two reviews, unlike variable names.
+    """
+    names: Dict[str, str] = {}
+    out: List[str] = []
+    for index, (kind, text) in enumerate(tokens):
+        if kind == "name":
+            after = tokens[index + 1][1] if index + 1 < len(tokens) else ""
+            before = tokens[index - 1][1] if index else ""
+            if after != "(" and before != ".":
+                text = names.setdefault(text, f"v{len(names)}")
+        out.append(text)
+    return out
+
+
+def shingles(words: List[str], size: int = SHINGLE_SIZE) -> Set[int]:
+    if len(words) <= size:
+        windows = [words]
+    else:
+        windows = [words[i : i + size] for i in range(len(words) - size + 1)]
+    return {
+        int.from_bytes(
+            hashlib.blake2b("\x1f".join(w).encode(), digest_size=8).digest(), "big"
+        )
+        for w in windows
+    }
+
+
+def signature(content: str, language: Language) -> array:
+    """MinHash signature (NUM_PERM 32-bit values) of the normalised code."""
+    values = shingles(normalise_names(code_tokens(content, language)))
+    if not values:
+        values = {0}
+    return array(
+        "I",
+        (
+            min((a * v + b) % _PRIME for v in values) & 0xFFFFFFFF
+            for a, b in _PERMUTATIONS
+        ),
+    )
+
+
+@dataclass(frozen=True)
+class NearDuplicate:
+    code_hash: str
+    similarity: float
+
+
+class NearDuplicateIndex:
+    """In-memory MinHash/LSH index from normalised code to submission hashes.
+
+    Signatures are split into BANDS bands of ROWS values. Two snippets become
+    candidates when any band matches exactly (language is part of the band
+    key), and candidates are ranked by the fraction of equal signature values,
+    which estimates the Jaccard similarity of their token shingles.
+
+    Storage is flat arrays plus one dict per band, with each bucket chained
+    through `_next`, so a lookup is BANDS dict probes and a few dozen array
+    compares however many entries are indexed.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self.queries = 0
+        self.hits = 0
+        self.query_seconds = 0.0
+        self._hashes: List[str] = []
+        self._known: Set[str] = set()
+        self._signatures = array("I")
+        self._heads: List[Dict[int, int]] = [{} for _ in range(BANDS)]
+        self._next: List[array] = [array("q") for _ in range(BANDS)]
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    @staticmethod
+    def _band_keys(sig: array, language: Language) -> List[int]:
+        lang = _LANGUAGES[language]
+        return [
+            hash((lang, band, tuple(sig[band * ROWS : (band + 1) * ROWS])))
+            for band in range(BANDS)
+        ]
+
+    def add(self, code_hash: str, content: str, language: Language) -> None:
+        if code_hash not in self._known:
+            self.insert(code_hash, language, signature(content, language))
+
+    def insert(self, code_hash: str, language: Language, sig: array) -> None:
+        if code_hash in self._known:
+            return
+        entry = len(self._hashes)
+        self._hashes.append(code_hash)
+        self._known.add(code_hash)
+        self._signatures.extend(sig)
+        for band, key in enumerate(self._band_keys(sig, language)):
+            heads = self._heads[band]
+            self._next[band].append(heads.get(key, -1))
+            heads[key] = entry
+
+    def query(self, content: str, language: Language) -> Optional[NearDuplicate]:
+        return self.query_signature(language, signature(content, language))
+
+    def query_signature(
+        self, language: Language, sig: array
+    ) -> Optional[NearDuplicate]:
+        started = time.perf_counter()
+        candidates: Set[int] = set()
+        for band, key in enumerate(self._band_keys(sig, language)):
+            entry = self._heads[band].get(key, -1)
+            chain = self._next[band]
+            seen = 0
+            while entry != -1 and seen < MAX_CANDIDATES_PER_BAND:
+                candidates.add(entry)
+                entry = chain[entry]
+                seen += 1
+
+        best: Optional[NearDuplicate] = None
+        for entry in candidates:
+            stored = self._signatures[entry * NUM_PERM : (entry + 1) * NUM_PERM]
+            similarity = sum(a == b for a, b in zip(sig, stored)) / NUM_PERM
+            if similarity >= self.threshold and (
+                best is None or similarity > best.similarity
+            ):
+                best = NearDuplicate(self._hashes[entry], similarity)
+
+        self.queries += 1
+        self.hits += best is not None
+        self.query_seconds += time.perf_counter() - started
+        return best
+
+    def extend(self, entries: Iterable[tuple[str, str, Language]]) -> int:
+        added = 0
+        for code_hash, content, language in entries:
+            if code_hash not in self._known:
+                self.add(code_hash, content, language)
+                added += 1
+        return added
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._hashes),
+            "threshold": self.threshold,
+            "bands": BANDS,
+            "rows_per_band": ROWS,
+            "queries": self.queries,
+            "hits": self.hits,
+            "avg_query_us": (
+                round(self.query_seconds / self.queries * 1e6, 2)
+                if self.queries
+                else 0.0
+            ),
+        }
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, List, Optional
+from uuid import UUID
+
+from app.services.ai import AIUnavailableError
+
+logger = logging.getLogger("app.services.review_jobs")
+
+REVIEW_WORKERS: int = int(os.getenv("REVIEW_WORKERS", "4"))
+REVIEW_JOB_MAX_ATTEMPTS: int = int(os.getenv("REVIEW_JOB_MAX_ATTEMPTS", "5"))
+# a claim older than this is taken to belong to a worker that died mid-review
+REVIEW_CLAIM_TIMEOUT_SECONDS: float = float(
+    os.getenv("REVIEW_CLAIM_TIMEOUT_SECONDS", "300")
+)
+
+
+class ReviewClaimedError(Exception):
+    """Another worker (maybe in another process) is reviewing the submission."""
+
+    def __init__(self, retry_after: float = REVIEW_CLAIM_TIMEOUT_SECONDS):
+        super().__init__("review is claimed by another worker")
+        self.retry_after = retry_after
+
+
+class ReviewJobQueue:
+    """In-process queue of pending reviews drained by a pool of asyncio workers.
+
+    `process` fills in the review for a submission uuid; `fail` marks it failed
+    once it has been rate limited `max_attempts` times. Jobs live in memory, so
+    pending rows left over from a previous process are re-submitted on startup.
+    A job whose row another worker has claimed is checked again once that
+    claim could have gone stale, without using up an attempt.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[UUID], Awaitable[None]],
+        fail: Callable[[UUID], Awaitable[None]],
+        workers: int = REVIEW_WORKERS,
+        max_attempts: int = REVIEW_JOB_MAX_ATTEMPTS,
+    ):
+        self.process = process
+        self.fail = fail
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._queue: Optional[asyncio.Queue[tuple[UUID, int]]] = None
+        self._tasks: List[asyncio.Task[None]] = []
+        self._retries: set[asyncio.Task[None]] = set()
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"review-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} review workers")
+
+    async def stop(self) -> None:
+        for task in [*self._tasks, *self._retries]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retries, return_exceptions=True)
+        self._tasks = []
+        self._retries.clear()
+        self._queue = None
+
+    def submit(self, uuid: UUID, attempt: int = 1) -> None:
+        if self._queue is None:
+            raise RuntimeError("Review job queue is not running")
+        self._queue.put_nowait((uuid, attempt))
+
+    def _retry_later(self, uuid: UUID, attempt: int, delay: float) -> None:
+        async def resubmit() -> None:
+            await asyncio.sleep(delay)
+            self.submit(uuid, attempt)
+
+        task = asyncio.create_task(resubmit())
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _worker(self, index: int) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            uuid, attempt = await queue.get()
+            try:
+                await self.process(uuid)
+            except ReviewClaimedError as exc:
+                self._retry_later(uuid, attempt, exc.retry_after)
+            except AIUnavailableError as exc:
+                if attempt >= self.max_attempts:
+                    logger.error(f"Review {uuid} failed after {attempt} attempts")
+                    await self._fail(uuid)
+                else:
+                    delay = exc.retry_after or 2.0**attempt
+                    logger.warning(f"Review {uuid} deferred for {delay:.1f}s: {exc}")
+                    self._retry_later(uuid, attempt + 1, delay)
+            except Exception:
+                logger.exception(f"Review job {uuid} crashed")
+                await self._fail(uuid)
+            finally:
+                queue.task_done()
+
+    async def _fail(self, uuid: UUID) -> None:
+        try:
+            await self.fail(uuid)
+        except Exception:
+            logger.exception(f"Could not mark review {uuid} as failed")
@@ -0,0 +1,77 @@
+import asyncio
+import os
+from contextlib import suppress
+from typing import AsyncGenerator, AsyncIterator, Union
+
+REVIEW_STREAM_FLUSH_BYTES: int = int(os.getenv("REVIEW_STREAM_FLUSH_BYTES", "512"))
+REVIEW_STREAM_FLUSH_MS: float = float(os.getenv("REVIEW_STREAM_FLUSH_MS", "40"))
+
+
+class _Done:
+    pass
+
+
+async def coalesce_chunks(
+    source: AsyncIterator[bytes],
+    max_bytes: int = REVIEW_STREAM_FLUSH_BYTES,
+    max_delay: float = REVIEW_STREAM_FLUSH_MS / 1000,
+) -> AsyncGenerator[bytes, None]:
+    """Merge small chunks into fewer, larger writes.
+
+    The first chunk is passed through untouched so time-to-first-byte does not
+    change. After that, chunks are buffered until `max_bytes` accumulate or
+    `max_delay` seconds pass since the oldest buffered chunk, whichever is first.
+    """
+    if max_bytes <= 1 or max_delay <= 0:
+        async for chunk in source:
+            yield chunk
+        return
+
+    # the source is read by its own task so the delay can expire between chunks
+    queue: asyncio.Queue[Union[bytes, BaseException, _Done]] = asyncio.Queue(64)
+
+    async def pump() -> None:
+        try:
+            async for chunk in source:
+                await queue.put(chunk)
+        except Exception as exc:
+            await queue.put(exc)
+        else:
+            await queue.put(_Done())
+
+    task = asyncio.create_task(pump())
+    loop = asyncio.get_running_loop()
+    buffer = bytearray()
+    deadline: float | None = None
+    first = True
+    try:
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                yield bytes(buffer)
+                buffer.clear()
+                deadline = None
+                continue
+            if isinstance(item, _Done):
+                break
+            if isinstance(item, BaseException):
+                raise item
+            if first:
+                first = False
+                yield item
+                continue
+            buffer += item
+            if deadline is None:
+                deadline = loop.time() + max_delay
+            if len(buffer) >= max_bytes:
+                yield bytes(buffer)
+                buffer.clear()
+                deadline = None
+        if buffer:
+            yield bytes(buffer)
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
@@ -1,33 +1,137 @@
-import hashlib
+import asyncio
+import base64
 import logging
-from typing import Any, Dict, List, Optional
+import math
+import os
+import time
+from contextlib import aclosing
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncGenerator, Dict, List, Optional, Sequence
 from uuid import UUID
+from bson import ObjectId
 from fastapi import HTTPException
+from sqlalchemy import RowMapping
 from sqlalchemy.exc import SQLAlchemyError
 from pymongo.errors import PyMongoError
 
-from app.models.postgre import Submission
+from app.core.cache import TTLCache
+from app.core.config import env_bool
+from app.core.metrics import REVIEW_DEDUP_HITS
+from app.core.singleflight import SingleFlight
+from app.models.postgre import Language, Submission, SubmissionStatus
+from app.schemas.ai import ReviewPayload
 from app.schemas.submissions import (
+    SubmissionBatchItemOut,
     SubmissionWithPayloadOut,
     CodePayload,
     SubmissionCreate,
     SubmissionOut,
+    SubmissionPage,
 )
 from app.repositories.protocols import SubmissionsPgRepo, SubmissionsMongoRepo
 from app.models.mongo import SubmissionDocument
-from app.services.ai import AI as AIService
+from app.services.ai import AI as AIService, AICircuitOpenError, AIUnavailableError
+from app.services.broadcast import ReviewBroadcaster, format_sse
+from app.services.canonical import canonical_hash
+from app.services.near_duplicates import NearDuplicateIndex
+from app.services.review_jobs import (
+    REVIEW_CLAIM_TIMEOUT_SECONDS,
+    ReviewClaimedError,
+    ReviewJobQueue,
+)
 
 logger = logging.getLogger("app.services.submissions")
 
+REVIEW_REPLAY_CHUNK_SIZE = 256
+# Idle interval of the live SSE stream: a keepalive is sent and the row's
+# status re-read, in case another instance is the one running the review.
+REVIEW_EVENTS_KEEPALIVE_SECONDS: float = float(
+    os.getenv("REVIEW_EVENTS_KEEPALIVE_SECONDS", "15")
+)
+BATCH_AI_CONCURRENCY: int = int(os.getenv("BATCH_AI_CONCURRENCY", "8"))
+# Also keep each payload in Postgres (submissions.payload_snapshot) so a single
+# query serves GET /submissions/{uuid}. Mongo stays the source of truth and is
+# still read for rows stored before the flag was turned on.
+PAYLOAD_READ_MODEL: bool = env_bool("PAYLOAD_READ_MODEL")
+# Start the AI review concurrently with the dedup lookup. Saves the lookup
+# latency on new code, at the cost of some cancelled calls for duplicates.
+SPECULATIVE_REVIEW: bool = env_bool("SPECULATIVE_REVIEW")
+
+
+@dataclass(frozen=True)
+class CachedReview:
+    submission: SubmissionOut
+    ai_response: Optional[str]
+
+
+def compute_code_hash(content: str, language: Language) -> str:
+    return canonical_hash(content, language)
+
+
+def encode_cursor(created_at: datetime, sub_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{sub_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, sub_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(sub_id)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+
+
+def ai_unavailable(exc: AIUnavailableError) -> HTTPException:
+    return HTTPException(
+        503,
+        "AI service is busy, please retry later",
+        headers=(
+            {"Retry-After": str(math.ceil(exc.retry_after))}
+            if exc.retry_after
+            else None
+        ),
+    )
+
+
+def payload_from_document(doc: SubmissionDocument) -> CodePayload:
+    return CodePayload(**doc.model_dump(by_alias=True, exclude_none=True))
+
+
+def _discard_task(task: "asyncio.Task[Any]") -> None:
+    task.cancel()
+    # retrieve the outcome so a failure that beat the cancel is not reported
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+def _log_stages(code_hash: str, stages: Dict[str, float]) -> None:
+    timings = " ".join(f"{name}={took * 1000:.1f}ms" for name, took in stages.items())
+    logger.info(f"Submission {code_hash[:12]} stages: {timings}")
+
+
+def payload_snapshot(
+    mongo_id: str, content: str, ai_text: Optional[str]
+) -> Dict[str, Any]:
+    # same shape as the Mongo document, so both stores render identically
+    return {"_id": mongo_id, "content": content, "ai_response": ai_text}
+
+
+def shorten_feedback(ai_text: str) -> str:
+    return (ai_text[:62] + "..") if len(ai_text) > 62 else ai_text
+
 
 def build_submission_with_payload(
-    sub: Submission, user_input: dict[str, Any], ai_text: str
+    sub: Submission | SubmissionOut,
+    user_input: dict[str, Any],
+    ai_text: Optional[str],
 ) -> SubmissionWithPayloadOut:
     payload_for_response: Dict[str, Any] = {**user_input, "ai_response": ai_text}
     return SubmissionWithPayloadOut(
         uuid=sub.uuid,
         title=sub.title,
         language=sub.language,
+        status=sub.status,
         created_at=sub.created_at,
         updated_at=sub.updated_at,
         payload=CodePayload(**payload_for_response),
@@ -35,15 +139,44 @@ def build_submission_with_payload(
 
 
 class SubmissionsService:
-    def __init__(self, pg: SubmissionsPgRepo, mg: SubmissionsMongoRepo, ai: AIService):
+    def __init__(
+        self,
+        pg: SubmissionsPgRepo,
+        mg: SubmissionsMongoRepo,
+        ai: AIService,
+        cache: Optional[TTLCache[str, CachedReview]] = None,
+        inflight: Optional[SingleFlight[str, CachedReview]] = None,
+        jobs: Optional[ReviewJobQueue] = None,
+        broadcaster: Optional[ReviewBroadcaster] = None,
+        read_model: bool = PAYLOAD_READ_MODEL,
+        speculative_review: bool = SPECULATIVE_REVIEW,
+        near_duplicates: Optional[NearDuplicateIndex] = None,
+    ):
         self.pg = pg
         self.mg = mg
         self.ai = ai
+        self.cache = cache
+        self.inflight = inflight
+        self.jobs = jobs
+        self.broadcaster = broadcaster
+        self.read_model = read_model
+        self.speculative_review = speculative_review
+        self.near_duplicates = near_duplicates
+
+    def _cache_review(
+        self, code_hash: str, sub: Submission, ai_text: str
+    ) -> CachedReview:
+        review = CachedReview(
+            submission=SubmissionOut.model_validate(sub), ai_response=ai_text
+        )
+        if self.cache is not None:
+            self.cache.set(code_hash, review)
+        return review
 
     async def get(self, uuid: UUID) -> SubmissionWithPayloadOut:
         logger.info(f"Fetching submission by UUID: {uuid}")
         try:
-            sub = await self.pg.find_by_uuid(uuid)
+            sub = await self.pg.find_by_uuid(uuid, with_payload=self.read_model)
         except Exception:
             logger.exception(f"Error occurred while fetching submission {uuid}")
             raise HTTPException(500, "Error occurred")
@@ -53,7 +186,9 @@ class SubmissionsService:
             raise HTTPException(404, "Submission not found")
 
         payload_doc: Optional[SubmissionDocument] = None
-        if sub.mongo_id:
+        if self.read_model and sub.payload_snapshot is not None:
+            payload_doc = SubmissionDocument(**sub.payload_snapshot)
+        elif sub.mongo_id:
             try:
                 logger.debug(f"Fetching Mongo payload for submission {sub.id}")
                 payload_doc = await self.mg.find(sub.mongo_id)
@@ -66,38 +201,94 @@ class SubmissionsService:
             uuid=sub.uuid,
             title=sub.title,
             language=sub.language,
+            status=sub.status,
             created_at=sub.created_at,
             updated_at=sub.updated_at,
-            payload=(
-                CodePayload(**payload_doc.model_dump(by_alias=True, exclude_none=True))
-                if payload_doc
-                else None
-            ),
+            payload=payload_from_document(payload_doc) if payload_doc else None,
         )
 
-    async def get_all(self) -> List[SubmissionOut]:
+    async def get_all(
+        self,
+        *,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        language: Optional[Language] = None,
+        title_prefix: Optional[str] = None,
+        include_payload: bool = False,
+    ) -> SubmissionPage:
         logger.info("Fetching all submissions from Postgres")
+        after = decode_cursor(cursor) if cursor else None
         try:
-            pg_submissions = await self.pg.find_all()
+            # one extra row tells us whether another page exists
+            rows = await self.pg.find_all_rows(
+                limit=limit + 1,
+                after=after,
+                language=language,
+                title_prefix=title_prefix,
+            )
         except Exception:
             logger.exception("Error occurred while fetching all submissions")
             raise HTTPException(500, "Error occurred")
 
-        result = [
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if include_payload:
+            result = await self._with_payloads(rows)
+        else:
+            result = [SubmissionOut(**row) for row in rows]
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+        logger.info(f"Retrieved {len(result)} submissions")
+        return SubmissionPage(items=result, next_cursor=next_cursor)
+
+    async def export_ndjson(self, batch_size: int = 500) -> AsyncGenerator[bytes, None]:
+        logger.info("Exporting all submissions as NDJSON")
+        exported = 0
+        try:
+            async for rows in self.pg.stream_rows(batch_size=batch_size):
+                items = await self._with_payloads(rows, strict=True)
+                exported += len(items)
+                yield "".join(item.model_dump_json() + "\n" for item in items).encode(
+                    "utf-8"
+                )
+        except Exception:
+            # Headers are already sent. Re-raising aborts the connection instead
+            # of ending the chunked body cleanly, so a truncated dump can't pass
+            # for a complete one.
+            logger.exception(f"Submissions export aborted after {exported} rows")
+            raise
+        logger.info(f"Exported {exported} submissions")
+
+    async def _with_payloads(
+        self, rows: Sequence[RowMapping], strict: bool = False
+    ) -> List[SubmissionOut]:
+        docs: Dict[str, SubmissionDocument] = {}
+        mongo_ids = [row["mongo_id"] for row in rows if row["mongo_id"]]
+        try:
+            # one $in round trip for the whole page instead of a find per row
+            docs = {doc.id: doc for doc in await self.mg.find_many(mongo_ids) if doc.id}
+        except Exception:
+            logger.exception("Error fetching Mongo payloads for submissions page")
+            if strict:
+                raise
+
+        return [
             SubmissionOut(
-                uuid=sub.uuid,
-                title=sub.title,
-                language=sub.language,
-                created_at=sub.created_at,
-                updated_at=sub.updated_at,
-                short_feedback=sub.short_feedback,
+                **row,
+                payload=(
+                    payload_from_document(docs[row["mongo_id"]])
+                    if row["mongo_id"] in docs
+                    else None
+                ),
             )
-            for sub in pg_submissions
+            for row in rows
         ]
-        logger.info(f"Retrieved {len(result)} submissions")
-        return result
 
-    async def create(self, data: SubmissionCreate) -> SubmissionWithPayloadOut:
+    async def create(
+        self, data: SubmissionCreate, defer_review: bool = False
+    ) -> SubmissionWithPayloadOut:
         logger.info(
             f"Creating new submission with title={data.title}, language={data.language}"
         )
@@ -107,59 +298,581 @@ class SubmissionsService:
             logger.warning("Submission create failed: missing content field")
             raise HTTPException(400, "Content field is required")
 
-        code_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        code_hash = compute_code_hash(content, data.language)
         logger.debug(f"Generated hash {code_hash} for submission content")
 
+        cached = self.cache.get(code_hash) if self.cache is not None else None
+        if cached:
+            REVIEW_DEDUP_HITS.labels(source="cache").inc()
+            logger.info(
+                f"Review cache hit (hash={code_hash}), skipping database lookups"
+            )
+            return build_submission_with_payload(
+                cached.submission, user_input, cached.ai_response
+            )
+
+        defer = defer_review and self.jobs is not None and self.jobs.running
+        if self.inflight is not None:
+            review = await self.inflight.do(
+                code_hash,
+                lambda: self._resolve_review(data, user_input, code_hash, defer),
+            )
+        else:
+            review = await self._resolve_review(data, user_input, code_hash, defer)
+        return build_submission_with_payload(
+            review.submission, user_input, review.ai_response
+        )
+
+    async def _resolve_review(
+        self,
+        data: SubmissionCreate,
+        user_input: dict[str, Any],
+        code_hash: str,
+        defer: bool = False,
+    ) -> CachedReview:
+        stages: Dict[str, float] = {}
+        started = time.perf_counter()
+        # Optionally start the review while the dedup lookup is in flight; it
+        # is cancelled if the code turns out to be stored already.
+        speculative: Optional[asyncio.Task[str]] = None
+        if self.speculative_review and not defer:
+            speculative = asyncio.create_task(self._generate_feedback(data))
+        try:
+            existing = await self._lookup_review(data, code_hash)
+        except BaseException:
+            if speculative is not None:
+                _discard_task(speculative)
+            raise
+        stages["lookup"] = time.perf_counter() - started
+        if existing is not None:
+            if speculative is not None:
+                _discard_task(speculative)
+                logger.info(f"Cancelled speculative review for duplicate {code_hash}")
+            return existing
+
+        if defer and self.jobs is not None:
+            return await self._defer_review(data, user_input, code_hash, stages)
+
+        ai_started = time.perf_counter()
+        try:
+            if speculative is not None:
+                ai_text = await speculative
+            else:
+                ai_text = await self._generate_feedback(data)
+        except AICircuitOpenError as exc:
+            if self.jobs is None or not self.jobs.running:
+                raise ai_unavailable(exc)
+            # degrade to an asynchronous review; the worker retries once the
+            # circuit lets calls through again
+            logger.warning(f"AI circuit open, queueing review for hash {code_hash}")
+            return await self._defer_review(data, user_input, code_hash, stages)
+        # with a speculative call this is only the part not hidden by the lookup
+        stages["ai"] = time.perf_counter() - ai_started
+        store_started = time.perf_counter()
+        sub = await self._store_submission(
+            data,
+            user_input,
+            code_hash,
+            ai_text,
+            shorten_feedback(ai_text),
+            SubmissionStatus.COMPLETED,
+        )
+        stages["store"] = time.perf_counter() - store_started
+        _log_stages(code_hash, stages)
+        if sub is None:
+            return await self._concurrent_review(code_hash)
+        if self.near_duplicates is not None:
+            self.near_duplicates.add(code_hash, data.payload.content, data.language)
+        return self._cache_review(code_hash, sub, ai_text)
+
+    async def _defer_review(
+        self,
+        data: SubmissionCreate,
+        user_input: dict[str, Any],
+        code_hash: str,
+        stages: Dict[str, float],
+    ) -> CachedReview:
+        assert self.jobs is not None
+        store_started = time.perf_counter()
+        sub = await self._store_submission(
+            data, user_input, code_hash, None, "", SubmissionStatus.PENDING
+        )
+        stages["store"] = time.perf_counter() - store_started
+        _log_stages(code_hash, stages)
+        if sub is None:
+            return await self._concurrent_review(code_hash)
+        if self.near_duplicates is not None:
+            self.near_duplicates.add(code_hash, data.payload.content, data.language)
+        self.jobs.submit(sub.uuid)
+        logger.info(f"Queued review for submission {sub.uuid}")
+        return CachedReview(
+            submission=SubmissionOut.model_validate(sub), ai_response=None
+        )
+
+    async def _lookup_review(
+        self, data: SubmissionCreate, code_hash: str
+    ) -> Optional[CachedReview]:
+        existing = await self._existing_review(code_hash)
+        if existing is not None:
+            REVIEW_DEDUP_HITS.labels(source="database").inc()
+            return existing
+        if self.near_duplicates is None:
+            return None
+
+        match = self.near_duplicates.query(data.payload.content, data.language)
+        if match is None or match.code_hash == code_hash:
+            return None
+        review = await self._existing_review(match.code_hash)
+        if review is None:
+            return None
+        logger.info(
+            f"Near-duplicate of {match.code_hash} (similarity={match.similarity:.2f}), "
+            "reusing its review"
+        )
+        REVIEW_DEDUP_HITS.labels(source="near_duplicate").inc()
+        if self.cache is not None and review.ai_response is not None:
+            self.cache.set(code_hash, review)
+        return review
+
+    async def _existing_review(self, code_hash: str) -> Optional[CachedReview]:
         try:
             check_submission = await self.pg.find_by_hash(code_hash)
         except Exception:
             logger.exception("Error occurred while checking submission hash")
             raise HTTPException(500, "Error occurred")
 
-        if check_submission and check_submission.mongo_id is not None:
+        if (
+            check_submission
+            and check_submission.mongo_id is not None
+            and check_submission.status != SubmissionStatus.FAILED
+        ):
             try:
                 logger.info(
                     f"Duplicate submission detected (hash={code_hash}), returning cached result"
                 )
                 payload_doc = await self.mg.find(str(check_submission.mongo_id))
                 if payload_doc:
-                    return build_submission_with_payload(
-                        check_submission,
-                        user_input,
-                        payload_doc.ai_response or "",
+                    if check_submission.status == SubmissionStatus.PENDING:
+                        # still being reviewed; don't cache an unfinished result
+                        return CachedReview(
+                            submission=SubmissionOut.model_validate(check_submission),
+                            ai_response=None,
+                        )
+                    return self._cache_review(
+                        code_hash, check_submission, payload_doc.ai_response or ""
                     )
             except PyMongoError:
                 logger.exception("Error fetching cached Mongo payload")
-        short_feedback = ""
+        return None
+
+    async def _concurrent_review(self, code_hash: str) -> CachedReview:
+        # another request (or instance) stored this hash between our lookup and
+        # the insert; the unique index kept its row, so serve that one
+        logger.info(f"Submission hash {code_hash} stored concurrently, reusing it")
+        existing = await self._existing_review(code_hash)
+        if existing is None:
+            raise HTTPException(500, "Error occurred")
+        return existing
+
+    async def _generate_feedback(self, data: SubmissionCreate | ReviewPayload) -> str:
         try:
             ai_text = await self.ai.get_feedback(data=data) or ""
-            short_feedback = (ai_text[:62] + "..") if len(ai_text) > 62 else ai_text
             logger.info("AI feedback generated successfully")
+            return ai_text
+        except AICircuitOpenError:
+            raise  # the caller may still defer the review
+        except AIUnavailableError as exc:
+            logger.warning(f"AI unavailable, not storing submission: {exc}")
+            raise ai_unavailable(exc)
         except Exception:
+            # never store an empty review for a call that failed
             logger.exception("AI feedback generation failed")
-            ai_text = ""
+            raise HTTPException(500, "Error occurred")
 
-        mongo_id: Optional[str] = None
+    async def _store_submission(
+        self,
+        data: SubmissionCreate,
+        user_input: dict[str, Any],
+        code_hash: str,
+        ai_text: Optional[str],
+        short_feedback: str,
+        status: SubmissionStatus,
+    ) -> Optional[Submission]:
+        # The ObjectId is minted here so Postgres and Mongo can be written
+        # concurrently; whichever write fails, the other one is undone.
+        mongo_id = str(ObjectId())
+        if self.cache is not None:
+            self.cache.invalidate(code_hash)
+        mongo_result, pg_result = await asyncio.gather(
+            self.mg.insert(user_input, ai_text, mongo_id=mongo_id),
+            self.pg.create(
+                title=data.title,
+                language=data.language,
+                mongo_id=mongo_id,
+                code_hash=code_hash,
+                short_feedback=short_feedback,
+                status=status,
+                payload_snapshot=(
+                    payload_snapshot(mongo_id, user_input["content"], ai_text)
+                    if self.read_model
+                    else None
+                ),
+            ),
+            return_exceptions=True,
+        )
+        for result in (mongo_result, pg_result):
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        mongo_failed = isinstance(mongo_result, BaseException)
+        if mongo_failed:
+            logger.error(f"Mongo insert failed — aborting request: {mongo_result!r}")
+
+        if isinstance(pg_result, BaseException):
+            logger.error(f"Error occurred while creating submission: {pg_result!r}")
+            if not mongo_failed:
+                await self._discard_payloads([mongo_id])
+            raise HTTPException(500, "Error occurred")
+        sub = pg_result
+        if mongo_failed:
+            if sub is not None:
+                await self._discard_row(sub.uuid)
+            raise HTTPException(500, "Error occurred while inserting in database")
+        logger.info(f"Inserted payload into MongoDB with id={mongo_id}")
+        if sub is None:
+            await self._discard_payloads([mongo_id])
+            return None
+        logger.info(f"Submission stored in Postgres with id={sub.id}")
+        return sub
+
+    async def _discard_row(self, uuid: UUID) -> None:
         try:
-            mongo_id = await self.mg.insert(user_input, ai_text)
-            logger.info(f"Inserted payload into MongoDB with id={mongo_id}")
+            await self.pg.delete(uuid)
+        except SQLAlchemyError:
+            logger.exception(f"Could not remove submission {uuid} without payload")
+
+    async def _discard_payloads(self, mongo_ids: Sequence[str]) -> None:
+        try:
+            await self.mg.delete_many(mongo_ids)
         except PyMongoError:
-            logger.exception("Mongo insert failed — aborting request")
+            logger.exception(f"Could not remove orphaned payloads {list(mongo_ids)}")
+
+    async def create_batch(
+        self,
+        items: Sequence[SubmissionCreate],
+        concurrency: int = BATCH_AI_CONCURRENCY,
+    ) -> List[SubmissionBatchItemOut]:
+        logger.info(f"Creating batch of {len(items)} submissions")
+        hashes = [
+            compute_code_hash(item.payload.content, item.language) for item in items
+        ]
+        reviews: Dict[str, CachedReview] = {}
+        for code_hash in dict.fromkeys(hashes):
+            cached = self.cache.get(code_hash) if self.cache is not None else None
+            if cached:
+                reviews[code_hash] = cached
+
+        # one WHERE hash IN (...) plus one $in for everything the cache missed
+        try:
+            existing: Dict[str, Submission] = {}
+            for sub in await self.pg.find_by_hashes(
+                [h for h in dict.fromkeys(hashes) if h not in reviews]
+            ):
+                if sub.status != SubmissionStatus.FAILED:
+                    existing.setdefault(sub.hash, sub)
+            docs = {
+                doc.id: doc
+                for doc in await self.mg.find_many(
+                    [sub.mongo_id for sub in existing.values()]
+                )
+                if doc.id
+            }
+        except Exception:
+            logger.exception("Error occurred while checking batch hashes")
+            raise HTTPException(500, "Error occurred")
+        for code_hash, sub in existing.items():
+            doc = docs.get(sub.mongo_id)
+            if doc is None:
+                continue
+            REVIEW_DEDUP_HITS.labels(source="database").inc()
+            if sub.status == SubmissionStatus.PENDING:
+                reviews[code_hash] = CachedReview(
+                    submission=SubmissionOut.model_validate(sub), ai_response=None
+                )
+            else:
+                reviews[code_hash] = self._cache_review(
+                    code_hash, sub, doc.ai_response or ""
+                )
+
+        # the first item of each new hash is reviewed; later copies reuse it
+        leaders: Dict[str, int] = {}
+        for index, code_hash in enumerate(hashes):
+            if code_hash not in reviews:
+                leaders.setdefault(code_hash, index)
 
-        if mongo_id:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def review(index: int) -> Optional[str]:
+            async with semaphore:
+                return await self.ai.get_feedback(data=items[index])
+
+        outcomes = await asyncio.gather(
+            *(review(index) for index in leaders.values()), return_exceptions=True
+        )
+
+        errors: Dict[str, str] = {}
+        raced: Dict[str, str] = {}
+        to_store: List[tuple[str, int, str]] = []
+        for (code_hash, index), outcome in zip(leaders.items(), outcomes):
+            if isinstance(outcome, AIUnavailableError):
+                errors[code_hash] = "AI service is busy, please retry later"
+            elif isinstance(outcome, BaseException):
+                logger.error(
+                    f"AI feedback generation failed for item {index}", exc_info=outcome
+                )
+                errors[code_hash] = "AI feedback generation failed"
+            else:
+                to_store.append((code_hash, index, outcome or ""))
+
+        if to_store:
+            mongo_ids: List[str] = []
             try:
-                sub = await self.pg.create(
-                    title=data.title,
-                    language=data.language,
-                    mongo_id=mongo_id,
-                    code_hash=code_hash,
-                    short_feedback=short_feedback,
+                mongo_ids = await self.mg.insert_many(
+                    [
+                        (items[index].payload.model_dump(), text)
+                        for _, index, text in to_store
+                    ]
                 )
-                logger.info(f"Submission stored in Postgres with id={sub.id}")
-            except SQLAlchemyError:
-                logger.exception("Error occurred while creating submission")
-                raise HTTPException(500, "Error occurred")
-        else:
-            raise HTTPException(500, "Error occurred while inserting in database")
+                if self.cache is not None:
+                    for code_hash, _, _ in to_store:
+                        self.cache.invalidate(code_hash)
+                subs = await self.pg.create_many(
+                    [
+                        {
+                            "title": items[index].title,
+                            "language": items[index].language,
+                            "mongo_id": mongo_id,
+                            "hash": code_hash,
+                            "short_feedback": shorten_feedback(text),
+                            "status": SubmissionStatus.COMPLETED,
+                            "payload_snapshot": (
+                                payload_snapshot(
+                                    mongo_id, items[index].payload.content, text
+                                )
+                                if self.read_model
+                                else None
+                            ),
+                        }
+                        for (code_hash, index, text), mongo_id in zip(
+                            to_store, mongo_ids
+                        )
+                    ]
+                )
+                by_mongo_id = {sub.mongo_id: sub for sub in subs}
+                for (code_hash, index, text), mongo_id in zip(to_store, mongo_ids):
+                    stored = by_mongo_id.get(mongo_id)
+                    if stored is None:
+                        raced[code_hash] = mongo_id
+                        continue
+                    reviews[code_hash] = self._cache_review(code_hash, stored, text)
+                    if self.near_duplicates is not None:
+                        self.near_duplicates.add(
+                            code_hash,
+                            items[index].payload.content,
+                            items[index].language,
+                        )
+                logger.info(f"Stored {len(subs)} new submissions from batch")
+            except (PyMongoError, SQLAlchemyError):
+                logger.exception("Error occurred while storing submission batch")
+                if mongo_ids:
+                    await self._discard_payloads(mongo_ids)
+                for code_hash, _, _ in to_store:
+                    errors[code_hash] = "Error occurred while inserting in database"
+
+        if raced:
+            # stored concurrently by another request; report those rows instead
+            await self._discard_payloads(list(raced.values()))
+            for code_hash in raced:
+                leaders.pop(code_hash)
+                existing_review = await self._existing_review(code_hash)
+                if existing_review is None:
+                    errors[code_hash] = "Error occurred while inserting in database"
+                else:
+                    reviews[code_hash] = existing_review
+
+        results: List[SubmissionBatchItemOut] = []
+        for index, (item, code_hash) in enumerate(zip(items, hashes)):
+            if code_hash in errors:
+                results.append(
+                    SubmissionBatchItemOut(
+                        index=index, status="error", detail=errors[code_hash]
+                    )
+                )
+                continue
+            cached_review = reviews[code_hash]
+            results.append(
+                SubmissionBatchItemOut(
+                    index=index,
+                    status="created"
+                    if leaders.get(code_hash) == index
+                    else "duplicate",
+                    submission=build_submission_with_payload(
+                        cached_review.submission,
+                        item.payload.model_dump(),
+                        cached_review.ai_response,
+                    ),
+                )
+            )
+        return results
+
+    async def complete_review(self, uuid: UUID) -> None:
+        """Fill in the AI review of a pending submission (run by review workers)."""
+        # Every process re-queues pending rows on startup, so the row is claimed
+        # first; only the worker holding the claim calls the AI.
+        sub = await self.pg.claim_review(uuid, stale_after=REVIEW_CLAIM_TIMEOUT_SECONDS)
+        if sub is None:
+            current = await self.pg.find_by_uuid(uuid)
+            if current is not None and current.status == SubmissionStatus.PENDING:
+                raise ReviewClaimedError()
+            return
+        payload_doc = await self.mg.find(sub.mongo_id)
+        if payload_doc is None:
+            logger.error(f"Pending submission {uuid} has no Mongo payload")
+            await self.fail_review(uuid)
+            return
 
-        return build_submission_with_payload(sub, user_input, ai_text)
+        data = ReviewPayload(
+            language=sub.language, payload=CodePayload(content=payload_doc.content)
+        )
+        # Streamed so SSE subscribers can watch the review being written.
+        # AIUnavailableError propagates so the worker can retry later.
+        channel = self.broadcaster.open(uuid) if self.broadcaster is not None else None
+        parts: List[str] = []
+        try:
+            async for delta in self.ai.stream_deltas(data):
+                parts.append(delta)
+                if channel is not None:
+                    channel.publish(delta)
+        except AIUnavailableError:
+            # let the retry (from this process or another) claim it again
+            await self.pg.release_review(uuid)
+            raise
+        ai_text = "".join(parts)
+
+        await self.mg.update_ai_response(sub.mongo_id, ai_text)
+        updated = await self.pg.update_review(
+            uuid,
+            short_feedback=shorten_feedback(ai_text),
+            status=SubmissionStatus.COMPLETED,
+            payload_snapshot=(
+                payload_snapshot(sub.mongo_id, payload_doc.content, ai_text)
+                if self.read_model
+                else None
+            ),
+        )
+        if updated:
+            self._cache_review(updated.hash, updated, ai_text)
+        if self.broadcaster is not None:
+            self.broadcaster.finish(uuid, SubmissionStatus.COMPLETED.value)
+        logger.info(f"Completed review for submission {uuid}")
+
+    async def fail_review(self, uuid: UUID) -> None:
+        await self.pg.update_review(
+            uuid, short_feedback="", status=SubmissionStatus.FAILED
+        )
+        if self.broadcaster is not None:
+            self.broadcaster.finish(uuid, SubmissionStatus.FAILED.value)
+
+    async def review_events(self, uuid: UUID) -> AsyncGenerator[bytes, None]:
+        """Return an SSE stream for a submission's review (404 before streaming)."""
+        try:
+            sub = await self.pg.find_by_uuid(uuid)
+        except Exception:
+            logger.exception(f"Error occurred while fetching submission {uuid}")
+            raise HTTPException(500, "Error occurred")
+        if not sub:
+            raise HTTPException(404, "Submission not found")
+
+        if sub.status == SubmissionStatus.PENDING and self.broadcaster is not None:
+            return self._live_review_events(uuid)
+        return self._stored_review_events(sub.mongo_id, sub.status)
+
+    async def _live_review_events(self, uuid: UUID) -> AsyncGenerator[bytes, None]:
+        assert self.broadcaster is not None
+        subscription = self.broadcaster.subscribe(
+            uuid, idle_timeout=REVIEW_EVENTS_KEEPALIVE_SECONDS
+        )
+        finished: Optional[RowMapping] = None
+        async with aclosing(subscription):
+            async for event, data in subscription:
+                if event != "ping":
+                    yield format_sse(event, data)
+                    continue
+                try:
+                    state = await self.pg.find_review_state(uuid)
+                except Exception:
+                    logger.exception(f"Error re-reading status of submission {uuid}")
+                    state = None
+                if state is not None and state["status"] != SubmissionStatus.PENDING:
+                    # finished without publishing here, e.g. on another instance
+                    finished = state
+                    break
+                yield b": keepalive\n\n"
+        if finished is not None:
+            async for chunk in self._stored_review_events(
+                finished["mongo_id"], finished["status"]
+            ):
+                yield chunk
+
+    async def _stored_review_events(
+        self, mongo_id: str, status: SubmissionStatus
+    ) -> AsyncGenerator[bytes, None]:
+        payload_doc = None
+        try:
+            payload_doc = await self.mg.find(mongo_id)
+        except PyMongoError:
+            logger.exception("Error fetching Mongo payload for review events")
+        if payload_doc and payload_doc.ai_response:
+            yield format_sse("delta", {"text": payload_doc.ai_response})
+        yield format_sse("done", {"status": status.value})
+
+    async def stream_review(self, data: ReviewPayload) -> AsyncGenerator[bytes, None]:
+        # The stored-review lookup runs here rather than inside the generator:
+        # StreamingResponse bodies run after the request session is torn down.
+        code_hash = compute_code_hash(data.payload.content, data.language)
+        stored = await self._find_stored_review(code_hash)
+        if stored is not None:
+            logger.info(f"Replaying stored review (hash={code_hash})")
+            return self._replay_review(stored)
+        return self._fresh_review(data, code_hash)
+
+    async def _replay_review(self, stored: str) -> AsyncGenerator[bytes, None]:
+        for start in range(0, len(stored), REVIEW_REPLAY_CHUNK_SIZE):
+            yield stored[start : start + REVIEW_REPLAY_CHUNK_SIZE].encode("utf-8")
+
+    async def _fresh_review(
+        self, data: ReviewPayload, code_hash: str
+    ) -> AsyncGenerator[bytes, None]:
+        async def persist(ai_text: str) -> None:
+            try:
+                await self.mg.save_review(code_hash, ai_text)
+                logger.info(f"Stored streamed review (hash={code_hash})")
+            except PyMongoError:
+                logger.exception("Error storing streamed review")
+
+        async for chunk in self.ai.stream_feedback(data, on_complete=persist):
+            yield chunk
+
+    async def _find_stored_review(self, code_hash: str) -> Optional[str]:
+        cached = self.cache.get(code_hash) if self.cache is not None else None
+        if cached and cached.ai_response:
+            return cached.ai_response
+        try:
+            sub = await self.pg.find_by_hash(code_hash)
+            if sub and sub.mongo_id:
+                payload_doc = await self.mg.find(sub.mongo_id)
+                if payload_doc and payload_doc.ai_response:
+                    return payload_doc.ai_response
+            return await self.mg.find_review(code_hash)
+        except Exception:
+            logger.exception("Error looking up stored review, streaming a fresh one")
+            return None
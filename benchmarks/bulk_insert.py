@@ -0,0 +1,130 @@
+"""Compare per-row submission inserts with the multi-row RETURNING path.
+
+Runs inside a transaction that is rolled back afterwards; the repository's
+commits become savepoint releases, so nothing is left behind. Times the
+original add/commit/refresh sequence, SubmissionsPgRepo.create (one
+INSERT ... RETURNING per row) and SubmissionsPgRepo.create_many.
+
+    python -m benchmarks.bulk_insert --rows 2000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.db import DATABASE_URL, Base
+from app.models.postgre import Language, Submission
+from app.repositories.postgre.submissions import SubmissionsPgRepo
+
+
+def make_rows(count: int) -> List[Dict[str, Any]]:
+    languages = list(Language)
+    return [
+        {
+            "title": f"bench submission {i}",
+            "language": languages[i % len(languages)],
+            "mongo_id": uuid.uuid4().hex,
+            "hash": uuid.uuid4().hex + uuid.uuid4().hex,
+            "short_feedback": "Looks fine overall, consider adding tests..",
+        }
+        for i in range(count)
+    ]
+
+
+async def measure(
+    fn: Callable[[List[Dict[str, Any]]], Awaitable[int]], rows: int, rounds: int
+) -> List[float]:
+    await fn(make_rows(min(rows, 10)))  # warm up statement caches
+    timings = []
+    for _ in range(rounds):
+        batch = make_rows(rows)
+        started = time.perf_counter()
+        await fn(batch)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def report(name: str, timings: List[float], rows: int) -> float:
+    mean = statistics.mean(timings)
+    print(
+        f"{name:<12} mean={mean * 1000:10.1f}ms  "
+        f"best={min(timings) * 1000:10.1f}ms  rows/s={rows / mean:10.0f}"
+    )
+    return mean
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            session = AsyncSession(
+                bind=conn,
+                expire_on_commit=False,
+                join_transaction_mode="create_savepoint",
+            )
+            repo = SubmissionsPgRepo(session)
+
+            async def refresh_path(batch: List[Dict[str, Any]]) -> int:
+                for row in batch:
+                    sub = Submission(**row)
+                    session.add(sub)
+                    await session.commit()
+                    await session.refresh(sub)
+                session.expunge_all()
+                return len(batch)
+
+            async def returning_path(batch: List[Dict[str, Any]]) -> int:
+                for row in batch:
+                    await repo.create(
+                        title=row["title"],
+                        language=row["language"],
+                        mongo_id=row["mongo_id"],
+                        code_hash=row["hash"],
+                        short_feedback=row["short_feedback"],
+                    )
+                session.expunge_all()
+                return len(batch)
+
+            async def bulk_path(batch: List[Dict[str, Any]]) -> int:
+                subs = await repo.create_many(batch)
+                assert all(sub.uuid and sub.created_at for sub in subs)
+                session.expunge_all()
+                return len(subs)
+
+            per_row = report(
+                "add+refresh",
+                await measure(refresh_path, args.rows, args.rounds),
+                args.rows,
+            )
+            report(
+                "returning",
+                await measure(returning_path, args.rows, args.rounds),
+                args.rows,
+            )
+            bulk = report(
+                "create_many",
+                await measure(bulk_path, args.rows, args.rounds),
+                args.rows,
+            )
+            print(f"create_many speedup over add+refresh: {per_row / bulk:.1f}x")
+            await session.close()
+        finally:
+            await trans.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
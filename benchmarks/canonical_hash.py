@@ -0,0 +1,90 @@
+"""Measure canonical hashing throughput on ~500-character payloads.
+
+Builds realistic snippets per language, then times canonical_hash against the
+plain sha256 it replaced, reporting payloads per second and per-call latency.
+
+    python -m benchmarks.canonical_hash --payloads 5000 --size 500
+"""
+
+import argparse
+import hashlib
+import random
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from app.models.postgre import Language
+from app.services.canonical import canonical_hash
+
+LINES: Dict[Language, List[str]] = {
+    Language.PYTHON: [
+        "def handle_{n}(event, context):",
+        "    body = event.get('body') or {{}}  # payload",
+        "    items = [x * {n} for x in body.get('items', [])]",
+        "    if not items:",
+        "        return {{'status': 400}}",
+        "    return {{'status': 200, 'total': sum(items)}}",
+    ],
+    Language.JAVASCRIPT: [
+        "function handle{n}(event) {{",
+        "  const body = event.body || {{}}; // payload",
+        "  const items = (body.items || []).map((x) => x * {n});",
+        "  if (!items.length) return {{ status: 400 }};",
+        "  /* sum them */ return {{ status: 200, total: items.reduce((a, b) => a + b, 0) }};",
+        "}}",
+    ],
+    Language.JAVA: [
+        "public int handle{n}(List<Integer> items) {{",
+        "    // payload",
+        "    int total = 0;",
+        "    for (int x : items) {{ total += x * {n}; }}",
+        "    if (items.isEmpty()) {{ return -1; }}",
+        "    return total;",
+        "}}",
+    ],
+}
+
+
+def payload(language: Language, size: int, rng: random.Random) -> str:
+    out: List[str] = []
+    while sum(len(line) + 1 for line in out) < size:
+        out.extend(line.format(n=rng.randrange(1000)) for line in LINES[language])
+    return "\n".join(out)[:size]
+
+
+def sha256(content: str, language: Language) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def measure(
+    hasher: Callable[[str, Language], str], payloads: List[str], language: Language
+) -> List[float]:
+    samples = []
+    for content in payloads:
+        started = time.perf_counter()
+        hasher(content, language)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    for language in Language:
+        payloads = [payload(language, args.size, rng) for _ in range(args.payloads)]
+        for name, hasher in (("sha256", sha256), ("canonical", canonical_hash)):
+            samples = measure(hasher, payloads, language)
+            ordered = sorted(samples)
+            print(
+                f"{language.value:<11} {name:<9} "
+                f"{len(samples) / sum(samples):10.0f} payloads/s  "
+                f"mean={statistics.mean(samples) * 1e6:7.1f}us  "
+                f"p99={ordered[int(len(ordered) * 0.99)] * 1e6:7.1f}us"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payloads", type=int, default=5000)
+    parser.add_argument("--size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    main(parser.parse_args())
@@ -0,0 +1,100 @@
+"""Compare ORM hydration with column projection for the submissions listing.
+
+Seeds rows inside a transaction that is rolled back afterwards, then times
+SubmissionsPgRepo.find_all (full ORM objects) against find_all_rows (plain
+column mappings), both turned into SubmissionOut like the service does.
+
+    python -m benchmarks.listing_projection --rows 5000 --page 200 --rounds 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import Awaitable, Callable, List
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.db import DATABASE_URL, Base
+from app.models.postgre import Language, Submission
+from app.repositories.postgre.submissions import SubmissionsPgRepo
+from app.schemas.submissions import SubmissionOut
+
+
+async def measure(fn: Callable[[], Awaitable[int]], rounds: int) -> List[float]:
+    await fn()  # warm up statement caches
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def report(name: str, timings: List[float], page: int) -> float:
+    mean = statistics.mean(timings)
+    p95 = statistics.quantiles(timings, n=20)[-1]
+    print(
+        f"{name:<12} mean={mean * 1000:8.3f}ms  p95={p95 * 1000:8.3f}ms  "
+        f"rows/s={page / mean:12.0f}"
+    )
+    return mean
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            languages = list(Language)
+            await conn.execute(
+                insert(Submission),
+                [
+                    {
+                        "uuid": uuid.uuid4(),
+                        "title": f"bench submission {i}",
+                        "hash": uuid.uuid4().hex + uuid.uuid4().hex,
+                        "short_feedback": "Looks fine overall, consider adding tests..",
+                        "mongo_id": uuid.uuid4().hex,
+                        "language": languages[i % len(languages)],
+                    }
+                    for i in range(args.rows)
+                ],
+            )
+            session = AsyncSession(bind=conn, expire_on_commit=False)
+            repo = SubmissionsPgRepo(session)
+
+            async def orm_path() -> int:
+                subs = await repo.find_all(limit=args.page)
+                items = [SubmissionOut.model_validate(sub) for sub in subs]
+                session.expunge_all()  # each request starts with a fresh session
+                return len(items)
+
+            async def projection_path() -> int:
+                rows = await repo.find_all_rows(limit=args.page)
+                items = [SubmissionOut(**row) for row in rows]
+                return len(items)
+
+            orm = report("orm", await measure(orm_path, args.rounds), args.page)
+            proj = report(
+                "projection", await measure(projection_path, args.rounds), args.page
+            )
+            print(f"projection speedup: {orm / proj:.2f}x")
+            await session.close()
+        finally:
+            await trans.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--page", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,306 @@
+"""End-to-end load test of the submission and review paths, fully offline.
+
+Drives the real FastAPI app in-process over httpx's ASGI transport, with the
+repositories replaced by in-memory stand-ins (benchmarks/memory_repos.py) and
+AI calls served by the fake provider. Routing, validation, the service layer,
+caching, dedup and review streaming all run; Postgres, Mongo and OpenAI do not.
+Reports p50/p95/p99 latency and requests per second per operation and can
+write them as JSON. Pass --compare with an earlier result to see the change.
+
+    python -m benchmarks.load --requests 2000 --concurrency 32 --output load.json
+    python -m benchmarks.load --requests 2000 --concurrency 32 --compare load.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import platform
+import random
+import subprocess
+import time
+from datetime import UTC, datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.di import get_ai, get_mg_repo, get_pg_repo
+from app.main import app
+from app.models.postgre import Language
+from app.services.ai import AI, AIScheduler, CircuitBreaker
+from app.services.ai_providers import FakeAIProvider, FakeAISettings
+from benchmarks.memory_repos import MemoryMongoRepo, MemoryPgRepo
+
+OPERATIONS = ("create", "get", "list", "review")
+
+Sample = Tuple[float, bool]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r} in --mix")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def snippet(n: int) -> str:
+    return (
+        f"def handle_{n}(event):\n"
+        f"    items = event.get('items_{n}', [])\n"
+        f"    return sum(item * {n} for item in items)\n"
+    )
+
+
+class Workload:
+    """Request bodies and targets, drawn from one seeded RNG so runs repeat."""
+
+    def __init__(self, rng: random.Random, duplicate_rate: float):
+        self.rng = rng
+        self.duplicate_rate = duplicate_rate
+        self.counter = itertools.count()
+        self.contents: List[Tuple[str, str]] = []
+        self.uuids: List[str] = []
+
+    def code(self) -> Tuple[str, str]:
+        if self.contents and self.rng.random() < self.duplicate_rate:
+            return self.rng.choice(self.contents)
+        n = next(self.counter)
+        code = (list(Language)[n % len(Language)].value, snippet(n))
+        self.contents.append(code)
+        return code
+
+
+async def create(client: httpx.AsyncClient, work: Workload) -> bool:
+    language, content = work.code()
+    response = await client.post(
+        "/submissions",
+        json={
+            "title": f"load {len(work.uuids)}",
+            "language": language,
+            "payload": {"content": content},
+        },
+    )
+    if response.status_code < 400:
+        work.uuids.append(response.json()["uuid"])
+    return response.status_code < 400
+
+
+async def get(client: httpx.AsyncClient, work: Workload) -> bool:
+    if not work.uuids:
+        return await create(client, work)
+    response = await client.get(f"/submissions/{work.rng.choice(work.uuids)}")
+    return response.status_code < 400
+
+
+async def list_page(client: httpx.AsyncClient, work: Workload) -> bool:
+    params = {"limit": "20"}
+    if work.rng.random() < 0.5:
+        params["language"] = work.rng.choice(list(Language)).value
+    response = await client.get("/submissions", params=params)
+    return response.status_code < 400
+
+
+async def review(client: httpx.AsyncClient, work: Workload) -> bool:
+    language, content = work.code()
+    async with client.stream(
+        "POST",
+        "/review",
+        json={"language": language, "payload": {"content": content}},
+    ) as response:
+        async for _ in response.aiter_bytes():
+            pass
+    return response.status_code < 400
+
+
+RUNNERS: Dict[str, Callable[[httpx.AsyncClient, Workload], Awaitable[bool]]] = {
+    "create": create,
+    "get": get,
+    "list": list_page,
+    "review": review,
+}
+
+
+def install_stand_ins(args: argparse.Namespace) -> Dict[str, Any]:
+    pg = MemoryPgRepo(latency=args.store_latency_ms / 1000)
+    mg = MemoryMongoRepo(latency=args.store_latency_ms / 1000)
+    provider = FakeAIProvider(
+        FakeAISettings(
+            latency_ms=args.ai_latency_ms,
+            latency_sigma=args.ai_latency_sigma,
+            chunks=args.ai_chunks,
+            chunk_interval_ms=args.ai_chunk_interval_ms,
+            rate_limit_rate=args.ai_rate_limit_rate,
+            error_rate=args.ai_error_rate,
+            seed=args.seed,
+        )
+    )
+    # budgets sized so the scheduler only bounds concurrency, as a tuned deploy would
+    scheduler = AIScheduler(
+        rpm=10**9, tpm=10**12, max_concurrency=args.ai_concurrency, queue_timeout=60
+    )
+    breaker = CircuitBreaker()
+    app.dependency_overrides[get_pg_repo] = lambda: pg
+    app.dependency_overrides[get_mg_repo] = lambda: mg
+    app.dependency_overrides[get_ai] = lambda: AI(
+        provider, scheduler=scheduler, breaker=breaker
+    )
+    return {"pg": pg, "mongo": mg, "ai": provider}
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def summarise(samples: List[Sample], wall: float) -> Dict[str, Any]:
+    ordered = sorted(seconds for seconds, _ in samples)
+    if not ordered:
+        return {"requests": 0}
+    return {
+        "requests": len(ordered),
+        "errors": sum(not ok for _, ok in samples),
+        "rps": round(len(ordered) / wall, 2),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    stand_ins = install_stand_ins(args)
+    rng = random.Random(args.seed)
+    work = Workload(rng, args.duplicate_rate)
+    mix = parse_mix(args.mix)
+    plan = rng.choices(list(mix), weights=list(mix.values()), k=args.requests)
+    samples: Dict[str, List[Sample]] = {name: [] for name in mix}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://load", timeout=None
+    ) as client:
+        # seed rows for get/list before timing starts
+        for start in range(0, args.warmup, args.concurrency):
+            count = min(args.concurrency, args.warmup - start)
+            await asyncio.gather(*(create(client, work) for _ in range(count)))
+
+        jobs = iter(plan)
+
+        async def worker() -> None:
+            for name in jobs:
+                started = time.perf_counter()
+                try:
+                    ok = await RUNNERS[name](client, work)
+                except httpx.HTTPError:
+                    ok = False
+                samples[name].append((time.perf_counter() - started, ok))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - started
+
+    operations = {name: summarise(result, wall) for name, result in samples.items()}
+    operations["all"] = summarise(
+        [sample for result in samples.values() for sample in result], wall
+    )
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "config": {
+                key: value
+                for key, value in vars(args).items()
+                if key not in ("output", "compare")
+            },
+        },
+        "wall_seconds": round(wall, 3),
+        "operations": operations,
+        "calls": {name: store.calls for name, store in stand_ins.items()},
+    }
+
+
+def report(result: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    print(f"{result['wall_seconds']:.2f}s wall, commit {result['meta']['commit']}")
+    print(
+        f"{'operation':<9} {'reqs':>6} {'errs':>5} {'rps':>9} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    )
+    for name, stats in result["operations"].items():
+        if not stats["requests"]:
+            continue
+        line = (
+            f"{name:<9} {stats['requests']:>6} {stats['errors']:>5} "
+            f"{stats['rps']:>9.1f} {stats['p50_ms']:>9.2f} "
+            f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}"
+        )
+        before = (baseline or {}).get("operations", {}).get(name)
+        if before and before.get("requests"):
+            line += (
+                f"   p95 {change(before['p95_ms'], stats['p95_ms'])}"
+                f"  rps {change(before['rps'], stats['rps'])}"
+            )
+        print(line)
+
+
+def change(before: float, after: float) -> str:
+    if not before:
+        return "   n/a"
+    return f"{(after - before) / before * 100:+6.1f}%"
+
+
+async def main(args: argparse.Namespace) -> None:
+    logging.getLogger().setLevel(args.log_level)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+    result = await run(args)
+    report(result, baseline)
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(result, fh, indent=2, default=str)
+            fh.write("\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument(
+        "--mix",
+        default="create=3,get=3,list=2,review=2",
+        help="relative weights of create, get, list and review",
+    )
+    parser.add_argument("--warmup", type=int, default=50, help="untimed creates")
+    parser.add_argument("--duplicate-rate", type=float, default=0.2)
+    parser.add_argument("--store-latency-ms", type=float, default=1.0)
+    parser.add_argument("--ai-latency-ms", type=float, default=200.0)
+    parser.add_argument("--ai-latency-sigma", type=float, default=0.3)
+    parser.add_argument("--ai-chunks", type=int, default=20)
+    parser.add_argument("--ai-chunk-interval-ms", type=float, default=5.0)
+    parser.add_argument("--ai-error-rate", type=float, default=0.0)
+    parser.add_argument("--ai-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--ai-concurrency", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="write the result as JSON to this path")
+    parser.add_argument("--compare", help="earlier JSON result to compare against")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,298 @@
+"""In-memory implementations of the repository protocols, for load tests.
+
+They follow the Postgres/Mongo repositories closely enough to drive the real
+service and routes: newest-first keyset listing, a unique code hash (a FAILED
+row can be taken over, like the ON CONFLICT upsert), and optional per-call
+latency to stand in for a network round trip.
+"""
+
+import asyncio
+import itertools
+from datetime import UTC, datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from uuid import UUID, uuid4
+
+from bson import ObjectId
+
+from app.models.mongo import SubmissionDocument
+from app.models.postgre import Language, Submission, SubmissionStatus
+from app.repositories.postgre.submissions import LISTING_COLUMNS
+
+_LISTING_KEYS = [column.key for column in LISTING_COLUMNS]
+
+
+class _Store:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    async def _round_trip(self) -> None:
+        self.calls += 1
+        await asyncio.sleep(self.latency)  # 0 still yields, like a real await would
+
+
+class MemoryPgRepo(_Store):
+    def __init__(self, latency: float = 0.0):
+        super().__init__(latency)
+        self._ids = itertools.count(1)
+        self._rows: List[Submission] = []  # id order, which is also created_at order
+        self._by_uuid: Dict[UUID, Submission] = {}
+        self._by_hash: Dict[str, Submission] = {}
+
+    @staticmethod
+    def _listing_row(sub: Submission) -> Dict[str, Any]:
+        return {key: getattr(sub, key) for key in _LISTING_KEYS}
+
+    def _page(
+        self,
+        *,
+        limit: int,
+        after: Optional[tuple[datetime, int]],
+        language: Optional[Language],
+        title_prefix: Optional[str],
+    ) -> List[Submission]:
+        page: List[Submission] = []
+        for sub in reversed(self._rows):
+            if after is not None and (sub.created_at, sub.id) >= after:
+                continue
+            if language is not None and sub.language != language:
+                continue
+            if title_prefix and not sub.title.startswith(title_prefix):
+                continue
+            page.append(sub)
+            if len(page) == limit:
+                break
+        return page
+
+    async def find_by_uuid(
+        self, uuid: UUID, *, with_payload: bool = False
+    ) -> Optional[Submission]:
+        await self._round_trip()
+        return self._by_uuid.get(uuid)
+
+    async def find_all(
+        self,
+        *,
+        limit: int = 50,
+        after: Optional[tuple[datetime, int]] = None,
+        language: Optional[Language] = None,
+        title_prefix: Optional[str] = None,
+    ) -> Sequence[Submission]:
+        await self._round_trip()
+        return self._page(
+            limit=limit, after=after, language=language, title_prefix=title_prefix
+        )
+
+    async def find_all_rows(
+        self,
+        *,
+        limit: int = 50,
+        after: Optional[tuple[datetime, int]] = None,
+        language: Optional[Language] = None,
+        title_prefix: Optional[str] = None,
+    ) -> Sequence[Any]:
+        await self._round_trip()
+        page = self._page(
+            limit=limit, after=after, language=language, title_prefix=title_prefix
+        )
+        return [self._listing_row(sub) for sub in page]
+
+    async def find_by_hash(self, code_hash: str) -> Optional[Submission]:
+        await self._round_trip()
+        return self._by_hash.get(code_hash)
+
+    async def find_by_hashes(self, hashes: Sequence[str]) -> Sequence[Submission]:
+        await self._round_trip()
+        found = [self._by_hash[h] for h in set(hashes) if h in self._by_hash]
+        return sorted(found, key=lambda sub: sub.id)
+
+    async def stream_rows(self, batch_size: int = 500) -> AsyncIterator[Sequence[Any]]:
+        for start in range(0, len(self._rows), batch_size):
+            await self._round_trip()
+            batch = self._rows[start : start + batch_size]
+            yield [self._listing_row(sub) for sub in batch]
+
+    async def stream_review_keys(
+        self, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Any]]:
+        rows = [sub for sub in self._rows if sub.status != SubmissionStatus.FAILED]
+        for start in range(0, len(rows), batch_size):
+            await self._round_trip()
+            yield [
+                {"hash": sub.hash, "language": sub.language, "mongo_id": sub.mongo_id}
+                for sub in rows[start : start + batch_size]
+            ]
+
+    def _upsert(self, values: Dict[str, Any]) -> Optional[Submission]:
+        existing = self._by_hash.get(values["hash"])
+        now = datetime.now(UTC)
+        if existing is not None:
+            if existing.status != SubmissionStatus.FAILED:
+                return None
+            for key, value in values.items():
+                setattr(existing, key, value)
+            existing.updated_at = now
+            return existing
+        sub = Submission(
+            id=next(self._ids),
+            uuid=uuid4(),
+            created_at=now,
+            updated_at=now,
+            **values,
+        )
+        self._rows.append(sub)
+        self._by_uuid[sub.uuid] = sub
+        self._by_hash[sub.hash] = sub
+        return sub
+
+    async def create(
+        self,
+        *,
+        title: str,
+        language: Language,
+        mongo_id: str,
+        code_hash: str,
+        short_feedback: str,
+        status: SubmissionStatus = SubmissionStatus.COMPLETED,
+        payload_snapshot: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Submission]:
+        await self._round_trip()
+        return self._upsert(
+            {
+                "title": title,
+                "language": language,
+                "mongo_id": mongo_id,
+                "hash": code_hash,
+                "short_feedback": short_feedback,
+                "status": status,
+                "payload_snapshot": payload_snapshot,
+            }
+        )
+
+    async def create_many(self, rows: Sequence[Dict[str, Any]]) -> Sequence[Submission]:
+        await self._round_trip()
+        created = [self._upsert(dict(row)) for row in rows]
+        return [sub for sub in created if sub is not None]
+
+    async def update_review(
+        self,
+        uuid: UUID,
+        *,
+        short_feedback: str,
+        status: SubmissionStatus,
+        payload_snapshot: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Submission]:
+        await self._round_trip()
+        sub = self._by_uuid.get(uuid)
+        if sub is None:
+            return None
+        sub.short_feedback = short_feedback
+        sub.status = status
+        sub.review_claimed_at = None
+        if payload_snapshot is not None:
+            sub.payload_snapshot = payload_snapshot
+        sub.updated_at = datetime.now(UTC)
+        return sub
+
+    async def claim_review(
+        self, uuid: UUID, *, stale_after: float
+    ) -> Optional[Submission]:
+        await self._round_trip()
+        sub = self._by_uuid.get(uuid)
+        if sub is None or sub.status != SubmissionStatus.PENDING:
+            return None
+        now = datetime.now(UTC)
+        claimed = sub.review_claimed_at
+        if claimed is not None and now - claimed < timedelta(seconds=stale_after):
+            return None
+        sub.review_claimed_at = now
+        return sub
+
+    async def release_review(self, uuid: UUID) -> None:
+        await self._round_trip()
+        sub = self._by_uuid.get(uuid)
+        if sub is not None and sub.status == SubmissionStatus.PENDING:
+            sub.review_claimed_at = None
+
+    async def delete(self, uuid: UUID) -> None:
+        await self._round_trip()
+        sub = self._by_uuid.pop(uuid, None)
+        if sub is not None:
+            self._rows.remove(sub)
+            self._by_hash.pop(sub.hash, None)
+
+    async def find_review_state(self, uuid: UUID) -> Optional[Any]:
+        await self._round_trip()
+        sub = self._by_uuid.get(uuid)
+        if sub is None:
+            return None
+        return {"status": sub.status, "mongo_id": sub.mongo_id}
+
+    async def find_uuids_by_status(self, status: SubmissionStatus) -> Sequence[UUID]:
+        await self._round_trip()
+        return [sub.uuid for sub in self._rows if sub.status == status]
+
+
+class MemoryMongoRepo(_Store):
+    def __init__(self, latency: float = 0.0):
+        super().__init__(latency)
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._reviews: Dict[str, str] = {}
+
+    def _document(self, mongo_id: str) -> Optional[SubmissionDocument]:
+        raw = self._docs.get(mongo_id)
+        return SubmissionDocument(_id=mongo_id, **raw) if raw is not None else None
+
+    async def find(self, mongo_id: str) -> Optional[SubmissionDocument]:
+        await self._round_trip()
+        return self._document(mongo_id)
+
+    async def find_many(self, mongo_ids: Sequence[str]) -> List[SubmissionDocument]:
+        await self._round_trip()
+        docs = (self._document(mongo_id) for mongo_id in set(mongo_ids))
+        return [doc for doc in docs if doc is not None]
+
+    async def find_all(self) -> List[SubmissionDocument]:
+        await self._round_trip()
+        docs = (self._document(mongo_id) for mongo_id in self._docs)
+        return [doc for doc in docs if doc is not None]
+
+    async def insert(
+        self,
+        user_input: dict[str, Any],
+        ai_text: str | None,
+        mongo_id: Optional[str] = None,
+    ) -> str:
+        await self._round_trip()
+        mongo_id = mongo_id or str(ObjectId())
+        self._docs[mongo_id] = {**user_input, "ai_response": ai_text}
+        return mongo_id
+
+    async def insert_many(
+        self, payloads: Sequence[tuple[dict[str, Any], str | None]]
+    ) -> List[str]:
+        await self._round_trip()
+        mongo_ids = []
+        for user_input, ai_text in payloads:
+            mongo_id = str(ObjectId())
+            self._docs[mongo_id] = {**user_input, "ai_response": ai_text}
+            mongo_ids.append(mongo_id)
+        return mongo_ids
+
+    async def delete_many(self, mongo_ids: Sequence[str]) -> None:
+        await self._round_trip()
+        for mongo_id in mongo_ids:
+            self._docs.pop(mongo_id, None)
+
+    async def update_ai_response(self, mongo_id: str, ai_text: str) -> None:
+        await self._round_trip()
+        if mongo_id in self._docs:
+            self._docs[mongo_id]["ai_response"] = ai_text
+
+    async def find_review(self, code_hash: str) -> Optional[str]:
+        await self._round_trip()
+        return self._reviews.get(code_hash)
+
+    async def save_review(self, code_hash: str, ai_text: str) -> None:
+        await self._round_trip()
+        self._reviews[code_hash] = ai_text
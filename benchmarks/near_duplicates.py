@@ -0,0 +1,99 @@
+"""Measure near-duplicate lookups against a large in-memory index.
+
+Fills a NearDuplicateIndex with random MinHash signatures (no tokenizing, so a
+million entries load in seconds), then times query_signature for misses and
+for perturbed copies of indexed entries. Signature computation is reported
+separately since it depends on snippet size, not on the index.
+
+    python -m benchmarks.near_duplicates --entries 1000000 --queries 2000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from array import array
+from typing import Dict, List
+
+from app.models.postgre import Language
+from app.services.near_duplicates import NUM_PERM, NearDuplicateIndex, signature
+
+SNIPPET = """
+def total_price(items, tax):
+    subtotal = 0
+    for item in items:
+        subtotal += item.price * item.quantity
+    return round(subtotal * (1 + tax), 2)
+"""
+
+
+def random_signature(rng: random.Random) -> array:
+    return array("I", (rng.getrandbits(32) for _ in range(NUM_PERM)))
+
+
+def perturbed(sig: array, rng: random.Random, changes: int) -> array:
+    copy = array("I", sig)
+    for position in rng.sample(range(NUM_PERM), changes):
+        copy[position] = rng.getrandbits(32)
+    return copy
+
+
+def percentiles(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    p50 = ordered[len(ordered) // 2] * 1e6
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6
+    return f"p50={p50:8.1f}us  p99={p99:8.1f}us"
+
+
+def main(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    index = NearDuplicateIndex(threshold=args.threshold)
+    languages = list(Language)
+
+    started = time.perf_counter()
+    stored = []
+    for i in range(args.entries):
+        sig = random_signature(rng)
+        language = languages[i % len(languages)]
+        index.insert(f"h{i}", language, sig)
+        if i % max(1, args.entries // args.queries) == 0:
+            stored.append((language, sig))
+    print(f"indexed {len(index)} entries in {time.perf_counter() - started:.1f}s")
+
+    timings: Dict[str, List[float]] = {"miss": [], "near": []}
+    hits = 0
+    for language, sig in stored[: args.queries]:
+        query = random_signature(rng)
+        t0 = time.perf_counter()
+        index.query_signature(language, query)
+        timings["miss"].append(time.perf_counter() - t0)
+
+        query = perturbed(sig, rng, args.changes)
+        t0 = time.perf_counter()
+        hits += index.query_signature(language, query) is not None
+        timings["near"].append(time.perf_counter() - t0)
+
+    for name, samples in timings.items():
+        print(f"query {name:<5} {percentiles(samples)}")
+    print(f"near copies found: {hits}/{len(timings['near'])}")
+
+    samples = []
+    for _ in range(args.queries):
+        t0 = time.perf_counter()
+        signature(SNIPPET, Language.PYTHON)
+        samples.append(time.perf_counter() - t0)
+    print(
+        f"signature   {percentiles(samples)}  (mean {statistics.mean(samples) * 1e6:.1f}us)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument(
+        "--changes", type=int, default=2, help="values altered per near copy"
+    )
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=1)
+    main(parser.parse_args())
@@ -0,0 +1,156 @@
+"""Measure /review stream chunking against a local fake OpenAI server.
+
+Starts an in-process server that speaks the streamed chat-completions
+protocol (one SSE event per token, with a small inter-token delay), points a
+real AsyncOpenAI client at it and compares AI.stream_feedback as-is with the
+same stream passed through coalesce_chunks: writes per review, time to first
+byte and total duration.
+
+    python -m benchmarks.review_stream --tokens 400 --token-delay-ms 2 --rounds 5
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import time
+from typing import AsyncIterator, Dict, List
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from openai import AsyncOpenAI
+
+from app.schemas.ai import ReviewPayload
+from app.schemas.submissions import CodePayload
+from app.models.postgre import Language
+from app.services.ai import AI
+from app.services.ai_providers import OpenAIProvider
+from app.services.streaming import coalesce_chunks
+
+
+def fake_openai_app(tokens: int, token_delay: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def completions() -> StreamingResponse:
+        async def events() -> AsyncIterator[bytes]:
+            base = {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": "gpt-4o-mini",
+            }
+            for i in range(tokens):
+                chunk = {
+                    **base,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "delta": {"content": f"tok{i} "},
+                            "finish_reason": None,
+                        }
+                    ],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n".encode()
+                await asyncio.sleep(token_delay)
+            usage = {
+                **base,
+                "choices": [],
+                "usage": {
+                    "prompt_tokens": 120,
+                    "completion_tokens": tokens,
+                    "total_tokens": 120 + tokens,
+                },
+            }
+            yield f"data: {json.dumps(usage)}\n\n".encode()
+            yield b"data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def measure(source: AsyncIterator[bytes]) -> Dict[str, float]:
+    started = time.perf_counter()
+    first = None
+    writes = 0
+    size = 0
+    async for chunk in source:
+        if first is None:
+            first = time.perf_counter() - started
+        writes += 1
+        size += len(chunk)
+    return {
+        "writes": writes,
+        "bytes": size,
+        "ttfb": first or 0.0,
+        "total": time.perf_counter() - started,
+    }
+
+
+def report(name: str, runs: List[Dict[str, float]]) -> None:
+    print(
+        f"{name:<10} writes={statistics.mean(r['writes'] for r in runs):7.1f}  "
+        f"avg_write={statistics.mean(r['bytes'] / r['writes'] for r in runs):7.1f}B  "
+        f"ttfb={statistics.mean(r['ttfb'] for r in runs) * 1000:7.2f}ms  "
+        f"total={statistics.mean(r['total'] for r in runs) * 1000:8.1f}ms"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            fake_openai_app(args.tokens, args.token_delay_ms / 1000),
+            host="127.0.0.1",
+            port=port,
+            log_level="warning",
+        )
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    client = AsyncOpenAI(api_key="sk-bench", base_url=f"http://127.0.0.1:{port}/v1")
+    ai = AI(OpenAIProvider(client))
+    payload = ReviewPayload(
+        language=Language.PYTHON,
+        payload=CodePayload(content="def handler(event):\n    return event['body']\n"),
+    )
+    try:
+        await measure(ai.stream_feedback(payload))  # warm up the connection pool
+        raw = [await measure(ai.stream_feedback(payload)) for _ in range(args.rounds)]
+        coalesced = [
+            await measure(
+                coalesce_chunks(
+                    ai.stream_feedback(payload),
+                    max_bytes=args.flush_bytes,
+                    max_delay=args.flush_ms / 1000,
+                )
+            )
+            for _ in range(args.rounds)
+        ]
+        report("raw", raw)
+        report("coalesced", coalesced)
+    finally:
+        await client.close()
+        server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=400)
+    parser.add_argument("--token-delay-ms", type=float, default=2.0)
+    parser.add_argument("--flush-bytes", type=int, default=512)
+    parser.add_argument("--flush-ms", type=float, default=40.0)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
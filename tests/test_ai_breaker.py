@@ -0,0 +1,158 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from openai import APIConnectionError, RateLimitError
+
+import app.services.ai as ai_module
+from app.models.postgre import Language
+from app.schemas.ai import ReviewPayload
+from app.schemas.submissions import CodePayload
+from app.services.ai_providers import OpenAIProvider
+from app.services.ai import AI, AICircuitOpenError, CircuitBreaker
+
+
+def connection_error() -> APIConnectionError:
+    return APIConnectionError(request=httpx.Request("POST", "https://test"))
+
+
+def make_breaker(clock, **kwargs) -> CircuitBreaker:
+    options = dict(
+        window=10,
+        min_calls=4,
+        error_rate=0.5,
+        slow_seconds=5.0,
+        slow_rate=0.8,
+        open_seconds=30.0,
+        clock=clock,
+    )
+    options.update(kwargs)
+    return CircuitBreaker(**options)
+
+
+async def fail() -> str:
+    raise connection_error()
+
+
+async def succeed() -> str:
+    return "ok"
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_on_error_rate_and_fails_fast(clock):
+    breaker = make_breaker(clock)
+    await breaker.guard(succeed)()
+    await breaker.guard(succeed)()
+    for _ in range(2):
+        with pytest.raises(APIConnectionError):
+            await breaker.guard(fail)()
+
+    provider = AsyncMock(return_value="ok")
+    with pytest.raises(AICircuitOpenError) as excinfo:
+        await breaker.guard(provider)()
+
+    provider.assert_not_awaited()
+    assert excinfo.value.retry_after == pytest.approx(30.0)
+    assert breaker.stats()["state"] == "open"
+    assert breaker.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_half_open_admits_one_probe_and_closes_on_success(clock):
+    breaker = make_breaker(clock, min_calls=1)
+    with pytest.raises(APIConnectionError):
+        await breaker.guard(fail)()
+    clock.now = 31.0
+
+    release = asyncio.Event()
+
+    async def slow_success() -> str:
+        await release.wait()
+        return "ok"
+
+    probe = asyncio.create_task(breaker.guard(slow_success)())
+    await asyncio.sleep(0)
+    with pytest.raises(AICircuitOpenError):
+        await breaker.guard(succeed)()
+    release.set()
+
+    assert await probe == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_reopens_the_circuit(clock):
+    breaker = make_breaker(clock, min_calls=1)
+    with pytest.raises(APIConnectionError):
+        await breaker.guard(fail)()
+    clock.now = 31.0
+
+    with pytest.raises(APIConnectionError):
+        await breaker.guard(fail)()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened == 2
+
+
+def test_slow_calls_open_the_circuit(clock):
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        breaker.record(False, 6.0)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+@pytest.mark.asyncio
+async def test_rate_limits_do_not_count_as_failures(clock):
+    breaker = make_breaker(clock, min_calls=1)
+    response = httpx.Response(429, request=httpx.Request("POST", "https://test"))
+
+    async def limited() -> str:
+        raise RateLimitError("rate limited", response=response, body=None)
+
+    with pytest.raises(RateLimitError):
+        await breaker.guard(limited)()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()["calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_loser_cancelled(monkeypatch):
+    monkeypatch.setattr(ai_module, "OPENAI_HEDGE_MIN_DELAY", 0.01)
+    breaker = CircuitBreaker(window=10, min_calls=4)
+    for _ in range(4):
+        breaker.record(False, 0.01)
+
+    cancelled = asyncio.Event()
+    calls = 0
+
+    async def create(**kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return AsyncMock(
+            usage=None, choices=[AsyncMock(message=AsyncMock(content="fast"))]
+        )
+
+    client = AsyncMock()
+    client.chat.completions.create.side_effect = create
+    ai = AI(OpenAIProvider(client), breaker=breaker, hedge=True)
+    payload = ReviewPayload(
+        language=Language.PYTHON,
+        payload=CodePayload(
+            content="print('hedged review request for the breaker test')"
+        ),
+    )
+
+    result = await asyncio.wait_for(ai.get_feedback(payload), timeout=1)
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    assert result == "fast"
+    assert calls == 2
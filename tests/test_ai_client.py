@@ -0,0 +1,35 @@
+import pytest
+
+from app.core import ai_client
+
+
+@pytest.fixture(autouse=True)
+def reset_client():
+    yield
+    ai_client.ai_client = None
+    ai_client.http_client = None
+
+
+@pytest.mark.asyncio
+async def test_ai_client_is_reused_and_closed(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+
+    first = ai_client.get_ai_client()
+    assert ai_client.get_ai_client() is first
+    assert ai_client.ai_pool_stats()["connections"] == 0
+
+    await ai_client.close_ai_client()
+    assert ai_client.ai_client is None
+    assert ai_client.ai_pool_stats() == {
+        "initialized": False,
+        "http2": ai_client.OPENAI_HTTP2,
+        "max_connections": ai_client.OPENAI_MAX_CONNECTIONS,
+        "max_keepalive_connections": ai_client.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    }
+
+
+def test_ai_client_requires_api_key(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    with pytest.raises(ai_client.AIConfigurationError):
+        ai_client.get_ai_client()
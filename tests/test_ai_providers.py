@@ -0,0 +1,112 @@
+import pytest
+from openai import InternalServerError, RateLimitError
+
+from app.core import ai_client
+from app.models.postgre import Language
+from app.schemas.ai import ReviewPayload
+from app.schemas.submissions import CodePayload
+from app.services.ai import (
+    AI,
+    AICircuitOpenError,
+    AIScheduler,
+    AIUnavailableError,
+    CircuitBreaker,
+)
+from app.services.ai_providers import (
+    FakeAIProvider,
+    FakeAISettings,
+    create_ai_provider,
+)
+
+
+def payload(content: str) -> ReviewPayload:
+    return ReviewPayload(language=Language.PYTHON, payload=CodePayload(content=content))
+
+
+def fake(**kwargs) -> FakeAIProvider:
+    options = dict(latency_ms=0, latency_sigma=0, chunk_interval_ms=0, seed=1)
+    options.update(kwargs)
+    return FakeAIProvider(FakeAISettings(**options))
+
+
+@pytest.mark.asyncio
+async def test_fake_review_depends_only_on_the_prompt():
+    ai = AI(fake())
+    first = await ai.get_feedback(payload("print('fake provider prompt number one')"))
+    again = await ai.get_feedback(payload("print('fake provider prompt number one')"))
+    other = await ai.get_feedback(payload("print('fake provider prompt number two')"))
+
+    assert first == again
+    assert first != other
+
+
+@pytest.mark.asyncio
+async def test_fake_stream_matches_completion_in_configured_chunks():
+    provider = fake(chunks=5)
+    ai = AI(provider)
+    data = payload("print('streamed through the fake provider')")
+
+    chunks = [chunk async for chunk in ai.stream_feedback(data)]
+
+    assert len(chunks) == 5
+    assert b"".join(chunks).decode() == await ai.get_feedback(data)
+    assert provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_fake_injects_server_errors_that_trip_the_breaker():
+    breaker = CircuitBreaker(min_calls=2, error_rate=0.5)
+    provider = fake(error_rate=1.0)
+    ai = AI(provider, breaker=breaker)
+    data = payload("print('every call to this fake provider fails')")
+
+    for _ in range(2):
+        with pytest.raises(AIUnavailableError):
+            await ai.get_feedback(data)
+    with pytest.raises(AICircuitOpenError):
+        await ai.get_feedback(data)
+
+    assert provider.calls == 2
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+@pytest.mark.asyncio
+async def test_fake_rate_limits_go_through_the_scheduler():
+    scheduler = AIScheduler(max_retries=1, base_backoff=0.001, queue_timeout=0.5)
+    provider = fake(rate_limit_rate=1.0)
+    ai = AI(provider, scheduler=scheduler)
+
+    with pytest.raises(AIUnavailableError):
+        await ai.get_feedback(payload("print('the fake provider is always busy')"))
+
+    assert scheduler.rate_limited == 1
+    assert provider.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_fake_errors_are_openai_types():
+    provider = fake(error_rate=1.0)
+    with pytest.raises(InternalServerError):
+        await provider.complete([{"role": "user", "content": "x"}])
+    provider = fake(rate_limit_rate=1.0)
+    with pytest.raises(RateLimitError):
+        await provider.open_stream([{"role": "user", "content": "x"}])
+
+
+def test_unknown_provider_is_rejected():
+    with pytest.raises(ValueError):
+        create_ai_provider("nope")
+
+
+@pytest.mark.asyncio
+async def test_openai_provider_follows_the_shared_client(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    provider = create_ai_provider("openai")
+    first = provider.client
+
+    # a second app lifespan after shutdown closed the first client
+    await ai_client.close_ai_client()
+    assert provider.client is not first
+    assert not provider.client.is_closed()
+
+    await ai_client.close_ai_client()
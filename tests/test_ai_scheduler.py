@@ -0,0 +1,141 @@
+import asyncio
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from app.services.ai import AIScheduler, AIUnavailableError, TokenBucket
+
+
+def rate_limit_error(retry_after: str | None = None) -> RateLimitError:
+    headers = {"retry-after": retry_after} if retry_after else {}
+    response = httpx.Response(
+        status_code=429, headers=headers, request=httpx.Request("POST", "https://test")
+    )
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+def make_scheduler(**kwargs) -> AIScheduler:
+    options = dict(
+        rpm=6000,
+        tpm=1_000_000,
+        max_concurrency=4,
+        queue_timeout=1.0,
+        max_retries=2,
+        base_backoff=0.001,
+    )
+    options.update(kwargs)
+    return AIScheduler(**options)
+
+
+def test_token_bucket_reports_wait_until_budget_refills(clock):
+    bucket = TokenBucket(per_minute=60, clock=clock)
+    bucket.consume(60)
+
+    assert bucket.delay_for(1) == pytest.approx(1.0)
+    clock.now = 1.0
+    assert bucket.delay_for(1) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_run_retries_rate_limited_calls_and_shrinks_concurrency():
+    scheduler = make_scheduler()
+    attempts = 0
+
+    async def call() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise rate_limit_error()
+        return "ok"
+
+    assert await scheduler.run(call, cost=10) == "ok"
+    assert attempts == 2
+    assert scheduler.rate_limited == 1
+    assert scheduler.limit < scheduler.max_concurrency
+    assert scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_run_gives_up_after_max_retries():
+    scheduler = make_scheduler(max_retries=1)
+
+    async def call() -> str:
+        raise rate_limit_error()
+
+    with pytest.raises(AIUnavailableError):
+        await scheduler.run(call, cost=10)
+    assert scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_after_beyond_queue_timeout_fails_fast():
+    scheduler = make_scheduler(queue_timeout=0.5)
+
+    async def call() -> str:
+        raise rate_limit_error(retry_after="5")
+
+    with pytest.raises(AIUnavailableError) as excinfo:
+        await scheduler.run(call, cost=10)
+    assert excinfo.value.retry_after >= 5
+
+
+@pytest.mark.asyncio
+async def test_excess_calls_queue_until_a_slot_frees():
+    scheduler = make_scheduler(max_concurrency=1)
+    release = asyncio.Event()
+
+    async def slow() -> str:
+        await release.wait()
+        return "first"
+
+    async def fast() -> str:
+        return "second"
+
+    first = asyncio.create_task(scheduler.run(slow, cost=1))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(scheduler.run(fast, cost=1))
+    await asyncio.sleep(0.01)
+    assert not second.done()
+    assert scheduler.stats()["queued"] == 1
+
+    release.set()
+    assert await asyncio.gather(first, second) == ["first", "second"]
+
+
+@pytest.mark.asyncio
+async def test_queued_calls_regain_concurrency_as_the_limit_grows():
+    scheduler = make_scheduler(max_concurrency=8, queue_timeout=5.0)
+    scheduler.limit = 1.0  # as left behind by a burst of 429s
+    peak = 0
+
+    async def call() -> None:
+        nonlocal peak
+        peak = max(peak, scheduler.in_flight)
+        await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(scheduler.run(call, cost=1) for _ in range(20)))
+
+    assert scheduler.limit > 4
+    assert peak >= 4
+    assert scheduler.stats()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_is_bounded():
+    scheduler = make_scheduler(max_concurrency=1, queue_timeout=0.05)
+    release = asyncio.Event()
+
+    async def slow() -> str:
+        await release.wait()
+        return "first"
+
+    first = asyncio.create_task(scheduler.run(slow, cost=1))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AIUnavailableError):
+        await scheduler.run(slow, cost=1)
+    assert scheduler.rejected == 1
+
+    release.set()
+    await first
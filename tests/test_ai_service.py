@@ -3,11 +3,15 @@ from unittest.mock import AsyncMock
 from typing import AsyncGenerator
 import httpx
 
-from app.services.ai import AI
+from app.core import ai_client
+from app.services.ai_providers import OpenAIProvider
+from app.services.ai import AI, AIScheduler, AIUnavailableError
 from app.schemas.ai import ReviewPayload
 from app.schemas.submissions import CodePayload
 from app.models.postgre import Language
-from openai import RateLimitError, APIError
+from openai import RateLimitError, APIConnectionError, APIError
+from openai.types import CompletionUsage
+from prometheus_client import REGISTRY
 
 
 @pytest.fixture
@@ -20,6 +24,10 @@ def sample_payload():
     )
 
 
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
 def make_fake_response(status_code: int = 429) -> httpx.Response:
     return httpx.Response(
         status_code=status_code, request=httpx.Request("GET", "https://test")
@@ -33,7 +41,7 @@ async def test_get_feedback_success(sample_payload):
         choices=[AsyncMock(message=AsyncMock(content="All good"))]
     )
 
-    ai = AI(ai_client=mock_client)
+    ai = AI(OpenAIProvider(mock_client))
 
     result = await ai.get_feedback(sample_payload)
     assert result == "All good"
@@ -46,10 +54,50 @@ async def test_get_feedback_rate_limit_error(sample_payload):
         "rate limited", response=make_fake_response(429), body=None
     )
 
-    ai = AI(ai_client=mock_client)
+    ai = AI(OpenAIProvider(mock_client))
 
-    result = await ai.get_feedback(sample_payload)
-    assert "Too many requests" in result
+    with pytest.raises(AIUnavailableError):
+        await ai.get_feedback(sample_payload)
+
+
+@pytest.mark.asyncio
+async def test_get_feedback_raises_on_connection_error(sample_payload):
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create.side_effect = APIConnectionError(
+        request=httpx.Request("POST", "https://test")
+    )
+    errors = sample("ai_errors_total", type="connection")
+
+    ai = AI(OpenAIProvider(mock_client))
+
+    # raised rather than returned, so the text is never stored as a review
+    with pytest.raises(AIUnavailableError):
+        await ai.get_feedback(sample_payload)
+    assert sample("ai_errors_total", type="connection") == errors + 1
+
+
+@pytest.mark.asyncio
+async def test_get_feedback_without_api_key_is_unavailable(sample_payload, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr(ai_client, "ai_client", None)
+    errors = sample("ai_errors_total", type="configuration")
+
+    ai = AI(OpenAIProvider())
+
+    with pytest.raises(AIUnavailableError):
+        await ai.get_feedback(sample_payload)
+    assert sample("ai_errors_total", type="configuration") == errors + 1
+
+
+@pytest.mark.asyncio
+async def test_get_feedback_raises_on_unexpected_error(sample_payload):
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create.side_effect = RuntimeError("boom")
+
+    ai = AI(OpenAIProvider(mock_client))
+
+    with pytest.raises(AIUnavailableError):
+        await ai.get_feedback(sample_payload)
 
 
 @pytest.mark.asyncio
@@ -61,7 +109,7 @@ async def test_stream_feedback_api_error(sample_payload):
         body={"error": {"message": "Server error"}},
     )
 
-    ai = AI(ai_client=mock_client)
+    ai = AI(OpenAIProvider(mock_client))
 
     chunks = []
     async for chunk in ai.stream_feedback(sample_payload):
@@ -79,7 +127,7 @@ async def test_stream_feedback_success(sample_payload):
     mock_client = AsyncMock()
     mock_client.chat.completions.create.return_value = mock_stream()
 
-    ai = AI(ai_client=mock_client)
+    ai = AI(OpenAIProvider(mock_client))
 
     chunks = []
     async for chunk in ai.stream_feedback(sample_payload):
@@ -91,7 +139,7 @@ async def test_stream_feedback_success(sample_payload):
 def test_build_messages_success(sample_payload):
     mock_client = AsyncMock()
     mock_client.chat.completions.create.return_value = AsyncMock()
-    ai = AI(ai_client=mock_client)
+    ai = AI(OpenAIProvider(mock_client))
     messages = ai.build_messages(sample_payload)
 
     assert len(messages) == 2
@@ -104,3 +152,100 @@ def test_build_messages_success(sample_payload):
         "print('this is a test for my AI service implementation')"
         in messages[1]["content"]
     )
+
+
+@pytest.mark.asyncio
+async def test_stream_feedback_calls_on_complete_with_full_text(sample_payload):
+    async def mock_stream() -> AsyncGenerator:
+        yield AsyncMock(choices=[AsyncMock(delta=AsyncMock(content="Hello "))])
+        yield AsyncMock(choices=[AsyncMock(delta=AsyncMock(content="World"))])
+
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create.return_value = mock_stream()
+    on_complete = AsyncMock()
+
+    ai = AI(OpenAIProvider(mock_client))
+    async for _ in ai.stream_feedback(sample_payload, on_complete=on_complete):
+        pass
+
+    on_complete.assert_awaited_once_with("Hello World")
+
+
+@pytest.mark.asyncio
+async def test_stream_feedback_skips_on_complete_after_error(sample_payload):
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create.side_effect = RateLimitError(
+        "rate limited", response=make_fake_response(429), body=None
+    )
+    on_complete = AsyncMock()
+
+    ai = AI(OpenAIProvider(mock_client))
+    async for _ in ai.stream_feedback(sample_payload, on_complete=on_complete):
+        pass
+
+    on_complete.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_feedback_raises_when_scheduler_gives_up(sample_payload):
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create.side_effect = RateLimitError(
+        "rate limited", response=make_fake_response(429), body=None
+    )
+    scheduler = AIScheduler(max_retries=0, queue_timeout=1.0)
+
+    ai = AI(OpenAIProvider(mock_client), scheduler=scheduler)
+
+    with pytest.raises(AIUnavailableError):
+        await ai.get_feedback(sample_payload)
+
+
+@pytest.mark.asyncio
+async def test_stream_records_first_token_and_tokens(sample_payload):
+    async def mock_stream() -> AsyncGenerator:
+        yield AsyncMock(
+            choices=[AsyncMock(delta=AsyncMock(content="Hello"))], usage=None
+        )
+        yield AsyncMock(
+            choices=[],
+            usage=CompletionUsage(
+                prompt_tokens=12, completion_tokens=3, total_tokens=15
+            ),
+        )
+
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create.return_value = mock_stream()
+    first_tokens = sample("ai_stream_first_token_seconds_count")
+    completion_tokens = sample("ai_tokens_total", kind="completion")
+
+    ai = AI(OpenAIProvider(mock_client))
+    assert [delta async for delta in ai.stream_deltas(sample_payload)] == ["Hello"]
+
+    assert sample("ai_stream_first_token_seconds_count") == first_tokens + 1
+    assert sample("ai_tokens_total", kind="completion") == completion_tokens + 3
+    kwargs = mock_client.chat.completions.create.await_args.kwargs
+    assert kwargs["stream_options"] == {"include_usage": True}
+
+
+@pytest.mark.asyncio
+async def test_stream_holds_scheduler_slot_until_consumed(sample_payload):
+    async def mock_stream() -> AsyncGenerator:
+        for text in ("Hel", "lo"):
+            yield AsyncMock(choices=[AsyncMock(delta=AsyncMock(content=text))])
+
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create.side_effect = lambda **_: mock_stream()
+    scheduler = AIScheduler(rpm=6000, tpm=1_000_000, max_concurrency=4)
+    ai = AI(OpenAIProvider(mock_client), scheduler=scheduler)
+
+    deltas = ai.stream_deltas(sample_payload)
+    assert await deltas.__anext__() == "Hel"
+    assert scheduler.in_flight == 1
+    assert [delta async for delta in deltas] == ["lo"]
+    assert scheduler.in_flight == 0
+
+    # a client that disconnects mid-stream gives the slot back too
+    deltas = ai.stream_deltas(sample_payload)
+    await deltas.__anext__()
+    await deltas.aclose()
+    assert scheduler.in_flight == 0
@@ -0,0 +1,65 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from app.services.broadcast import ReviewBroadcaster, format_sse
+
+
+async def collect(events):
+    return [event async for event in events]
+
+
+@pytest.mark.asyncio
+async def test_subscribers_share_one_stream_and_late_ones_get_the_prefix():
+    broadcaster = ReviewBroadcaster(linger=60)
+    key = uuid4()
+    early = asyncio.create_task(collect(broadcaster.subscribe(key)))
+    await asyncio.sleep(0)
+
+    channel = broadcaster.open(key)
+    channel.publish("Hello ")
+    late = asyncio.create_task(collect(broadcaster.subscribe(key)))
+    await asyncio.sleep(0)
+    channel.publish("World")
+    broadcaster.finish(key, "completed")
+
+    expected = [
+        ("delta", {"text": "Hello "}),
+        ("delta", {"text": "World"}),
+        ("done", {"status": "completed"}),
+    ]
+    assert await early == expected
+    assert await late == expected
+
+
+@pytest.mark.asyncio
+async def test_finished_channel_replays_for_lingering_subscribers():
+    broadcaster = ReviewBroadcaster(linger=60)
+    key = uuid4()
+    channel = broadcaster.open(key)
+    channel.publish("All good")
+    broadcaster.finish(key, "completed")
+
+    assert await collect(broadcaster.subscribe(key)) == [
+        ("delta", {"text": "All good"}),
+        ("done", {"status": "completed"}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_idle_subscriber_receives_pings_and_cleans_up():
+    broadcaster = ReviewBroadcaster()
+    key = uuid4()
+    events = broadcaster.subscribe(key, idle_timeout=0.01)
+
+    assert await events.__anext__() == ("ping", {})
+    await events.aclose()
+
+    assert len(broadcaster) == 0
+
+
+def test_format_sse():
+    assert (
+        format_sse("delta", {"text": "hi"}) == b'event: delta\ndata: {"text": "hi"}\n\n'
+    )
@@ -0,0 +1,89 @@
+from app.models.postgre import Language
+from app.services.canonical import (
+    canonical_hash,
+    code_tokens,
+    register_tokenizer,
+    TOKENIZERS,
+)
+
+
+def test_reformatted_and_recommented_python_keeps_its_hash():
+    original = "def add(a, b):\n    return a + b\n"
+    reformatted = "# adds two numbers\ndef add( a,b ):\n\n    return a+b   # sum\n"
+
+    assert canonical_hash(original, Language.PYTHON) == canonical_hash(
+        reformatted, Language.PYTHON
+    )
+
+
+def test_python_indentation_still_counts():
+    nested = "for x in xs:\n    if x:\n        f(x)\n    g(x)\n"
+    flat = "for x in xs:\n    if x:\n        f(x)\n        g(x)\n"
+
+    assert canonical_hash(nested, Language.PYTHON) != canonical_hash(
+        flat, Language.PYTHON
+    )
+
+
+def test_javascript_and_java_ignore_whitespace_and_comments():
+    js = "function f(a) { return a * 2; }"
+    js_variant = "// doubles\nfunction f(a){\n  return a*2; /* done */\n}"
+    java = "int f(int a) { return a * 2; }"
+    java_variant = "int f(int a)\n{\n    // doubles\n    return a*2;\n}"
+
+    assert canonical_hash(js, Language.JAVASCRIPT) == canonical_hash(
+        js_variant, Language.JAVASCRIPT
+    )
+    assert canonical_hash(java, Language.JAVA) == canonical_hash(
+        java_variant, Language.JAVA
+    )
+
+
+def test_renames_literals_and_language_change_the_hash():
+    base = canonical_hash("x = 1\n", Language.PYTHON)
+
+    assert canonical_hash("y = 1\n", Language.PYTHON) != base
+    assert canonical_hash("x = '1'\n", Language.PYTHON) != base
+    assert canonical_hash("x = 1\n", Language.JAVASCRIPT) != base
+
+
+def test_registered_tokenizer_is_used():
+    previous = TOKENIZERS[Language.JAVA]
+    try:
+
+        @register_tokenizer(Language.JAVA)
+        def lowercase(content):
+            return [("name", word) for word in content.lower().split()]
+
+        assert canonical_hash("A b", Language.JAVA) == canonical_hash(
+            "a B", Language.JAVA
+        )
+    finally:
+        TOKENIZERS[Language.JAVA] = previous
+
+
+def test_java_text_blocks_are_not_read_as_comments():
+    # "//" inside the text block must not drop the rest of its line
+    first = 'String u = """\n    http://example.com/a\n    """;'
+    second = 'String u = """\n    http://other.org/zzz\n    """;'
+
+    assert canonical_hash(first, Language.JAVA) != canonical_hash(second, Language.JAVA)
+    # quotes and escaped delimiters stay inside the block
+    block = '"""\n  say "hi" \\""" ok\n  """'
+    tokens = code_tokens(f"s = {block}; run();", Language.JAVA)
+    assert ("string", block) in tokens
+    assert tokens[-4:] == [("name", "run"), ("op", "("), ("op", ")"), ("op", ";")]
+
+
+def test_javascript_regex_literals_are_not_read_as_comments():
+    # "/*" inside the regex must not open a comment that hides the call below
+    first = 'p = p.replace(/\\/*/g, "");\nrun(a);\n/* note */\nstop();'
+    second = 'p = p.replace(/\\/*/g, "");\nrun(b);\n/* note */\nstop();'
+
+    assert canonical_hash(first, Language.JAVASCRIPT) != canonical_hash(
+        second, Language.JAVASCRIPT
+    )
+    # after a value, "/" is still division and comments are still dropped
+    assert canonical_hash("x = (a) / b /* half */ / 2;", Language.JAVASCRIPT) == (
+        canonical_hash("x = (a)/b/2;", Language.JAVASCRIPT)
+    )
@@ -0,0 +1,82 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import ops
+from app.core import db
+from app.main import app
+
+
+def test_database_settings_from_env(monkeypatch):
+    monkeypatch.setenv("DATABASE_POOL_SIZE", "25")
+    monkeypatch.setenv("DATABASE_MAX_OVERFLOW", "5")
+    monkeypatch.setenv("DATABASE_PREPARED_STATEMENT_CACHE_SIZE", "0")
+    monkeypatch.delenv("DATABASE_ECHO", raising=False)
+
+    settings = db.DatabaseSettings.from_env()
+
+    assert settings.pool_size == 25
+    assert settings.max_overflow == 5
+    assert settings.prepared_statement_cache_size == 0
+    assert settings.echo is False
+
+
+def test_engine_uses_settings():
+    engine = db.create_engine(
+        db.DatabaseSettings(url=db.DATABASE_URL, pool_size=3, max_overflow=1)
+    )
+
+    assert engine.echo is False
+    assert engine.pool.size() == 3
+
+
+def test_db_pool_stats_endpoint():
+    response = TestClient(app).get("/ops/db-pool")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["pool_size"] == db.database_settings.pool_size
+    assert body["checked_out"] == 0
+
+
+def test_mongo_client_uses_settings():
+    client = db.create_mongo_client(
+        db.MongoSettings(
+            url="mongodb://localhost:27017",
+            max_pool_size=7,
+            compressors="zlib",
+            read_preference="secondaryPreferred",
+        )
+    )
+
+    assert client.options.pool_options.max_pool_size == 7
+    assert client.read_preference.mongos_mode == "secondaryPreferred"
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_check_stores_reports_unreachable_store(monkeypatch):
+    async def ok():
+        return None
+
+    async def down():
+        raise ConnectionError("refused")
+
+    monkeypatch.setattr(db, "check_postgres", ok)
+    monkeypatch.setattr(db, "check_mongo", down)
+
+    assert await db.check_stores() == {
+        "postgres": "ok",
+        "mongo": "ConnectionError: refused",
+    }
+
+
+def test_ready_endpoint_returns_503_until_stores_answer(monkeypatch):
+    async def stores(timeout):
+        return {"postgres": "ok", "mongo": "ServerSelectionTimeoutError"}
+
+    monkeypatch.setattr(ops, "check_stores", stores)
+
+    response = TestClient(app).get("/ops/ready")
+
+    assert response.status_code == 503
+    assert response.json()["mongo"] == "ServerSelectionTimeoutError"
@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.metrics import instrumented
+from app.main import app
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint_reports_route_latency():
+    client = TestClient(app)
+    before = sample(
+        "http_request_duration_seconds_count",
+        method="GET",
+        route="/submissions/{uuid}",
+        status="422",
+    )
+
+    client.get("/submissions/not-a-uuid")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_request_duration_seconds_bucket" in response.text
+    assert (
+        sample(
+            "http_request_duration_seconds_count",
+            method="GET",
+            route="/submissions/{uuid}",
+            status="422",
+        )
+        == before + 1
+    )
+
+
+@pytest.mark.asyncio
+async def test_instrumented_repo_times_calls_and_streams():
+    @instrumented("test")
+    class Repo:
+        async def find(self, key):
+            return key
+
+        async def rows(self):
+            yield 1
+            yield 2
+
+        async def _private(self):
+            return None
+
+    repo = Repo()
+    assert await repo.find("a") == "a"
+    assert [row async for row in repo.rows()] == [1, 2]
+
+    assert (
+        sample("repository_call_duration_seconds_count", store="test", method="find")
+        == 1
+    )
+    assert (
+        sample("repository_call_duration_seconds_count", store="test", method="rows")
+        == 1
+    )
+    assert (
+        sample(
+            "repository_call_duration_seconds_count", store="test", method="_private"
+        )
+        == 0
+    )
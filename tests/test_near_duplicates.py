@@ -0,0 +1,86 @@
+from app.models.postgre import Language
+from app.services.canonical import code_tokens
+from app.services.near_duplicates import NearDuplicateIndex
+
+ORIGINAL = """
+def total_price(items, tax):
+    subtotal = 0
+    for item in items:
+        subtotal += item.price * item.quantity
+    return round(subtotal * (1 + tax), 2)
+"""
+
+RENAMED = """
+# compute the basket total
+def total_price(products, vat):
+    acc = 0
+    for p in products:  # every line
+        acc += p.price * p.quantity
+    return round(acc * (1 + vat), 2)
+"""
+
+CHANGED = """
+def total_price(items, tax):
+    subtotal = 0
+    for item in items:
+        subtotal -= item.price / item.quantity
+    return max(subtotal * (1 - tax), 0)
+"""
+
+
+def test_code_tokens_drop_comments_and_layout():
+    assert code_tokens("x = 1  # note\n", Language.PYTHON) == code_tokens(
+        "x=1\n", Language.PYTHON
+    )
+    assert code_tokens("let a = 1; // note", Language.JAVASCRIPT) == code_tokens(
+        "let a=1;/* other */", Language.JAVASCRIPT
+    )
+
+
+def test_code_tokens_tolerate_truncated_python():
+    tokens = code_tokens("def broken(:\n    return [1, 2", Language.PYTHON)
+    assert ("keyword", "def") in tokens
+
+
+def test_renamed_and_commented_copy_is_a_near_duplicate():
+    index = NearDuplicateIndex(threshold=0.9)
+    index.add("original", ORIGINAL, Language.PYTHON)
+
+    match = index.query(RENAMED, Language.PYTHON)
+
+    assert match is not None
+    assert match.code_hash == "original"
+    assert match.similarity >= 0.9
+
+
+def test_changed_logic_is_not_a_near_duplicate():
+    index = NearDuplicateIndex(threshold=0.9)
+    index.add("original", ORIGINAL, Language.PYTHON)
+
+    assert index.query(CHANGED, Language.PYTHON) is None
+
+
+def test_language_is_part_of_the_match():
+    index = NearDuplicateIndex(threshold=0.9)
+    index.add("original", ORIGINAL, Language.PYTHON)
+
+    assert index.query(ORIGINAL, Language.JAVASCRIPT) is None
+
+
+def test_extend_skips_known_hashes_and_reports_stats():
+    index = NearDuplicateIndex()
+    added = index.extend(
+        [
+            ("a", ORIGINAL, Language.PYTHON),
+            ("a", ORIGINAL, Language.PYTHON),
+            ("b", CHANGED, Language.PYTHON),
+        ]
+    )
+    index.query(RENAMED, Language.PYTHON)
+
+    assert added == 2
+    assert len(index) == 2
+    stats = index.stats()
+    assert stats["entries"] == 2
+    assert stats["queries"] == 1
+    assert stats["hits"] == 1
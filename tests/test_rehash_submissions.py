@@ -0,0 +1,55 @@
+from typing import cast
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.jobs.rehash_submissions import rehash_submissions
+from app.models.mongo import SubmissionDocument
+from app.models.postgre import Language
+from app.repositories.mongo.submissions import SubmissionsMongoRepo
+from app.repositories.postgre.submissions import SubmissionsPgRepo
+from app.services.submissions import compute_code_hash
+
+SPACED = "def add(a, b):\n    return a + b\n"
+TIGHT = "def add(a,b):\n    return a+b\n"
+
+
+def row(id, hash, mongo_id):
+    return {"id": id, "hash": hash, "language": Language.PYTHON, "mongo_id": mongo_id}
+
+
+@pytest.mark.asyncio
+async def test_rehash_updates_changed_rows_in_batches():
+    canonical = compute_code_hash(SPACED, Language.PYTHON)
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_pg.find_hash_batch.side_effect = [
+        [row(1, "legacy-1", "m1"), row(2, "legacy-2", "m2")],
+        [row(3, canonical, "m3"), row(4, "legacy-4", "gone")],
+        [],
+    ]
+    fake_mg.find_many.side_effect = [
+        [
+            SubmissionDocument(_id="m1", content=SPACED),
+            SubmissionDocument(_id="m2", content=TIGHT),
+        ],
+        [SubmissionDocument(_id="m3", content=SPACED)],
+    ]
+    fake_pg.update_hashes.side_effect = [1, 0]
+
+    stats = await rehash_submissions(fake_pg, fake_mg, batch_size=2)
+
+    # both legacy rows canonicalise to the same hash; only the older one claims it
+    assert fake_pg.update_hashes.await_args_list[0].args == ({1: canonical},)
+    assert fake_pg.update_hashes.await_args_list[1].args == ({},)
+    assert fake_pg.find_hash_batch.await_args_list[1].kwargs == {
+        "after_id": 2,
+        "limit": 2,
+    }
+    assert stats == {
+        "scanned": 4,
+        "updated": 1,
+        "unchanged": 1,
+        "missing": 1,
+        "kept": 1,
+    }
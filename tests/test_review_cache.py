@@ -0,0 +1,45 @@
+from app.core.cache import TTLCache
+
+
+def test_cache_hit_and_miss_counters():
+    cache: TTLCache[str, str] = TTLCache(maxsize=2, ttl=10)
+
+    assert cache.get("a") is None
+    cache.set("a", "review")
+    assert cache.get("a") == "review"
+
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_cache_expires_entries_after_ttl(clock):
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=5, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_invalidate():
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=5)
+    cache.set("a", 1)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+
+    assert cache.get("a") is None
@@ -0,0 +1,87 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from app.services.ai import AIUnavailableError
+from app.services.review_jobs import ReviewClaimedError, ReviewJobQueue
+
+
+@pytest.mark.asyncio
+async def test_workers_process_submitted_jobs():
+    processed = []
+    done = asyncio.Event()
+
+    async def process(uuid):
+        processed.append(uuid)
+        if len(processed) == 3:
+            done.set()
+
+    async def fail(uuid):
+        raise AssertionError("should not fail")
+
+    jobs = ReviewJobQueue(process=process, fail=fail, workers=2)
+    await jobs.start()
+    uuids = [uuid4() for _ in range(3)]
+    for uuid in uuids:
+        jobs.submit(uuid)
+
+    await asyncio.wait_for(done.wait(), timeout=1)
+    await jobs.stop()
+
+    assert sorted(processed) == sorted(uuids)
+    assert not jobs.running
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_jobs_are_retried_then_failed():
+    attempts = 0
+    failed = asyncio.Event()
+
+    async def process(uuid):
+        nonlocal attempts
+        attempts += 1
+        raise AIUnavailableError("busy", retry_after=0.001)
+
+    async def fail(uuid):
+        failed.set()
+
+    jobs = ReviewJobQueue(process=process, fail=fail, workers=1, max_attempts=3)
+    await jobs.start()
+    jobs.submit(uuid4())
+
+    await asyncio.wait_for(failed.wait(), timeout=1)
+    await jobs.stop()
+
+    assert attempts == 3
+
+
+def test_submit_requires_running_queue():
+    jobs = ReviewJobQueue(process=None, fail=None)
+
+    with pytest.raises(RuntimeError):
+        jobs.submit(uuid4())
+
+
+@pytest.mark.asyncio
+async def test_claimed_jobs_are_rechecked_without_using_attempts():
+    attempts = []
+    done = asyncio.Event()
+
+    async def process(uuid):
+        attempts.append(uuid)
+        if len(attempts) < 3:
+            raise ReviewClaimedError(retry_after=0.001)
+        done.set()
+
+    async def fail(uuid):
+        raise AssertionError("should not fail")
+
+    jobs = ReviewJobQueue(process=process, fail=fail, workers=1, max_attempts=1)
+    await jobs.start()
+    jobs.submit(uuid4())
+
+    await asyncio.wait_for(done.wait(), timeout=1)
+    await jobs.stop()
+
+    assert len(attempts) == 3
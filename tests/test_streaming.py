@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from app.services.streaming import coalesce_chunks
+
+
+async def chunks(*items, pause=0.0):
+    for item in items:
+        if isinstance(item, Exception):
+            raise item
+        yield item
+        if pause:
+            await asyncio.sleep(pause)
+
+
+@pytest.mark.asyncio
+async def test_first_chunk_passes_through_and_rest_is_batched_by_size():
+    out = [
+        chunk
+        async for chunk in coalesce_chunks(
+            chunks(b"a", b"bb", b"cc", b"d"), max_bytes=4, max_delay=10
+        )
+    ]
+
+    assert out == [b"a", b"bbcc", b"d"]
+
+
+@pytest.mark.asyncio
+async def test_buffer_is_flushed_when_the_delay_expires():
+    async def slow():
+        yield b"first"
+        yield b"x"
+        await asyncio.sleep(0.05)
+        yield b"y"
+
+    out = [
+        chunk async for chunk in coalesce_chunks(slow(), max_bytes=1024, max_delay=0.01)
+    ]
+
+    assert out == [b"first", b"x", b"y"]
+
+
+@pytest.mark.asyncio
+async def test_source_errors_propagate():
+    with pytest.raises(RuntimeError):
+        async for _ in coalesce_chunks(
+            chunks(b"a", RuntimeError("boom")), max_bytes=4, max_delay=10
+        ):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_disabled_coalescing_is_a_passthrough():
+    out = [chunk async for chunk in coalesce_chunks(chunks(b"a", b"b"), max_bytes=0)]
+
+    assert out == [b"a", b"b"]
@@ -1,7 +1,24 @@
+import asyncio
+import httpx
+import json
 import pytest
+from datetime import datetime, UTC
+from uuid import uuid4
 from fastapi.testclient import TestClient
-from app.core.di import get_submissions_service
+from app.core import di
+from app.core.di import get_ai, get_mg_repo, get_pg_repo, get_submissions_service
 from app.main import app as main_app
+from app.models.postgre import Language, SubmissionStatus
+from app.schemas.submissions import (
+    CodePayload,
+    SubmissionOut,
+    SubmissionPage,
+    SubmissionWithPayloadOut,
+)
+from app.services.ai import AI, CircuitBreaker
+from app.services.ai_providers import FakeAIProvider, FakeAISettings
+from app.services.submissions import SubmissionsService
+from benchmarks.memory_repos import MemoryMongoRepo, MemoryPgRepo
 
 
 @pytest.fixture
@@ -29,20 +46,22 @@ def test_create_submission_missing_fields(client):
 
 
 class FakeService:
-    async def create(self, data):
-        return {
-            "id": 9,
-            "uuid": "1dd8bc73-010c-4032-a4f5-9b92766a3017",
-            "title": "test",
-            "language": "Python",
-            "mongo_id": "68b7fb7f54f27c40f9613770",
-            "created_at": "2025-09-03T08:25:35.135829Z",
-            "updated_at": "2025-09-03T08:25:35.135829Z",
-            "payload": {
-                "content": "print('this is a test for my Submission router implementation')",
-                "ai_response": "1. The code does not implement any backend functionality and merely prints a message to the console.\n\n2. Key findings:\n   - Lacks input handling for dynamic data.\n   - No error handling or logging mechanisms implemented.\n   - No routing logic or API framework setup (e.g., Flask or FastAPI).\n   - Doesn't encapsulate functionality in functions or classes for better structure.\n\n3. Most critical recommendation: Refactor the code to set up a basic framework for an API endpoint using Flask or FastAPI, allowing for proper request handling and response management. For example:\n\n```python\nfrom flask import Flask, jsonify\n\napp = Flask(__name__)\n\n@app.route('/test', methods=['GET'])\ndef test_route():\n    return jsonify(message='This is a test for my Submission router implementation')\n\nif __name__ == '__main__':\n    app.run(debug=True)\n```",
-            },
-        }
+    async def create(self, data, defer_review=False):
+        return SubmissionWithPayloadOut(
+            **{
+                "id": 9,
+                "uuid": "1dd8bc73-010c-4032-a4f5-9b92766a3017",
+                "title": "test",
+                "language": "Python",
+                "mongo_id": "68b7fb7f54f27c40f9613770",
+                "created_at": "2025-09-03T08:25:35.135829Z",
+                "updated_at": "2025-09-03T08:25:35.135829Z",
+                "payload": {
+                    "content": "print('this is a test for my Submission router implementation')",
+                    "ai_response": "1. The code does not implement any backend functionality and merely prints a message to the console.\n\n2. Key findings:\n   - Lacks input handling for dynamic data.\n   - No error handling or logging mechanisms implemented.\n   - No routing logic or API framework setup (e.g., Flask or FastAPI).\n   - Doesn't encapsulate functionality in functions or classes for better structure.\n\n3. Most critical recommendation: Refactor the code to set up a basic framework for an API endpoint using Flask or FastAPI, allowing for proper request handling and response management. For example:\n\n```python\nfrom flask import Flask, jsonify\n\napp = Flask(__name__)\n\n@app.route('/test', methods=['GET'])\ndef test_route():\n    return jsonify(message='This is a test for my Submission router implementation')\n\nif __name__ == '__main__':\n    app.run(debug=True)\n```",
+                },
+            }
+        )
 
 
 def override_service():
@@ -134,3 +153,205 @@ def test_create_submission_missing_payload_content(client):
     body = response.json()
     assert body["detail"][0]["loc"] == ["body", "payload", "content"]
     assert body["detail"][0]["msg"] == "Field required"
+
+
+class FakeListingService:
+    def __init__(self):
+        self.kwargs = None
+
+    async def get_all(self, **kwargs):
+        self.kwargs = kwargs
+        payload = (
+            CodePayload(content="print('listing with payloads for the dashboard')")
+            if kwargs["include_payload"]
+            else None
+        )
+        item = SubmissionOut(
+            uuid=uuid4(),
+            title="test",
+            short_feedback="ok",
+            language=Language.PYTHON,
+            created_at=datetime.now(UTC),
+            updated_at=datetime.now(UTC),
+        )
+        if payload:
+            item.payload = payload
+        return SubmissionPage(items=[item], next_cursor="abc")
+
+
+def test_get_submissions_page(client, test_app):
+    service = FakeListingService()
+    test_app.dependency_overrides[get_submissions_service] = lambda: service
+
+    response = client.get("/submissions", params={"limit": 1, "language": "Python"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert "payload" not in response.json()[0]
+    assert service.kwargs["language"] == Language.PYTHON
+
+    response = client.get("/submissions", params={"include": "payload"})
+    assert response.json()[0]["payload"]["content"].startswith("print(")
+
+    test_app.dependency_overrides = {}
+
+
+class FakePendingService:
+    async def create(self, data, defer_review=False):
+        assert defer_review
+        return SubmissionWithPayloadOut(
+            uuid=uuid4(),
+            title=data.title,
+            language=data.language,
+            status=SubmissionStatus.PENDING,
+            created_at=datetime.now(UTC),
+            updated_at=datetime.now(UTC),
+            payload=CodePayload(content=data.payload.content),
+        )
+
+
+def test_create_submission_async_mode_returns_202(client, test_app):
+    test_app.dependency_overrides[get_submissions_service] = FakePendingService
+    payload = {
+        "title": "test",
+        "language": "Python",
+        "payload": {
+            "content": "print('this is a test for my Submission router implementation')"
+        },
+    }
+
+    response = client.post("/submissions", params={"mode": "async"}, json=payload)
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "pending"
+
+    test_app.dependency_overrides = {}
+
+
+def test_create_submissions_batch_rejects_empty_batch(client):
+    response = client.post("/submissions/batch", json={"items": []})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][-1] == "items"
+
+
+class Wired:
+    """The real request dependencies, with only the stores and the AI swapped."""
+
+    def __init__(self, monkeypatch):
+        self.pg = MemoryPgRepo()
+        self.mg = MemoryMongoRepo()
+        self.ai = AI(
+            FakeAIProvider(
+                FakeAISettings(
+                    latency_ms=50, latency_sigma=0, chunks=4, chunk_interval_ms=10
+                )
+            )
+        )
+        main_app.dependency_overrides[get_pg_repo] = lambda: self.pg
+        main_app.dependency_overrides[get_mg_repo] = lambda: self.mg
+        main_app.dependency_overrides[get_ai] = lambda: self.ai
+        # review workers get the same stand-ins instead of a database session
+        monkeypatch.setattr(
+            di,
+            "build_background_service",
+            lambda session: SubmissionsService(
+                pg=self.pg,
+                mg=self.mg,
+                ai=self.ai,
+                cache=di.review_cache,
+                broadcaster=di.review_broadcaster,
+            ),
+        )
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main_app), base_url="http://test"
+        )
+
+
+@pytest.fixture
+def wired(monkeypatch):
+    yield Wired(monkeypatch)
+    main_app.dependency_overrides = {}
+
+
+def submission(content: str) -> dict:
+    return {"title": "wired", "language": "Python", "payload": {"content": content}}
+
+
+@pytest.mark.asyncio
+async def test_async_mode_through_real_dependencies(wired):
+    await di.review_jobs.start()
+    try:
+        async with wired.client() as client:
+            response = await client.post(
+                "/submissions",
+                params={"mode": "async"},
+                json=submission("def queued(job):\n    return job.run()\n"),
+            )
+            assert response.status_code == 202
+            assert response.json()["status"] == "pending"
+
+            uuid = response.json()["uuid"]
+            for _ in range(100):
+                body = (await client.get(f"/submissions/{uuid}")).json()
+                if body["status"] != "pending":
+                    break
+                await asyncio.sleep(0.01)
+    finally:
+        await di.review_jobs.stop()
+
+    assert body["status"] == "completed"
+    assert body["payload"]["ai_response"]
+
+
+@pytest.mark.asyncio
+async def test_review_events_stream_live_through_real_dependencies(wired):
+    await di.review_jobs.start()
+    try:
+        async with wired.client() as client:
+            response = await client.post(
+                "/submissions",
+                params={"mode": "async"},
+                json=submission("def watched(job):\n    return job.wait()\n"),
+            )
+            uuid = response.json()["uuid"]
+            async with client.stream("GET", f"/submissions/{uuid}/events") as events:
+                body = (await events.aread()).decode()
+            stored = (await client.get(f"/submissions/{uuid}")).json()
+    finally:
+        await di.review_jobs.stop()
+
+    frames = [frame.splitlines() for frame in body.strip().split("\n\n")]
+    deltas = [
+        json.loads(lines[1][6:])["text"]
+        for lines in frames
+        if lines[0] == "event: delta"
+    ]
+    # one delta per streamed chunk, not the single replay of a stored review
+    assert len(deltas) == 4
+    assert "".join(deltas) == stored["payload"]["ai_response"]
+    assert frames[-1] == ["event: done", 'data: {"status": "completed"}']
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_queues_review_through_real_dependencies(wired):
+    breaker = CircuitBreaker()
+    breaker._open()
+    wired.ai = AI(wired.ai.provider, breaker=breaker)
+    content = "def degraded(job):\n    return job.later()\n"
+
+    async with wired.client() as client:
+        response = await client.post("/submissions", json=submission(content))
+        # no review workers to fall back on
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+
+        await di.review_jobs.start()
+        try:
+            response = await client.post("/submissions", json=submission(content))
+        finally:
+            await di.review_jobs.stop()
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "pending"
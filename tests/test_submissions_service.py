@@ -1,17 +1,34 @@
+import asyncio
 import pytest
 from uuid import uuid4
 from datetime import datetime, UTC
 from fastapi import HTTPException
-from unittest.mock import AsyncMock
+from pymongo.errors import PyMongoError
+from sqlalchemy.exc import SQLAlchemyError
+from unittest.mock import AsyncMock, MagicMock
 from typing import cast
-import hashlib
+import json
 
-from app.models.postgre import Language
-from app.services.submissions import SubmissionsService
+from app.core.cache import TTLCache
+from app.core.singleflight import SingleFlight
+from app.models.postgre import Language, SubmissionStatus
+from app.services.broadcast import ReviewBroadcaster
+from app.services.ai_providers import FakeAIProvider, FakeAISettings
+from app.services.near_duplicates import NearDuplicateIndex
+from app.services.review_jobs import ReviewClaimedError
+import app.services.submissions as submissions_module
+from app.services.submissions import (
+    CachedReview,
+    SubmissionsService,
+    compute_code_hash,
+    encode_cursor,
+)
+from app.schemas.ai import ReviewPayload
 from app.schemas.submissions import SubmissionCreate, CodePayload
 from app.repositories.protocols import SubmissionsPgRepo, SubmissionsMongoRepo
-from app.services.ai import AI as AIService
+from app.services.ai import AI as AIService, AICircuitOpenError, AIUnavailableError
 from app.models.mongo import SubmissionDocument
+from benchmarks.memory_repos import MemoryMongoRepo, MemoryPgRepo
 
 
 class FakePgSubmission:
@@ -22,10 +39,26 @@ class FakePgSubmission:
         self.language = Language.PYTHON
         self.mongo_id = mongo_id
         self.short_feedback = "test"
+        self.status = SubmissionStatus.COMPLETED
+        self.hash = "hash"
+        self.payload_snapshot = None
         self.created_at = datetime.now(UTC)
         self.updated_at = datetime.now(UTC)
 
 
+def fake_listing_row(sub: FakePgSubmission) -> dict:
+    return {
+        "id": sub.id,
+        "uuid": sub.uuid,
+        "title": sub.title,
+        "short_feedback": sub.short_feedback,
+        "language": sub.language,
+        "mongo_id": sub.mongo_id,
+        "created_at": sub.created_at,
+        "updated_at": sub.updated_at,
+    }
+
+
 @pytest.mark.asyncio
 async def test_get_submission_with_payload():
     fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
@@ -72,7 +105,10 @@ async def test_get_submission_not_found():
 @pytest.mark.asyncio
 async def test_get_all_submissions():
     fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
-    fake_pg.find_all.return_value = [FakePgSubmission(), FakePgSubmission()]
+    fake_pg.find_all_rows.return_value = [
+        fake_listing_row(FakePgSubmission()),
+        fake_listing_row(FakePgSubmission()),
+    ]
 
     service = SubmissionsService(
         pg=fake_pg,
@@ -81,8 +117,52 @@ async def test_get_all_submissions():
     )
 
     result = await service.get_all()
-    assert len(result) == 2
-    assert all(r.title == "test" for r in result)
+    assert len(result.items) == 2
+    assert all(r.title == "test" for r in result.items)
+    assert result.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_get_all_submissions_returns_keyset_cursor():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    subs = [FakePgSubmission() for _ in range(3)]
+    for i, sub in enumerate(subs):
+        sub.id = 10 - i
+    fake_pg.find_all_rows.return_value = [fake_listing_row(sub) for sub in subs]
+
+    service = SubmissionsService(
+        pg=fake_pg,
+        mg=cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo)),
+        ai=cast(AIService, AsyncMock(spec=AIService)),
+    )
+
+    page = await service.get_all(limit=2, language=Language.PYTHON)
+
+    assert len(page.items) == 2
+    assert page.next_cursor == encode_cursor(subs[1].created_at, subs[1].id)
+    fake_pg.find_all_rows.assert_awaited_once_with(
+        limit=3, after=None, language=Language.PYTHON, title_prefix=None
+    )
+
+    await service.get_all(limit=2, cursor=page.next_cursor)
+    assert fake_pg.find_all_rows.await_args.kwargs["after"] == (
+        subs[1].created_at,
+        9,
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_all_submissions_invalid_cursor():
+    service = SubmissionsService(
+        pg=cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo)),
+        mg=cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo)),
+        ai=cast(AIService, AsyncMock(spec=AIService)),
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        await service.get_all(cursor="not-a-cursor")
+
+    assert excinfo.value.status_code == 400
 
 
 @pytest.mark.asyncio
@@ -131,7 +211,7 @@ async def test_create_submission_existing_in_db():
         payload=CodePayload(content=content),
     )
 
-    expected_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    expected_hash = compute_code_hash(content, Language.PYTHON)
 
     existing_sub = FakePgSubmission(mongo_id="mongo123")
     fake_pg.find_by_hash.return_value = existing_sub
@@ -152,3 +232,860 @@ async def test_create_submission_existing_in_db():
 
     assert result.payload.content == content
     assert result.payload.ai_response == "Already exists!"
+
+
+@pytest.mark.asyncio
+async def test_create_submission_served_from_review_cache():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+
+    content = "print('Testing submissions service implementation to prevent errors')"
+    fake_pg.find_by_hash.return_value = FakePgSubmission(mongo_id="mongo123")
+    fake_mg.find.return_value = SubmissionDocument(
+        _id="mongo123", content=content, ai_response="Already exists!"
+    )
+
+    cache: TTLCache[str, CachedReview] = TTLCache(maxsize=10, ttl=60)
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai, cache=cache)
+    data = SubmissionCreate(
+        title="test", language=Language.PYTHON, payload=CodePayload(content=content)
+    )
+
+    first = await service.create(data)
+    second = await service.create(data)
+
+    assert fake_pg.find_by_hash.await_count == 1
+    assert fake_mg.find.await_count == 1
+    assert second.uuid == first.uuid
+    assert second.payload.ai_response == "Already exists!"
+    assert cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_create_submission_refreshes_review_cache_on_insert():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+
+    fake_ai.get_feedback.return_value = "AI says OK"
+    fake_pg.find_by_hash.return_value = None
+    fake_mg.insert.return_value = "mongo123"
+    created = FakePgSubmission(mongo_id="mongo123")
+    fake_pg.create.return_value = created
+
+    content = "print('Testing submissions service implementation to prevent errors')"
+    code_hash = compute_code_hash(content, Language.PYTHON)
+    cache: TTLCache[str, CachedReview] = TTLCache(maxsize=10, ttl=60)
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai, cache=cache)
+
+    await service.create(
+        SubmissionCreate(
+            title="test", language=Language.PYTHON, payload=CodePayload(content=content)
+        )
+    )
+
+    cached = cache.get(code_hash)
+    assert cached is not None
+    assert cached.submission.uuid == created.uuid
+    assert cached.ai_response == "AI says OK"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_submissions_share_one_ai_call():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+
+    async def slow_feedback(data):
+        await asyncio.sleep(0.01)
+        return "AI says OK"
+
+    fake_ai.get_feedback.side_effect = slow_feedback
+    fake_pg.find_by_hash.return_value = None
+    fake_mg.insert.return_value = "mongo123"
+    fake_pg.create.return_value = FakePgSubmission(mongo_id="mongo123")
+
+    service = SubmissionsService(
+        pg=fake_pg, mg=fake_mg, ai=fake_ai, inflight=SingleFlight()
+    )
+    data = SubmissionCreate(
+        title="test",
+        language=Language.PYTHON,
+        payload=CodePayload(
+            content="print('Testing submissions service implementation to prevent errors')"
+        ),
+    )
+
+    results = await asyncio.gather(*(service.create(data) for _ in range(5)))
+
+    assert fake_ai.get_feedback.await_count == 1
+    assert fake_mg.insert.await_count == 1
+    assert fake_pg.create.await_count == 1
+    assert all(r.payload.ai_response == "AI says OK" for r in results)
+
+
+@pytest.mark.asyncio
+async def test_get_all_submissions_with_payloads_uses_one_batch_lookup():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    rows = [
+        {**fake_listing_row(FakePgSubmission()), "mongo_id": "m1"},
+        {**fake_listing_row(FakePgSubmission()), "mongo_id": "m2"},
+    ]
+    fake_pg.find_all_rows.return_value = rows
+    fake_mg.find_many.return_value = [
+        SubmissionDocument(
+            _id="m1",
+            content="print('Testing submissions service implementation to prevent errors')",
+            ai_response="Looks good",
+        )
+    ]
+
+    service = SubmissionsService(
+        pg=fake_pg, mg=fake_mg, ai=cast(AIService, AsyncMock(spec=AIService))
+    )
+
+    page = await service.get_all(include_payload=True)
+
+    fake_mg.find_many.assert_awaited_once_with(["m1", "m2"])
+    fake_mg.find.assert_not_called()
+    assert page.items[0].payload.ai_response == "Looks good"
+    assert page.items[1].payload is None
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_streams_batches():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    batches = [
+        [fake_listing_row(FakePgSubmission(mongo_id="m1"))],
+        [fake_listing_row(FakePgSubmission(mongo_id="m2"))],
+    ]
+
+    async def stream_rows(batch_size):
+        for batch in batches:
+            yield batch
+
+    fake_pg.stream_rows = stream_rows
+    fake_mg.find_many.side_effect = lambda ids: [
+        SubmissionDocument(
+            _id=i,
+            content="print('Testing submissions service implementation to prevent errors')",
+            ai_response=f"review {i}",
+        )
+        for i in ids
+    ]
+
+    service = SubmissionsService(
+        pg=fake_pg, mg=fake_mg, ai=cast(AIService, AsyncMock(spec=AIService))
+    )
+
+    chunks = [chunk async for chunk in service.export_ndjson(batch_size=1)]
+
+    assert len(chunks) == 2
+    lines = b"".join(chunks).decode().splitlines()
+    assert [json.loads(line)["payload"]["ai_response"] for line in lines] == [
+        "review m1",
+        "review m2",
+    ]
+    assert fake_mg.find_many.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_aborts_on_store_error():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+
+    async def stream_rows(batch_size):
+        yield [fake_listing_row(FakePgSubmission(mongo_id="m1"))]
+        yield [fake_listing_row(FakePgSubmission(mongo_id="m2"))]
+
+    fake_pg.stream_rows = stream_rows
+    fake_mg.find_many.side_effect = [[], PyMongoError("down")]
+
+    service = SubmissionsService(
+        pg=fake_pg, mg=fake_mg, ai=cast(AIService, AsyncMock(spec=AIService))
+    )
+
+    chunks = []
+    # a clean end of stream would look like a complete export
+    with pytest.raises(PyMongoError):
+        async for chunk in service.export_ndjson(batch_size=1):
+            chunks.append(chunk)
+    assert len(chunks) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_review_replays_stored_review():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+    fake_pg.find_by_hash.return_value = None
+    fake_mg.find_review.return_value = "x" * 600
+
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai)
+    data = ReviewPayload(
+        language=Language.PYTHON,
+        payload=CodePayload(
+            content="print('Testing submissions service implementation to prevent errors')"
+        ),
+    )
+
+    stream = await service.stream_review(data)
+    fake_pg.find_by_hash.assert_awaited_once()
+    fake_mg.find_review.assert_awaited_once()
+    chunks = [chunk async for chunk in stream]
+
+    assert b"".join(chunks) == b"x" * 600
+    assert len(chunks) == 3
+    fake_ai.stream_feedback.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stream_review_stores_completed_stream():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+    fake_pg.find_by_hash.return_value = None
+    fake_mg.find_review.return_value = None
+
+    async def stream_feedback(data, on_complete=None):
+        yield b"Hello "
+        yield b"World"
+        await on_complete("Hello World")
+
+    fake_ai.stream_feedback = stream_feedback
+    content = "print('Testing submissions service implementation to prevent errors')"
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai)
+    data = ReviewPayload(language=Language.PYTHON, payload=CodePayload(content=content))
+
+    chunks = [chunk async for chunk in await service.stream_review(data)]
+
+    assert b"".join(chunks) == b"Hello World"
+    fake_mg.save_review.assert_awaited_once_with(
+        compute_code_hash(content, Language.PYTHON), "Hello World"
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_submission_returns_503_when_ai_unavailable():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+    fake_pg.find_by_hash.return_value = None
+    fake_ai.get_feedback.side_effect = AIUnavailableError("busy", retry_after=2.5)
+
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai)
+    data = SubmissionCreate(
+        title="test",
+        language=Language.PYTHON,
+        payload=CodePayload(
+            content="print('Testing submissions service implementation to prevent errors')"
+        ),
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        await service.create(data)
+
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "3"}
+    fake_mg.insert.assert_not_called()
+    fake_pg.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_submission_does_not_store_failed_review():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+    fake_pg.find_by_hash.return_value = None
+    fake_ai.get_feedback.side_effect = RuntimeError("boom")
+
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai)
+    data = SubmissionCreate(
+        title="test",
+        language=Language.PYTHON,
+        payload=CodePayload(
+            content="print('Testing submissions service implementation to prevent errors')"
+        ),
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        await service.create(data)
+
+    assert excinfo.value.status_code == 500
+    fake_mg.insert.assert_not_called()
+    fake_pg.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_submission_deferred_review_is_queued():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+    fake_jobs = MagicMock(running=True)
+
+    pending = FakePgSubmission(mongo_id="mongo123")
+    pending.status = SubmissionStatus.PENDING
+    fake_pg.find_by_hash.return_value = None
+    fake_mg.insert.return_value = "mongo123"
+    fake_pg.create.return_value = pending
+
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai, jobs=fake_jobs)
+    data = SubmissionCreate(
+        title="test",
+        language=Language.PYTHON,
+        payload=CodePayload(
+            content="print('Testing submissions service implementation to prevent errors')"
+        ),
+    )
+
+    result = await service.create(data, defer_review=True)
+
+    assert result.status == SubmissionStatus.PENDING
+    assert result.payload.ai_response is None
+    fake_ai.get_feedback.assert_not_called()
+    mongo_id = fake_pg.create.await_args.kwargs["mongo_id"]
+    fake_mg.insert.assert_awaited_once_with(
+        data.payload.model_dump(), None, mongo_id=mongo_id
+    )
+    assert fake_pg.create.await_args.kwargs["status"] == SubmissionStatus.PENDING
+    fake_jobs.submit.assert_called_once_with(pending.uuid)
+
+
+@pytest.mark.asyncio
+async def test_complete_review_fills_pending_submission():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+
+    pending = FakePgSubmission(mongo_id="mongo123")
+    pending.status = SubmissionStatus.PENDING
+    fake_pg.claim_review.return_value = pending
+    fake_mg.find.return_value = SubmissionDocument(
+        _id="mongo123",
+        content="print('Testing submissions service implementation to prevent errors')",
+    )
+    fake_pg.update_review.return_value = FakePgSubmission(mongo_id="mongo123")
+
+    async def stream_deltas(data):
+        yield "AI says "
+        yield "OK"
+
+    fake_ai.stream_deltas = stream_deltas
+    cache: TTLCache[str, CachedReview] = TTLCache(maxsize=10, ttl=60)
+    broadcaster = ReviewBroadcaster()
+    service = SubmissionsService(
+        pg=fake_pg, mg=fake_mg, ai=fake_ai, cache=cache, broadcaster=broadcaster
+    )
+    subscriber = broadcaster.subscribe(pending.uuid)
+    first_event = asyncio.ensure_future(subscriber.__anext__())
+    await asyncio.sleep(0)
+
+    await service.complete_review(pending.uuid)
+
+    fake_mg.update_ai_response.assert_awaited_once_with("mongo123", "AI says OK")
+    fake_pg.update_review.assert_awaited_once_with(
+        pending.uuid,
+        short_feedback="AI says OK",
+        status=SubmissionStatus.COMPLETED,
+        payload_snapshot=None,
+    )
+    assert cache.get("hash").ai_response == "AI says OK"
+    events = [await first_event] + [event async for event in subscriber]
+    assert events == [
+        ("delta", {"text": "AI says "}),
+        ("delta", {"text": "OK"}),
+        ("done", {"status": "completed"}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_review_events_fall_back_when_reviewed_elsewhere(monkeypatch):
+    monkeypatch.setattr(submissions_module, "REVIEW_EVENTS_KEEPALIVE_SECONDS", 0.01)
+    pg, mg = MemoryPgRepo(), MemoryMongoRepo()
+    mongo_id = await mg.insert({"content": "print('reviewed elsewhere')"}, None)
+    pending = await pg.create(
+        title="test",
+        language=Language.PYTHON,
+        mongo_id=mongo_id,
+        code_hash="hash",
+        short_feedback="",
+        status=SubmissionStatus.PENDING,
+    )
+    assert pending is not None
+    service = SubmissionsService(
+        pg=pg, mg=mg, ai=AsyncMock(spec=AIService), broadcaster=ReviewBroadcaster()
+    )
+
+    events = await service.review_events(pending.uuid)
+    assert await events.__anext__() == b": keepalive\n\n"
+    # another instance completes the review; nothing is published here
+    await mg.update_ai_response(mongo_id, "Looks good")
+    await pg.update_review(
+        pending.uuid, short_feedback="Looks good", status=SubmissionStatus.COMPLETED
+    )
+    rest = [chunk async for chunk in events]
+
+    assert rest == [
+        b'event: delta\ndata: {"text": "Looks good"}\n\n',
+        b'event: done\ndata: {"status": "completed"}\n\n',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_complete_review_runs_once_across_workers():
+    pg, mg = MemoryPgRepo(), MemoryMongoRepo()
+    provider = FakeAIProvider(
+        FakeAISettings(latency_ms=10, latency_sigma=0, chunk_interval_ms=0)
+    )
+    content = "print('reviewed by whichever worker claims it first')"
+    mongo_id = await mg.insert({"content": content}, None)
+    pending = await pg.create(
+        title="test",
+        language=Language.PYTHON,
+        mongo_id=mongo_id,
+        code_hash="hash",
+        short_feedback="",
+        status=SubmissionStatus.PENDING,
+    )
+    assert pending is not None
+
+    # e.g. two instances that both re-queued the row at startup
+    workers = [
+        SubmissionsService(pg=pg, mg=mg, ai=AIService(provider)) for _ in range(2)
+    ]
+    outcomes = await asyncio.gather(
+        *(worker.complete_review(pending.uuid) for worker in workers),
+        return_exceptions=True,
+    )
+
+    assert provider.calls == 1
+    assert pending.status == SubmissionStatus.COMPLETED
+    assert pending.review_claimed_at is None
+    # the loser saw a live claim and will look again once it could be stale
+    assert sum(isinstance(o, ReviewClaimedError) for o in outcomes) == 1
+
+
+@pytest.mark.asyncio
+async def test_complete_review_releases_claim_when_ai_is_unavailable():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+    pending = FakePgSubmission(mongo_id="mongo123")
+    pending.status = SubmissionStatus.PENDING
+    fake_pg.claim_review.return_value = pending
+    fake_mg.find.return_value = SubmissionDocument(
+        _id="mongo123",
+        content="print('Testing submissions service implementation to prevent errors')",
+    )
+
+    async def stream_deltas(data):
+        raise AIUnavailableError("busy")
+        yield
+
+    fake_ai.stream_deltas = stream_deltas
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai)
+
+    with pytest.raises(AIUnavailableError):
+        await service.complete_review(pending.uuid)
+    fake_pg.release_review.assert_awaited_once_with(pending.uuid)
+    fake_pg.update_review.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_batch_reviews_each_new_hash_once():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+
+    existing = FakePgSubmission(mongo_id="old")
+    existing.hash = compute_code_hash(
+        "print('batch item that is existing here')", Language.PYTHON
+    )
+    fake_pg.find_by_hashes.return_value = [existing]
+    fake_mg.find_many.return_value = [
+        SubmissionDocument(
+            _id="old",
+            content="print('batch item that is existing here')",
+            ai_response="Old",
+        )
+    ]
+
+    async def feedback(data):
+        if data.payload.content == "print('batch item that is busy here')":
+            raise AIUnavailableError("busy")
+        return f"Review of {data.payload.content}"
+
+    fake_ai.get_feedback.side_effect = feedback
+    fake_mg.insert_many.return_value = ["new"]
+    created = FakePgSubmission(mongo_id="new")
+    fake_pg.create_many.return_value = [created]
+
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai)
+    items = [
+        SubmissionCreate(
+            title=f"item {i}",
+            language=Language.PYTHON,
+            payload=CodePayload(content=content),
+        )
+        for i, content in enumerate(
+            [
+                "print('batch item that is fresh here')",
+                "print('batch item that is existing here')",
+                "print('batch item that is fresh here')",
+                "print('batch item that is busy here')",
+            ]
+        )
+    ]
+
+    results = await service.create_batch(items, concurrency=2)
+
+    assert [r.status for r in results] == ["created", "duplicate", "duplicate", "error"]
+    assert results[0].submission.uuid == created.uuid
+    assert (
+        results[0].submission.payload.ai_response
+        == "Review of print('batch item that is fresh here')"
+    )
+    assert results[1].submission.uuid == existing.uuid
+    assert results[1].submission.payload.ai_response == "Old"
+    assert results[2].submission.uuid == created.uuid
+    assert results[3].submission is None
+    assert fake_ai.get_feedback.await_count == 2
+    fake_pg.find_by_hashes.assert_awaited_once()
+    fake_mg.insert_many.assert_awaited_once()
+    (rows,) = fake_pg.create_many.await_args.args
+    assert [row["mongo_id"] for row in rows] == ["new"]
+    assert rows[0]["status"] == SubmissionStatus.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_create_batch_does_not_store_failed_reviews():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+    fake_pg.find_by_hashes.return_value = []
+    fake_mg.find_many.return_value = []
+    fake_ai.get_feedback.side_effect = RuntimeError("boom")
+
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai)
+    items = [
+        SubmissionCreate(
+            title="item",
+            language=Language.PYTHON,
+            payload=CodePayload(content="print('batch item whose review fails')"),
+        )
+    ]
+
+    results = await service.create_batch(items)
+
+    assert [r.status for r in results] == ["error"]
+    fake_mg.insert_many.assert_not_called()
+    fake_pg.create_many.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_batch_removes_payloads_when_postgres_insert_fails():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+    fake_pg.find_by_hashes.return_value = []
+    fake_mg.find_many.return_value = []
+    fake_ai.get_feedback.return_value = "AI says OK"
+    fake_mg.insert_many.return_value = ["m1", "m2"]
+    fake_pg.create_many.side_effect = SQLAlchemyError("insert failed")
+
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai)
+    items = [
+        SubmissionCreate(
+            title=f"item {i}",
+            language=Language.PYTHON,
+            payload=CodePayload(content=f"print('batch item number {i} to store')"),
+        )
+        for i in range(2)
+    ]
+
+    results = await service.create_batch(items)
+
+    assert [r.status for r in results] == ["error", "error"]
+    fake_mg.delete_many.assert_awaited_once_with(["m1", "m2"])
+
+
+@pytest.mark.asyncio
+async def test_create_submission_lost_insert_race_returns_stored_row():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+
+    winner = FakePgSubmission(mongo_id="winner")
+    fake_pg.find_by_hash.side_effect = [None, winner]
+    fake_ai.get_feedback.return_value = "AI says OK"
+    fake_pg.create.return_value = None  # ON CONFLICT kept the other row
+    fake_mg.find.return_value = SubmissionDocument(
+        _id="winner",
+        content="print('Testing submissions service implementation to prevent errors')",
+        ai_response="Stored review",
+    )
+
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai)
+    data = SubmissionCreate(
+        title="test",
+        language=Language.PYTHON,
+        payload=CodePayload(
+            content="print('Testing submissions service implementation to prevent errors')"
+        ),
+    )
+
+    result = await service.create(data)
+
+    assert result.uuid == winner.uuid
+    assert result.payload.ai_response == "Stored review"
+    fake_mg.delete_many.assert_awaited_once_with(
+        [fake_pg.create.await_args.kwargs["mongo_id"]]
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_submission_served_from_read_model():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+
+    fake_submission = FakePgSubmission(mongo_id="abc123")
+    fake_submission.payload_snapshot = {
+        "_id": "abc123",
+        "content": "print('Testing submissions service implementation to prevent errors')",
+        "ai_response": "Looks good",
+    }
+    fake_pg.find_by_uuid.return_value = fake_submission
+
+    service = SubmissionsService(
+        pg=fake_pg,
+        mg=fake_mg,
+        ai=cast(AIService, AsyncMock(spec=AIService)),
+        read_model=True,
+    )
+
+    result = await service.get(fake_submission.uuid)
+
+    assert result.payload.ai_response == "Looks good"
+    fake_pg.find_by_uuid.assert_awaited_once_with(
+        fake_submission.uuid, with_payload=True
+    )
+    fake_mg.find.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_submission_writes_read_model():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+    fake_ai.get_feedback.return_value = "AI says OK"
+    fake_pg.find_by_hash.return_value = None
+    fake_mg.insert.return_value = "mongo123"
+    fake_pg.create.return_value = FakePgSubmission(mongo_id="mongo123")
+
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai, read_model=True)
+    content = "print('Testing submissions service implementation to prevent errors')"
+    await service.create(
+        SubmissionCreate(
+            title="test", language=Language.PYTHON, payload=CodePayload(content=content)
+        )
+    )
+
+    kwargs = fake_pg.create.await_args.kwargs
+    assert kwargs["payload_snapshot"] == {
+        "_id": kwargs["mongo_id"],
+        "content": content,
+        "ai_response": "AI says OK",
+    }
+
+
+@pytest.mark.asyncio
+async def test_create_submission_removes_payload_when_postgres_write_fails():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+    fake_ai.get_feedback.return_value = "AI says OK"
+    fake_pg.find_by_hash.return_value = None
+    fake_pg.create.side_effect = SQLAlchemyError("boom")
+
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai)
+    data = SubmissionCreate(
+        title="test",
+        language=Language.PYTHON,
+        payload=CodePayload(
+            content="print('Testing submissions service implementation to prevent errors')"
+        ),
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        await service.create(data)
+
+    assert excinfo.value.status_code == 500
+    mongo_id = fake_mg.insert.await_args.kwargs["mongo_id"]
+    assert fake_pg.create.await_args.kwargs["mongo_id"] == mongo_id
+    fake_mg.delete_many.assert_awaited_once_with([mongo_id])
+
+
+@pytest.mark.asyncio
+async def test_create_submission_removes_row_when_mongo_write_fails():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+    fake_ai.get_feedback.return_value = "AI says OK"
+    fake_pg.find_by_hash.return_value = None
+    stored = FakePgSubmission()
+    fake_pg.create.return_value = stored
+    fake_mg.insert.side_effect = PyMongoError("down")
+
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai)
+    data = SubmissionCreate(
+        title="test",
+        language=Language.PYTHON,
+        payload=CodePayload(
+            content="print('Testing submissions service implementation to prevent errors')"
+        ),
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        await service.create(data)
+
+    assert excinfo.value.status_code == 500
+    fake_pg.delete.assert_awaited_once_with(stored.uuid)
+
+
+@pytest.mark.asyncio
+async def test_speculative_review_is_cancelled_for_duplicates():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+    content = "print('Testing submissions service implementation to prevent errors')"
+    review_started = asyncio.Event()
+    review_cancelled = asyncio.Event()
+
+    async def slow_feedback(data):
+        review_started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            review_cancelled.set()
+            raise
+
+    async def lookup(code_hash):
+        await review_started.wait()  # the AI call is already in flight
+        return FakePgSubmission(mongo_id="abc123")
+
+    fake_ai.get_feedback.side_effect = slow_feedback
+    fake_pg.find_by_hash.side_effect = lookup
+    fake_mg.find.return_value = SubmissionDocument(
+        _id="abc123", content=content, ai_response="Already exists!"
+    )
+
+    service = SubmissionsService(
+        pg=fake_pg, mg=fake_mg, ai=fake_ai, speculative_review=True
+    )
+    result = await service.create(
+        SubmissionCreate(
+            title="test", language=Language.PYTHON, payload=CodePayload(content=content)
+        )
+    )
+
+    assert result.payload.ai_response == "Already exists!"
+    await asyncio.wait_for(review_cancelled.wait(), timeout=1)
+    fake_mg.insert.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_submission_reuses_existing_review():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+
+    original = "def area(width, height):\n    return width * height  # rectangle\n"
+    variant = "def area(w, h):\n    # same thing, shorter names\n    return w * h\n"
+    original_hash = compute_code_hash(original, Language.PYTHON)
+    index = NearDuplicateIndex(threshold=0.9)
+    index.add(original_hash, original, Language.PYTHON)
+
+    existing = FakePgSubmission(mongo_id="mongo123")
+    fake_pg.find_by_hash.side_effect = lambda h: (
+        existing if h == original_hash else None
+    )
+    fake_mg.find.return_value = SubmissionDocument(
+        _id="mongo123", content=original, ai_response="Reviewed once"
+    )
+    cache: TTLCache[str, CachedReview] = TTLCache(maxsize=10, ttl=60)
+    service = SubmissionsService(
+        pg=fake_pg, mg=fake_mg, ai=fake_ai, cache=cache, near_duplicates=index
+    )
+
+    result = await service.create(
+        SubmissionCreate(
+            title="test", language=Language.PYTHON, payload=CodePayload(content=variant)
+        )
+    )
+
+    fake_ai.get_feedback.assert_not_called()
+    fake_pg.create.assert_not_called()
+    assert result.uuid == existing.uuid
+    assert result.payload.content == variant
+    assert result.payload.ai_response == "Reviewed once"
+    assert cache.get(compute_code_hash(variant, Language.PYTHON)) is not None
+
+
+@pytest.mark.asyncio
+async def test_create_submission_is_queued_while_ai_circuit_is_open():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_mg = cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+    fake_jobs = MagicMock(running=True)
+
+    pending = FakePgSubmission(mongo_id="mongo123")
+    pending.status = SubmissionStatus.PENDING
+    fake_pg.find_by_hash.return_value = None
+    fake_pg.create.return_value = pending
+    fake_ai.get_feedback.side_effect = AICircuitOpenError("open", retry_after=30)
+
+    service = SubmissionsService(pg=fake_pg, mg=fake_mg, ai=fake_ai, jobs=fake_jobs)
+    data = SubmissionCreate(
+        title="test",
+        language=Language.PYTHON,
+        payload=CodePayload(
+            content="print('Testing submissions service implementation to prevent errors')"
+        ),
+    )
+
+    result = await service.create(data)
+
+    assert result.status == SubmissionStatus.PENDING
+    assert fake_pg.create.await_args.kwargs["status"] == SubmissionStatus.PENDING
+    fake_jobs.submit.assert_called_once_with(pending.uuid)
+
+
+@pytest.mark.asyncio
+async def test_create_submission_returns_503_when_circuit_open_without_jobs():
+    fake_pg = cast(SubmissionsPgRepo, AsyncMock(spec=SubmissionsPgRepo))
+    fake_ai = cast(AIService, AsyncMock(spec=AIService))
+    fake_pg.find_by_hash.return_value = None
+    fake_ai.get_feedback.side_effect = AICircuitOpenError("open", retry_after=12.5)
+
+    service = SubmissionsService(
+        pg=fake_pg,
+        mg=cast(SubmissionsMongoRepo, AsyncMock(spec=SubmissionsMongoRepo)),
+        ai=fake_ai,
+    )
+    data = SubmissionCreate(
+        title="test",
+        language=Language.PYTHON,
+        payload=CodePayload(
+            content="print('Testing submissions service implementation to prevent errors')"
+        ),
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        await service.create(data)
+
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "13"}
+    fake_pg.create.assert_not_called()